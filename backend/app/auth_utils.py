@@ -8,6 +8,8 @@ Features:
 - Password verification supporting both bcrypt and pbkdf2_sha256
 - Current user extraction from JWT tokens
 - Manager role verification
+- Cached identity (display name, trainer flags) for the authenticated user
+- Dedicated worker pool for password hashing/verification (keeps the event loop free)
 
 Security:
 - Uses pbkdf2_sha256 as primary hashing scheme (no 72-byte limit)
@@ -21,8 +23,12 @@ Note: This is an alternative implementation to utils.py with enhanced password h
 @date 2025
 """
 
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -31,6 +37,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_db_async
 from app.models import User
+from app.identity import Identity, load_identity
+from app.logging_config import log_sampled
+
+logger = logging.getLogger(__name__)
 
 # Configuration for JWT
 # TODO: Move SECRET_KEY to environment variable for production
@@ -41,7 +51,42 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Password hashing configuration
 # Use pbkdf2_sha256 as primary (no 72-byte limit like bcrypt), bcrypt as fallback
 # pbkdf2_sha256 is listed first to be the default, and bcrypt is kept for backward compatibility
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
+# PBKDF2_ROUNDS: rounds used for new hashes
+# PBKDF2_MIN_ROUNDS: hashes below this are flagged for upgrade on the next successful login
+PBKDF2_ROUNDS = int(os.getenv("PBKDF2_ROUNDS", "29000"))
+PBKDF2_MIN_ROUNDS = int(os.getenv("PBKDF2_MIN_ROUNDS", str(PBKDF2_ROUNDS)))
+
+# Built once at import time; CryptContext compiles its policy on construction,
+# so it must not be recreated per call.
+# deprecated="auto" marks bcrypt as deprecated, so legacy bcrypt hashes are
+# reported by verify_and_update() and rehashed with pbkdf2_sha256.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PBKDF2_ROUNDS,
+    pbkdf2_sha256__min_rounds=min(PBKDF2_MIN_ROUNDS, PBKDF2_ROUNDS),
+)
+
+# Password hashing worker pool
+# pbkdf2_sha256 spends its time inside hashlib, which releases the GIL, so a thread
+# pool gives real parallelism here without the pickling cost of a process pool.
+# PASSWORD_HASH_WORKERS: number of hashing threads
+# PASSWORD_HASH_MAX_CONCURRENCY: max hashes in flight; further callers wait (queue)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS)))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="pwd-hash")
+_hash_semaphore = asyncio.Semaphore(PASSWORD_HASH_MAX_CONCURRENCY)
+
+# Counters for queue depth and throughput of the hashing pool
+_hash_stats = {
+    "queued": 0,          # callers waiting for a free slot
+    "in_flight": 0,       # hashes currently running on the pool
+    "max_queued": 0,      # high-water mark of the queue
+    "completed": 0,       # total hashes finished
+    "wait_seconds_total": 0.0,
+    "run_seconds_total": 0.0,
+}
 
 # OAuth2 password bearer scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
@@ -71,17 +116,8 @@ def get_password_hash(password: str):
     Hash password using pbkdf2_sha256 (no 72-byte limit like bcrypt).
     Supports passwords of any length.
     """
-    # Use pbkdf2_sha256 explicitly to avoid bcrypt's 72-byte limit
-    # This ensures we can handle passwords of any length
-    try:
-        # Create a context specifically for pbkdf2_sha256 hashing
-        pbkdf2_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-        return pbkdf2_context.hash(password)
-    except Exception as e:
-        # Fallback to the main context if there's an issue
-        import logging
-        logging.warning(f"pbkdf2_sha256 hashing failed, using fallback: {e}")
-        return pwd_context.hash(password)
+    # pbkdf2_sha256 is the default scheme of pwd_context, so bcrypt is never used for new hashes
+    return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str):
     """
@@ -92,10 +128,76 @@ def verify_password(plain_password: str, hashed_password: str):
     except Exception as e:
         # If hash format is invalid or unrecognized, try to handle it gracefully
         # This can happen if the hash was stored incorrectly
-        import logging
-        logging.warning(f"Password verification failed: {e}")
+        logger.warning(f"Password verification failed: {e}")
         return False
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify password and, if the stored hash is outdated (bcrypt or too few rounds),
+    return a replacement pbkdf2_sha256 hash.
+
+    Returns:
+        tuple: (is_valid, new_hash) where new_hash is None if no upgrade is needed
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logger.warning(f"Password verification failed: {e}")
+        return False, None
+
+async def _run_in_hash_pool(func, *args):
+    """
+    Run a CPU-heavy hashing function on the dedicated pool, respecting the concurrency cap.
+    Updates the queue-depth counters exposed by get_hashing_metrics().
+    """
+    loop = asyncio.get_running_loop()
+    queued_at = loop.time()
+    _hash_stats["queued"] += 1
+    _hash_stats["max_queued"] = max(_hash_stats["max_queued"], _hash_stats["queued"])
+    try:
+        await _hash_semaphore.acquire()
+    finally:
+        _hash_stats["queued"] -= 1
+
+    started_at = loop.time()
+    _hash_stats["wait_seconds_total"] += started_at - queued_at
+    _hash_stats["in_flight"] += 1
+    try:
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_stats["in_flight"] -= 1
+        _hash_stats["completed"] += 1
+        _hash_stats["run_seconds_total"] += loop.time() - started_at
+        _hash_semaphore.release()
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Async wrapper for get_password_hash. Use this from request handlers.
+    """
+    return await _run_in_hash_pool(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Async wrapper for verify_password. Use this from request handlers.
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Async wrapper for verify_and_update_password. Use this from request handlers.
+    """
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+def get_hashing_metrics() -> dict:
+    """
+    Snapshot of the hashing pool: configuration, queue depth and totals.
+    """
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_concurrency": PASSWORD_HASH_MAX_CONCURRENCY,
+        **_hash_stats,
+    }
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Extract current user information from JWT token.
@@ -119,7 +221,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
 
     if not token:
-        print("❌ No token provided")
+        log_sampled(logger, logging.DEBUG, "Rejected request without a token")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="No authentication token provided",
@@ -127,28 +229,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         )
 
     try:
-        print(f"🔍 Validating token: {token[:20]}..." if len(token) > 20 else f"🔍 Validating token: {token}")
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         role: str = payload.get("role")
-        print(f"✅ Token decoded - Username: {username}, Role: {role}")
+        log_sampled(logger, logging.DEBUG, "Token validated for %s (%s)", username, role)
 
         if username is None or role is None:
-            print("❌ Username or role is None in token payload")
+            logger.warning("Token payload is missing username or role")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Invalid token payload - Username: {username}, Role: {role}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
     except jwt.ExpiredSignatureError:
-        print("❌ Token has expired")
+        log_sampled(logger, logging.DEBUG, "Rejected expired token")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except JWTError as e:
-        print(f"❌ JWT Error: {e}")
+        logger.info("Rejected invalid token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token validation failed: {str(e)}",
@@ -192,3 +293,37 @@ async def get_current_active_manager(user_data: dict = Depends(get_current_user)
             detail="You do not have permission to access this resource"
         )
     return user_data
+
+async def get_current_identity(
+    user_data: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_async)
+) -> Identity:
+    """
+    Get the current user together with their cached hierarchy facts.
+    
+    Use this instead of get_current_active_user in routes that need the caller's
+    display name or trainer status; the facts come from the identity cache and
+    only hit the database on a cache miss.
+    
+    Args:
+        user_data: User data from get_current_user dependency
+        db: Database session (shared with the route through FastAPI's dependency cache)
+        
+    Returns:
+        Identity: Username, role, names and trainer flags
+    """
+    return await load_identity(db, user_data["username"], user_data["role"])
+
+async def get_current_manager_identity(identity: Identity = Depends(get_current_identity)) -> Identity:
+    """
+    Identity variant of get_current_active_manager.
+    
+    Raises:
+        HTTPException: 403 if user is not a manager
+    """
+    if identity.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource"
+        )
+    return identity
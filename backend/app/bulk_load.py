@@ -0,0 +1,129 @@
+"""
+Bulk Load Module
+
+Purpose: Insert large batches of validated rows without per-object ORM overhead
+Features:
+- PostgreSQL (asyncpg): COPY via copy_records_to_table on the session's own
+  connection, so rows stay inside the caller's transaction
+- Multi-row Core INSERT (executemany) when forced by configuration
+- ORM add_all/flush as the fallback for other dialects
+
+Used by the Excel/CSV importers (app/excel_loader.py). Rows are plain dicts keyed
+by model attribute name; columns left out get their Python-side defaults (e.g.
+User.created_at) or their server defaults (serial IDs).
+
+Configuration (environment variables):
+- BULK_LOAD_MODE: "auto" (default: COPY on asyncpg, ORM elsewhere),
+  "copy", "insert" or "orm"
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import logging
+import os
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import Column, String, Table, Text, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BULK_LOAD_MODE = os.getenv("BULK_LOAD_MODE", "auto").strip().lower()
+
+logger = logging.getLogger(__name__)
+
+
+def _load_mode(db: AsyncSession) -> str:
+    """Effective mode for this session's database."""
+    dialect = db.get_bind().dialect
+    if BULK_LOAD_MODE == "copy" and dialect.driver != "asyncpg":
+        logger.warning(f"BULK_LOAD_MODE=copy needs asyncpg (driver is {dialect.driver}); using ORM inserts")
+        return "orm"
+    if BULK_LOAD_MODE in ("copy", "insert", "orm"):
+        return BULK_LOAD_MODE
+    return "copy" if dialect.driver == "asyncpg" else "orm"
+
+
+def _copy_columns(table: Table, records: Sequence[Dict[str, Any]]) -> List[Tuple[Column, Any]]:
+    """
+    Resolves the table columns COPY writes: every key present in the records plus
+    columns with a Python-side scalar or callable default (COPY does not apply them).
+    """
+    keys = set().union(*(record.keys() for record in records)) if records else set()
+    columns = []
+    for column in table.columns:
+        if column.key in keys:
+            columns.append((column, None))
+        elif column.default is not None and (column.default.is_scalar or column.default.is_callable):
+            columns.append((column, column.default))
+    return columns
+
+
+def _to_text(value: Any) -> Any:
+    # COPY is typed: text columns need str (Excel cells may hold numbers or times)
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _default_value(default: Any) -> Callable[[], Any]:
+    if default.is_scalar:
+        return lambda: default.arg
+    # Callable column defaults are wrapped to accept an execution context
+    return lambda: default.arg(None)
+
+
+async def bulk_insert(db: AsyncSession, model: Any, records: List[Dict[str, Any]]) -> int:
+    """
+    Inserts rows into the model's table inside the session's current transaction.
+
+    Args:
+        db: Database session (not committed here)
+        model: ORM model class, e.g. EmployeeCompetency, or a Core Table
+            (plain tables use multi-row INSERT instead of the ORM fallback)
+        records: Rows as dicts keyed by column attribute name
+
+    Returns:
+        int: Number of rows inserted
+    """
+    if not records:
+        return 0
+    mode = _load_mode(db)
+    table = model if isinstance(model, Table) else model.__table__
+
+    if mode == "orm" and table is not model:
+        objects = [model(**record) for record in records]
+        db.add_all(objects)
+        await db.flush()
+        # Detach so the session does not grow with the import
+        for obj in objects:
+            db.expunge(obj)
+        return len(objects)
+
+    if mode != "copy":
+        # executemany of one INSERT; SQLAlchemy batches it into multi-row VALUES and applies defaults
+        await db.execute(insert(table), records)
+        return len(records)
+
+    # COPY on the driver connection behind the session (same transaction)
+    columns = _copy_columns(table, records)
+    converters = []
+    for column, default in columns:
+        make_default = _default_value(default) if default is not None else None
+        is_text = isinstance(column.type, (String, Text))
+        converters.append((column.key, make_default, is_text))
+
+    tuples = [
+        tuple(
+            make_default() if make_default is not None and key not in record
+            else (_to_text(record.get(key)) if is_text else record.get(key))
+            for key, make_default, is_text in converters
+        )
+        for record in records
+    ]
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name,
+        records=tuples,
+        columns=[column.name for column, _ in columns],
+        schema_name=table.schema,
+    )
+    return len(tuples)
@@ -0,0 +1,98 @@
+"""
+In-Process Cache Module
+
+Purpose: Small TTL + LRU cache for hot, read-mostly lookups
+Features:
+- Per-entry time-to-live
+- LRU eviction with a hard size cap
+- Generation counter so a load that started before an invalidation is not stored
+- Hit/miss/eviction counters for monitoring
+
+Note: The cache lives in the worker process. With several uvicorn workers each
+worker has its own copy, so entries must always carry a TTL.
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after ttl_seconds.
+
+    A max_entries or ttl_seconds of 0 disables the cache (every get() is a miss).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Bumped on every invalidation; see set()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store value under key.
+
+        Pass the generation read before loading the value from the database; if the
+        cache was invalidated in the meantime the (possibly stale) value is dropped.
+        """
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything if key is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+        self.generation += 1
+
+    def stats(self) -> dict:
+        """Snapshot of size and hit/miss counters."""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -8,10 +8,32 @@ Features:
 - Data validation and cleaning
 - Database insertion for trainers, trainings, and competencies
 - Manager-employee relationship loading from CSV
+- Bulk inserts (PostgreSQL COPY, ORM fallback) via app/bulk_load.py
+- Merge refresh mode: diff the upload against the tables by natural key and
+  apply only the inserts, updates and deletes (IDs and user activity are kept)
+- Streaming mode for very large workbooks: rows are read lazily with openpyxl
+  read_only mode and flushed to the database in chunks, so memory stays flat
+- Sheets whose content hash matches the last applied upload are skipped
+  (app/upload_hashes.py)
+- Parsing runs in worker processes (the sheets of a workbook in parallel); only
+  database writes run on the event loop, in foreign-key order
+
+Configuration (environment variables):
+- EXCEL_CHUNK_ROWS: rows normalized and flushed per batch (default 5000)
+- EXCEL_STREAM_MIN_BYTES: uploads of at least this size are streamed when the
+  caller does not choose a mode (default 20 MB)
+- IMPORT_PARSE_WORKERS: processes for parsing/normalizing uploads (default 3, one
+  per sheet of the master workbook; 0 parses on the event loop)
+- IMPORT_PARSE_QUEUE_CHUNKS: parsed chunks buffered per sheet when streaming (default 4)
 
 Functions:
+- open_workbook(): Open an uploaded workbook once for all sheet reads
 - clean_headers(): Standardize DataFrame column names
 - find_column_flexible(): Flexible column matching
+- resolve_columns(): Resolve a sheet's header -> field map once
+- normalize_*_frame(): Validate and clean a chunk of rows with whole-column operations
+- iter_sheet_chunks(): Read a sheet in fixed-size row chunks (DataFrame or streaming)
+- parse_sheets_parallel(): Parse several sheets at once in worker processes
 - load_all_from_excel(): Main function to load Excel data
 - load_manager_employee_from_csv(): Load manager-employee relationships
 
@@ -19,16 +41,85 @@ Functions:
 @date 2025
 """
 
+import asyncio
+import io
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
+from openpyxl import load_workbook
+from sqlalchemy import BigInteger, Column, Identity, MetaData, Table, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from .models import Trainer, TrainingDetail, ManagerEmployee, User, EmployeeCompetency
+from .identity import invalidate_identity_cache
+from .trainer_index import rebuild_training_trainers, invalidate_trainer_index
+from .shared_content_cache import invalidate_shared_content
+from .bulk_load import bulk_insert
+from .jobs import report_progress
+from .logging_config import configure_logging
+from .upload_hashes import (MISSING_SHEET_HASH, file_content_hash, file_key, get_applied_hashes,
+                            is_unchanged, record_hashes, sheet_content_hash, sheet_key)
 from datetime import datetime
 import logging
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows normalized and flushed to the database per batch
+EXCEL_CHUNK_ROWS = int(os.getenv("EXCEL_CHUNK_ROWS", "5000"))
+# Uploads at least this large are streamed (read-only openpyxl) unless the caller decides
+EXCEL_STREAM_MIN_BYTES = int(os.getenv("EXCEL_STREAM_MIN_BYTES", str(20 * 1024 * 1024)))
+# Worker processes for the parse/normalize stage (0 parses on the event loop)
+IMPORT_PARSE_WORKERS = int(os.getenv("IMPORT_PARSE_WORKERS", "3"))
+# Normalized chunks a streaming parse worker may run ahead of the database writer
+IMPORT_PARSE_QUEUE_CHUNKS = int(os.getenv("IMPORT_PARSE_QUEUE_CHUNKS", "4"))
+# How often a waiting consumer checks that its parse worker is still running
+_PARSE_POLL_SECONDS = 1.0
+
+# Sheet names expected in the uploaded workbook
+TRAINERS_SHEET = "Trainers Details"
+TRAININGS_SHEET = "Training Details"
+COMPETENCY_SHEET = "Employee Competency"
+# Upload kinds whose whole-file hash is recorded (see app/upload_hashes.py)
+WORKBOOK_FILE = "workbook"
+MANAGER_EMPLOYEE_FILE = "manager_employee_csv"
+
+
+def open_workbook(excel_file_source: Any, required_sheets=(), streaming: bool = False) -> Any:
+    """
+    Opens the workbook once so every sheet is read from the same parsed file,
+    and checks that the required sheets exist before any data is touched.
+
+    Args:
+        excel_file_source: Path or file-like object of the .xlsx upload
+        required_sheets: Sheet names that must be present
+        streaming: Open with openpyxl in read-only mode instead of pandas;
+            rows are then read lazily and never held as a whole sheet
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    Returns:
+        pd.ExcelFile, or a read-only openpyxl Workbook when streaming. Read sheets
+        with iter_sheet_chunks() and close() the workbook when done.
+
+    Raises:
+        ValueError: If a required sheet is missing (message lists the available sheets)
+    """
+    if hasattr(excel_file_source, "seek"):
+        excel_file_source.seek(0)
+    if streaming:
+        workbook = load_workbook(excel_file_source, read_only=True, data_only=True)
+        available_sheets = workbook.sheetnames
+    else:
+        workbook = pd.ExcelFile(excel_file_source, engine='openpyxl')
+        available_sheets = workbook.sheet_names
+    try:
+        check_sheets(available_sheets, required_sheets)
+    except ValueError:
+        workbook.close()
+        raise
+    return workbook
 
 
 def clean_headers(df: pd.DataFrame) -> pd.DataFrame:
@@ -55,652 +146,1001 @@ def clean_headers(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def find_column_flexible(row_dict: dict, possible_names: list) -> Any:
+def find_column_name(columns: Iterable[str], possible_names: list) -> Optional[str]:
     """
-    Tries to find a column value using flexible matching.
-    Checks multiple possible column name variations.
-    Returns the value (even if empty/None) if column is found.
+    Resolves which column holds a field, trying the possible names in order:
+    exact match, case-insensitive match, then partial/substring match.
+    Returns the matching column name, or None.
     """
+    columns = [str(column) for column in columns]
+
     # First try exact matches
     for name in possible_names:
-        if name in row_dict:
-            return row_dict.get(name)
-    
+        if name in columns:
+            return name
+
     # Then try case-insensitive exact match
-    row_keys_lower = {k.lower(): k for k in row_dict.keys()}
+    columns_lower = {column.lower(): column for column in columns}
     for name in possible_names:
-        if name.lower() in row_keys_lower:
-            return row_dict.get(row_keys_lower[name.lower()])
-    
+        if name.lower() in columns_lower:
+            return columns_lower[name.lower()]
+
     # Finally try partial/substring matching
     for name in possible_names:
-        for key in row_dict.keys():
-            key_lower = key.lower()
-            name_lower = name.lower()
+        name_lower = name.lower()
+        for column in columns:
+            column_lower = column.lower()
             # Check if key contains name or name contains key (partial match)
-            if name_lower in key_lower or key_lower in name_lower:
+            if name_lower in column_lower or column_lower in name_lower:
                 # Avoid matching very generic names like "name" to everything
-                if len(name) > 3 or (len(name) <= 3 and name_lower == key_lower):
-                    return row_dict.get(key)
-    
+                if len(name) > 3 or (len(name) <= 3 and name_lower == column_lower):
+                    return column
+
     return None
 
 
-async def load_all_from_excel(excel_file_source: Any, db: AsyncSession):
+def find_column_flexible(row_dict: dict, possible_names: list) -> Any:
     """
-    Loads all data from a given Excel file source in a single, safe transaction.
-    Loads three sheets: "Trainers Details", "Training Details", and "Employee Competency"
+    Tries to find a column value using flexible matching.
+    Checks multiple possible column name variations.
+    Returns the value (even if empty/None) if column is found.
     """
-    logging.info(f"--- Starting Excel data load (All 3 sheets: Trainers Details, Training Details, Employee Competency) ---")
+    column = find_column_name(row_dict.keys(), possible_names)
+    return row_dict.get(column) if column is not None else None
+
+
+# --- Sheet column specs ---
+# field -> groups of candidate header names (after clean_headers). Each group is
+# resolved to one column with find_column_name(); a field takes the first non-empty
+# value across its groups, row by row.
+
+TRAINER_COLUMNS = {
+    "skill": [["skill"]],
+    "competency": [["competency", "competence"]],
+    # IMPORTANT: In Excel, trainer name is in "Copmetency" column (typo), check it first
+    "trainer_name": [["copmetency"], ["trainer_name", "trainername", "trainer name", "trainer", "name"]],
+    "expertise_level": [["expertise_level", "expertiselevel", "expertise level", "expertise", "level"]],
+}
+
+TRAINING_COLUMNS = {
+    "training_name": [["trainingname_program", "training_name_program", "training_name",
+                       "trainingname", "training name", "program", "training"]],
+    # Exact trainer/email headers first, then flexible matching
+    "trainer_name": [["trainer_name", "trainername", "trainer", "trainer name"],
+                     ["trainer_name", "trainer", "trainername", "trainer name", "name"]],
+    "email": [["email_id", "emailid", "email", "email_address", "email id"]],
+    "training_date": [["training_dates", "training_date", "date", "dates"]],
+    "duration": [["duration_(in_hrs)", "duration_in_hrs", "duration", "duration_in_hours", "hours"]],
+    "seats": [["no._of_seats", "no_of_seats", "seats", "number_of_seats", "numberofseats"]],
+    "division": [["division"]],
+    "department": [["department"]],
+    "competency": [["competency", "competence"]],
+    "skill": [["skill"]],
+    "training_topics": [["trainingtopics__material", "training_topics_material",
+                         "training_topics", "trainingtopics", "topics", "material"]],
+    "prerequisites": [["perquisites", "prerequisites", "prerequisite"]],
+    "skill_category": [["skill_category_(l1_-_l5)", "skill_category", "skillcategory", "category"]],
+    "time": [["time", "training_time"]],
+    "training_type": [["training_type", "trainingtype", "type"]],
+    "assessment_details": [["assessment_details", "assessmentdetails", "assessment", "assessment_detail"]],
+}
+
+COMPETENCY_COLUMNS = {
+    "employee_empid": [['employee_id', 'employeeid', 'empid', 'employee_empid']],
+    "employee_name": [['employee_name', 'employeename', 'employee name', 'name']],
+    "department": [['department']],
+    "division": [['division']],
+    "project": [['project']],
+    "role_specific_comp": [['role_specific_competency_(mhs)', 'role_specific_competency', 'role_specific_comp', 'role specific competency (mhs)']],
+    "destination": [['designation', 'destination', 'desination']],
+    "competency": [['competency', 'competence']],
+    "skill": [['skill']],
+    "current_expertise": [['current_expertise_level', 'current_expertise', 'current expertise level', 'current expertise']],
+    "target_expertise": [['target_expertise_level', 'target_expertise', 'target expertise level', 'target expertise']],
+    "comments": [['comments', 'comment']],
+    "target_date": [['target_date', 'target date']],
+}
+
+
+def resolve_columns(columns: Iterable[str], spec: Dict[str, List[list]]) -> Dict[str, List[str]]:
+    """
+    Resolves a sheet's header -> field map once, so rows are never scanned
+    for column names.
+
+    Args:
+        columns: Cleaned headers of the sheet
+        spec: Column spec, e.g. TRAINER_COLUMNS
+
+    Returns:
+        dict: field -> resolved column names in priority order (empty if not found)
+    """
+    columns = list(columns)
+    resolved = {}
+    for field, groups in spec.items():
+        names = []
+        for group in groups:
+            column = find_column_name(columns, group)
+            if column is not None and column not in names:
+                names.append(column)
+        resolved[field] = names
+    return resolved
+
+
+# --- Column cleaners ---
+# Whole-column operations on a chunk DataFrame; values come back as Python
+# objects with None for missing cells.
+
+def _column(df: pd.DataFrame, names: List[str]) -> pd.Series:
+    """First non-empty value across the resolved columns of a field."""
+    if not names:
+        return pd.Series(None, index=df.index, dtype=object)
+    result = df[names[0]].astype(object)
+    for name in names[1:]:
+        result = result.where(_present(result), df[name].astype(object))
+    return result.where(result.notna(), None)
+
+
+def _string_mask(s: pd.Series) -> pd.Series:
+    """True where the cell holds a string."""
+    if s.dtype != object:
+        return pd.Series(False, index=s.index)
     try:
-        logging.info("Step 1: Clearing old data from tables...")
-        # Delete in order to respect foreign key constraints:
-        # 1. Delete tables that reference both training_details and other tables
-        await db.execute(text("DELETE FROM assignment_submissions"))
-        # 2. Delete tables that reference training_details
-        await db.execute(text("DELETE FROM shared_assignments"))
-        await db.execute(text("DELETE FROM shared_feedback"))
-        await db.execute(text("DELETE FROM training_requests"))
-        await db.execute(text("DELETE FROM training_assignments"))
-        # 3. Now safe to delete training_details
-        await db.execute(text("DELETE FROM training_details"))
-        # 4. Delete employee_competency (no dependencies on training_details)
-        await db.execute(text("DELETE FROM employee_competency"))
-        # 5. Finally delete trainers (no dependencies)
-        await db.execute(text("DELETE FROM trainers"))
-        logging.info("-> Old data cleared successfully.")
-        
-        # Reset sequences to start from 1 for consistent IDs
-        logging.info("Step 1.5: Resetting ID sequences to start from 1...")
-        try:
-            # Try to reset trainers sequence
-            try:
-                await db.execute(text("ALTER SEQUENCE trainers_id_seq RESTART WITH 1"))
-                logging.info("-> Trainers sequence reset to 1.")
-            except Exception:
-                # Try to find the actual sequence name
-                seq_result = await db.execute(text("""
-                    SELECT sequence_name FROM information_schema.sequences 
-                    WHERE sequence_name LIKE '%trainers%id%' OR sequence_name LIKE '%trainer%id%'
-                    ORDER BY sequence_name LIMIT 1
-                """))
-                seq_name = seq_result.scalar()
-                if seq_name:
-                    await db.execute(text(f"ALTER SEQUENCE {seq_name} RESTART WITH 1"))
-                    logging.info(f"-> Trainers sequence ({seq_name}) reset to 1.")
-                else:
-                    logging.warning("-> Could not find trainers sequence, will be set automatically on insert.")
-            
-            # Try to reset training_details sequence
-            try:
-                await db.execute(text("ALTER SEQUENCE training_details_id_seq RESTART WITH 1"))
-                logging.info("-> Training_details sequence reset to 1.")
-            except Exception:
-                # Try to find the actual sequence name
-                seq_result = await db.execute(text("""
-                    SELECT sequence_name FROM information_schema.sequences 
-                    WHERE sequence_name LIKE '%training_details%id%' OR sequence_name LIKE '%training_detail%id%'
-                    ORDER BY sequence_name LIMIT 1
-                """))
-                seq_name = seq_result.scalar()
-                if seq_name:
-                    await db.execute(text(f"ALTER SEQUENCE {seq_name} RESTART WITH 1"))
-                    logging.info(f"-> Training_details sequence ({seq_name}) reset to 1.")
-                else:
-                    logging.warning("-> Could not find training_details sequence, will be set automatically on insert.")
-            
-            # Try to reset employee_competency sequence
-            try:
-                await db.execute(text("ALTER SEQUENCE employee_competency_id_seq RESTART WITH 1"))
-                logging.info("-> Employee_competency sequence reset to 1.")
-            except Exception:
-                # Try to find the actual sequence name
-                seq_result = await db.execute(text("""
-                    SELECT sequence_name FROM information_schema.sequences 
-                    WHERE sequence_name LIKE '%employee_competency%id%'
-                    ORDER BY sequence_name LIMIT 1
-                """))
-                seq_name = seq_result.scalar()
-                if seq_name:
-                    await db.execute(text(f"ALTER SEQUENCE {seq_name} RESTART WITH 1"))
-                    logging.info(f"-> Employee_competency sequence ({seq_name}) reset to 1.")
-                else:
-                    logging.warning("-> Could not find employee_competency sequence, will be set automatically on insert.")
-            
-            logging.info("-> ID sequences reset successfully. IDs will start from 1.")
-        except Exception as seq_error:
-            # If sequence doesn't exist or has different name, log but continue
-            logging.warning(f"Could not reset sequences: {seq_error}")
-            logging.warning("Sequences will be automatically reset after data insertion if needed.")
-
-        # --- 1. Load Trainers Details ---
-        logging.info("Step 2: Reading 'Trainers Details' sheet from Excel...")
-        try:
-            df_trainers_raw = pd.read_excel(excel_file_source, sheet_name="Trainers Details", engine='openpyxl')
-        except ValueError as e:
-            # List available sheets if the sheet name is wrong
-            excel_file_source.seek(0)
-            xl_file = pd.ExcelFile(excel_file_source, engine='openpyxl')
-            available_sheets = xl_file.sheet_names
-            logging.error(f"Sheet 'Trainers Details' not found! Available sheets: {available_sheets}")
-            raise ValueError(f"Sheet 'Trainers Details' not found. Available sheets: {available_sheets}")
-        
-        logging.info(f"-> Original column names (before cleaning): {list(df_trainers_raw.columns)}")
-        
-        df_trainers = df_trainers_raw.replace({np.nan: None})
-        df_trainers = clean_headers(df_trainers)
-        logging.info(f"-> Found {len(df_trainers)} rows in 'Trainers Details'.")
-        logging.info(f"-> Column names after cleaning: {list(df_trainers.columns)}")
-        
-        # Log first few rows as samples for debugging
-        if len(df_trainers) > 0:
-            logging.info(f"-> Sample of first row data: {df_trainers.iloc[0].to_dict()}")
-            # Also show first 3 rows in a more readable format
-            logging.info("-> First 3 rows of data:")
-            for idx in range(min(3, len(df_trainers))):
-                row_dict = df_trainers.iloc[idx].to_dict()
-                logging.info(f"   Row {idx+2}: {row_dict}")
-            # Show what we're looking for vs what we found
-            logging.info("-> DIAGNOSTIC: Checking column matching...")
-            sample_row = df_trainers.iloc[0].to_dict()
-            logging.info(f"   Looking for 'skill' - found: {repr(sample_row.get('skill'))}")
-            logging.info(f"   Looking for 'competency' - found: {repr(sample_row.get('competency'))}")
-            logging.info(f"   Looking for 'trainer_name' - found: {repr(sample_row.get('trainer_name'))}")
-            logging.info(f"   Looking for 'expertise_level' - found: {repr(sample_row.get('expertise_level'))}")
-            logging.info(f"   All column keys in cleaned data: {list(sample_row.keys())}")
-
-        trainers_to_add = []
-        skipped_count = 0
-        
-        # Log column mapping for first row to help debug
-        if len(df_trainers) > 0:
-            first_row = df_trainers.iloc[0].to_dict()
-            logging.info("-> Column mapping for trainer fields:")
-            skill_found = find_column_flexible(first_row, ['skill'])
-            competency_found = find_column_flexible(first_row, ['competency', 'competence'])
-            trainer_name_found = find_column_flexible(first_row, ['trainer_name', 'trainer', 'trainername', 'trainer name', 'copmetency', 'name'])
-            expertise_level_found = find_column_flexible(first_row, ['expertise_level', 'expertise', 'level', 'expertiselevel', 'expertise level'])
-            
-            logging.info(f"   skill: {repr(skill_found)} (found: {skill_found is not None})")
-            logging.info(f"   competency: {repr(competency_found)} (found: {competency_found is not None})")
-            logging.info(f"   trainer_name: {repr(trainer_name_found)} (found: {trainer_name_found is not None})")
-            logging.info(f"   expertise_level: {repr(expertise_level_found)} (found: {expertise_level_found is not None})")
-            logging.info(f"   All available columns in first row: {list(first_row.keys())}")
-        
-        for i, row in enumerate(df_trainers.to_dict('records')):
-            # Validate required fields before creating Trainer object
-            # Use flexible column matching to handle typos and variations
-            missing_fields = []
-            skill_val = find_column_flexible(row, ["skill"]) or row.get("skill")
-            competency_val = find_column_flexible(row, ["competency", "competence"]) or row.get("competency")
-            # IMPORTANT: In Excel, trainer name is in "Copmetency" column (typo), check it first
-            # Then try other trainer name variations
-            trainer_name_val = (find_column_flexible(row, ["copmetency"]) or 
-                              find_column_flexible(row, ["trainer_name", "trainername", "trainer name", "trainer", "name"])) or row.get("trainer_name")
-            expertise_level_val = find_column_flexible(row, ["expertise_level", "expertiselevel", "expertise level", "expertise", "level"]) or row.get("expertise_level")
-            
-            # Clean and validate values
-            if skill_val and isinstance(skill_val, str):
-                skill_val = skill_val.strip()
-            if competency_val and isinstance(competency_val, str):
-                competency_val = competency_val.strip()
-            if trainer_name_val and isinstance(trainer_name_val, str):
-                trainer_name_val = trainer_name_val.strip()
-            if expertise_level_val and isinstance(expertise_level_val, str):
-                expertise_level_val = expertise_level_val.strip()
-            
-            # Provide default for empty trainer_name (make it optional)
-            if not trainer_name_val:
-                trainer_name_val = "Not Assigned"
-                logging.info(f"Row {i+2}: Using default 'Not Assigned' for empty trainer_name")
-            
-            # Check only truly required fields (skill, competency, expertise_level are mandatory)
-            if not skill_val:
-                missing_fields.append("skill")
-            if not competency_val:
-                missing_fields.append("competency")
-            if not expertise_level_val:
-                missing_fields.append("expertise_level")
-            
-            if missing_fields:
-                skipped_count += 1
-                logging.warning(f"Skipping trainer row {i+2} due to missing required fields ({', '.join(missing_fields)})")
-                logging.warning(f"  Row data: skill={repr(skill_val)}, competency={repr(competency_val)}, trainer_name={repr(trainer_name_val)}, expertise_level={repr(expertise_level_val)}")
-                if i < 5:  # Show first 5 skipped rows in detail
-                    logging.warning(f"  Full row keys: {list(row.keys())}")
-                    logging.warning(f"  Full row values: {row}")
-                continue
-            
-            trainers_to_add.append(
-                Trainer(
-                    skill=skill_val,
-                    competency=competency_val,
-                    trainer_name=trainer_name_val,
-                    expertise_level=expertise_level_val,
-                )
-            )
-            if i < 3:  # Log first 3 successful rows
-                logging.info(f"✅ Trainer row {i+2} added: skill={skill_val}, competency={competency_val}, trainer_name={trainer_name_val}, expertise_level={expertise_level_val}")
-        
-        logging.info(f"-> Trainer validation complete: {len(trainers_to_add)} valid rows, {skipped_count} skipped.")
+        return s.str.len().notna()
+    except AttributeError:
+        # .str refuses columns with no strings at all
+        return pd.Series(False, index=s.index)
 
-        # --- 2. Load Training Details ---
-        logging.info("Step 3: Reading 'Training Details' sheet from Excel...")
-        excel_file_source.seek(0)
-        try:
-            df_trainings_raw = pd.read_excel(excel_file_source, sheet_name="Training Details", engine='openpyxl')
-        except ValueError as e:
-            # List available sheets if the sheet name is wrong
-            excel_file_source.seek(0)
-            xl_file = pd.ExcelFile(excel_file_source, engine='openpyxl')
-            available_sheets = xl_file.sheet_names
-            logging.error(f"Sheet 'Training Details' not found! Available sheets: {available_sheets}")
-            raise ValueError(f"Sheet 'Training Details' not found. Available sheets: {available_sheets}")
-        
-        logging.info(f"-> Original column names (before cleaning): {list(df_trainings_raw.columns)}")
-        
-        df_trainings = df_trainings_raw.replace({np.nan: None})
-        df_trainings = clean_headers(df_trainings)
-        logging.info(f"-> Found {len(df_trainings)} rows in 'Training Details'.")
-        logging.info(f"-> Column names after cleaning: {list(df_trainings.columns)}")
-        
-        # Log first few rows as samples for debugging
-        if len(df_trainings) > 0:
-            logging.info(f"-> Sample of first row data: {df_trainings.iloc[0].to_dict()}")
-            # Also show first 3 rows in a more readable format
-            logging.info("-> First 3 rows of data:")
-            for idx in range(min(3, len(df_trainings))):
-                row_dict = df_trainings.iloc[idx].to_dict()
-                logging.info(f"   Row {idx+2}: {row_dict}")
-            
-            # CRITICAL: Show exact column names that contain trainer/email
-            logging.info("=" * 80)
-            logging.info("🔍 COLUMN NAME ANALYSIS:")
-            sample_row = df_trainings.iloc[0].to_dict()
-            trainer_cols = [k for k in sample_row.keys() if 'trainer' in k.lower()]
-            email_cols = [k for k in sample_row.keys() if 'email' in k.lower() or 'mail' in k.lower()]
-            logging.info(f"   Columns with 'trainer': {trainer_cols}")
-            logging.info(f"   Columns with 'email': {email_cols}")
-            if trainer_cols:
-                logging.info(f"   Value in '{trainer_cols[0]}': {repr(sample_row.get(trainer_cols[0]))}")
-            if email_cols:
-                logging.info(f"   Value in '{email_cols[0]}': {repr(sample_row.get(email_cols[0]))}")
-            logging.info("=" * 80)
-
-        trainings_to_add = []
-        skipped_training_count = 0
-        for i, row in enumerate(df_trainings.to_dict('records')):
-            # Validate required fields before creating TrainingDetail object
-            # Use flexible column matching to handle typos and variations
-            missing_fields = []
-            # Training Name/Program - try multiple variations
-            training_name_val = find_column_flexible(row, [
-                "trainingname_program", "training_name_program", "training_name", 
-                "trainingname", "training name", "program", "training"
-            ]) or row.get("trainingname_program")
-            
-            # Trainer Name - try direct access first, then flexible matching
-            # After clean_headers, column names become lowercase with underscores
-            trainer_name_val = None
-            # Try common variations directly
-            for col_name in ["trainer_name", "trainername", "trainer", "trainer name"]:
-                if col_name in row and row[col_name]:
-                    trainer_name_val = row[col_name]
-                    break
-            
-            # If not found, try flexible matching
-            if not trainer_name_val:
-                trainer_name_val = find_column_flexible(row, [
-                    "trainer_name", "trainer", "trainername", "trainer name", "name"
-                ])
-            
-            # Email - try direct access first, then flexible matching
-            email_val = None
-            # Try common variations directly
-            for col_name in ["email_id", "emailid", "email", "email_address", "email id"]:
-                if col_name in row and row[col_name]:
-                    email_val = row[col_name]
-                    break
-            
-            # If not found, try flexible matching
-            if not email_val:
-                email_val = find_column_flexible(row, [
-                    "email_id", "emailid", "email", "email_address", "email id"
-                ])
-            
-            # Debug: Log raw values for first few rows
-            if i < 3:
-                logging.info(f"🔍 DEBUG Row {i+2} - Raw values:")
-                logging.info(f"   training_name (raw): {repr(training_name_val)}")
-                logging.info(f"   trainer_name (raw): {repr(trainer_name_val)} (type: {type(trainer_name_val)})")
-                logging.info(f"   email (raw): {repr(email_val)} (type: {type(email_val)})")
-                logging.info(f"   All row keys: {list(row.keys())}")
-            
-            # Clean values first
-            if training_name_val and isinstance(training_name_val, str):
-                training_name_val = training_name_val.strip()
-            elif training_name_val is not None:
-                training_name_val = str(training_name_val).strip()
-            
-            if trainer_name_val and isinstance(trainer_name_val, str):
-                trainer_name_val = trainer_name_val.strip()
-            elif trainer_name_val is not None:
-                trainer_name_val = str(trainer_name_val).strip()
-            
-            if email_val and isinstance(email_val, str):
-                email_val = email_val.strip()
-            elif email_val is not None:
-                email_val = str(email_val).strip()
-            
-            # Then validate only truly required fields
-            if not training_name_val:
-                missing_fields.append("trainingname_program")
-            
-            if missing_fields:
-                skipped_training_count += 1
-                logging.warning(f"Skipping training row {i+2} due to missing required fields ({', '.join(missing_fields)})")
-                if i < 5:  # Show first 5 skipped rows in detail
-                    logging.warning(f"  Full row keys: {list(row.keys())}")
-                continue
 
-            # Use flexible matching for all fields
-            date_val = find_column_flexible(row, ["training_dates", "training_date", "date", "dates"]) or row.get("training_dates")
-            
-            # Convert date column to datetime objects, not strings
-            try:
-                final_date = pd.to_datetime(date_val).date() if pd.notna(date_val) and date_val else None
-            except Exception as date_error:
-                logging.warning(f"Row {i+2}: Could not parse date '{date_val}': {date_error}. Setting to None.")
-                final_date = None
-
-            # Use flexible matching for all other fields - calculate values first
-            duration_val = find_column_flexible(row, [
-                "duration_(in_hrs)", "duration_in_hrs", "duration", 
-                "duration_in_hours", "hours"
-            ]) or row.get("duration_(in_hrs)")
-            duration_str = str(duration_val) if pd.notna(duration_val) and duration_val else None
-            
-            seats_val = find_column_flexible(row, [
-                "no._of_seats", "no_of_seats", "seats", 
-                "number_of_seats", "numberofseats"
-            ]) or row.get("no._of_seats")
-            seats_str = str(seats_val) if pd.notna(seats_val) and seats_val else None
-            
-            # Get common fields that don't change per trainer
-            division_val = find_column_flexible(row, ["division"]) or row.get("division")
-            department_val = find_column_flexible(row, ["department"]) or row.get("department")
-            competency_val = find_column_flexible(row, ["competency", "competence"]) or row.get("competency")
-            skill_val = find_column_flexible(row, ["skill"]) or row.get("skill")
-            training_topics_val = find_column_flexible(row, [
-                "trainingtopics__material", "training_topics_material", 
-                "training_topics", "trainingtopics", "topics", "material"
-            ]) or row.get("trainingtopics__material")
-            prerequisites_val = find_column_flexible(row, [
-                "perquisites", "prerequisites", "prerequisite"
-            ]) or row.get("perquisites")
-            skill_category_val = find_column_flexible(row, [
-                "skill_category_(l1_-_l5)", "skill_category", 
-                "skillcategory", "category"
-            ]) or row.get("skill_category_(l1_-_l5)")
-            time_val = find_column_flexible(row, ["time", "training_time"]) or row.get("time")
-            training_type_val = find_column_flexible(row, [
-                "training_type", "trainingtype", "type"
-            ]) or row.get("training_type")
-            assessment_details_val = find_column_flexible(row, [
-                "assessment_details", "assessmentdetails", 
-                "assessment", "assessment_detail"
-            ]) or row.get("assessment_details")
-            
-            # Split trainers by comma - handle multiple trainers
-            # Convert to string first to handle any pandas/Excel types
-            trainer_str = str(trainer_name_val).strip() if trainer_name_val else ""
-            if trainer_str and trainer_str.lower() != "nan" and trainer_str.lower() != "none":
-                # Split by comma and clean each trainer name
-                trainer_names = [t.strip() for t in trainer_str.split(',') if t.strip() and t.strip().lower() != "nan"]
+def _present(s: pd.Series) -> pd.Series:
+    """True where the cell has a value (not None/NaN and not an empty string)."""
+    return s.notna() & (s.astype(object) != "")
+
+
+def _strip_column(s: pd.Series) -> pd.Series:
+    """Strips surrounding whitespace from string cells; other values pass through."""
+    mask = _string_mask(s)
+    if not mask.any():
+        return s
+    return s.where(~mask, s[mask].str.strip())
+
+
+def _text_column(s: pd.Series) -> pd.Series:
+    """Converts present values to stripped strings, missing ones to None."""
+    present = _present(s)
+    return s.astype(str).str.strip().where(present, None).astype(object)
+
+
+def _empid_column(s: pd.Series) -> pd.Series:
+    """Converts employee IDs to strings (handles Excel's 5504763.0 -> "5504763")."""
+    text_mask = _string_mask(s)
+    numbers = pd.to_numeric(s.where(~text_mask), errors="coerce")
+    number_mask = numbers.notna() & ~text_mask
+
+    result = _strip_column(s).where(text_mask, None).astype(object)
+    if number_mask.any():
+        result[number_mask] = np.trunc(numbers[number_mask].astype(float)).astype("int64").astype(str)
+    other_mask = s.notna() & ~text_mask & ~number_mask
+    if other_mask.any():
+        result[other_mask] = s[other_mask].astype(str).str.strip()
+    return result.where(_present(result), None)
+
+
+def _date_column(s: pd.Series, label: str) -> pd.Series:
+    """Parses dates; values that cannot be parsed are logged and set to None."""
+    present = _present(s)
+    parsed = pd.to_datetime(s.where(present), errors="coerce", format="mixed")
+    failed = present & parsed.isna()
+    for row_number in s.index[failed]:
+        logger.warning(f"{label} row {row_number}: Could not parse date '{s[row_number]}'. Setting to None.")
+    return parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+
+def _log_missing(label: str, row_numbers: Iterable[int], required: Dict[str, pd.Series]) -> None:
+    """Logs one warning per skipped row naming the missing required fields."""
+    for row_number in row_numbers:
+        missing = [field for field, present in required.items() if not present[row_number]]
+        logger.warning(f"Skipping {label} row {row_number} due to missing required fields ({', '.join(missing)})")
+
+
+# --- Chunk normalizers ---
+# Each takes a chunk DataFrame indexed by Excel row number plus the sheet's
+# resolved columns, and returns (column dicts to insert, number of rows skipped).
+# Records are plain dicts (no ORM objects).
+
+def normalize_trainer_frame(df: pd.DataFrame, columns: Dict[str, List[str]]) -> Tuple[List[dict], int]:
+    """Validates a chunk of 'Trainers Details' rows."""
+    frame = pd.DataFrame({field: _strip_column(_column(df, columns[field])) for field in TRAINER_COLUMNS})
+
+    # Provide default for empty trainer_name (make it optional)
+    frame["trainer_name"] = frame["trainer_name"].where(_present(frame["trainer_name"]), "Not Assigned")
+
+    # Check only truly required fields (skill, competency, expertise_level are mandatory)
+    required = {field: _present(frame[field]) for field in ("skill", "competency", "expertise_level")}
+    valid = required["skill"] & required["competency"] & required["expertise_level"]
+    _log_missing("trainer", frame.index[~valid], required)
+    return frame[valid].to_dict("records"), int((~valid).sum())
+
+
+def normalize_training_frame(df: pd.DataFrame, columns: Dict[str, List[str]]) -> Tuple[List[dict], int]:
+    """
+    Validates a chunk of 'Training Details' rows and splits each row into one
+    record per trainer (the trainer and email cells may list several).
+    """
+    training_name = _text_column(_column(df, columns["training_name"]))
+    valid = _present(training_name)
+    _log_missing("training", training_name.index[~valid], {"trainingname_program": valid})
+
+    df = df[valid]
+    common = pd.DataFrame({
+        field: _column(df, columns[field])
+        for field in ("division", "department", "competency", "skill", "training_topics",
+                      "prerequisites", "skill_category", "time", "training_type", "assessment_details")
+    })
+    common["training_name"] = training_name[valid]
+    common["training_date"] = _date_column(_column(df, columns["training_date"]), "Training")
+    common["duration"] = _text_column(_column(df, columns["duration"]))
+    common["seats"] = _text_column(_column(df, columns["seats"]))
+    trainer_cells = _text_column(_column(df, columns["trainer_name"]))
+    email_cells = _text_column(_column(df, columns["email"]))
+
+    records = []
+    for row, trainer_str, email_str in zip(common.to_dict("records"), trainer_cells, email_cells):
+        # Split trainers by comma - handle multiple trainers
+        if trainer_str and trainer_str.lower() not in ("nan", "none"):
+            trainer_names = [t.strip() for t in trainer_str.split(',') if t.strip() and t.strip().lower() != "nan"]
+        else:
+            trainer_names = ["Not Assigned"]
+
+        # Split emails by comma, newline, or space and clean
+        email_list = []
+        if email_str and email_str.lower() not in ("nan", "none"):
+            # Try splitting by comma first (most common in Excel), then newline, then space
+            if ',' in email_str:
+                parts = email_str.split(',')
+            elif '\n' in email_str:
+                parts = email_str.split('\n')
             else:
-                trainer_names = ["Not Assigned"]
-            
-            # Split emails by comma, newline, or space and clean
-            email_list = []
-            email_str = ""  # Initialize to avoid scope issues
-            if email_val:
-                # Convert to string first to handle any pandas/Excel types
-                email_str = str(email_val).strip() if email_val else ""
-                if email_str and email_str.lower() != "nan" and email_str.lower() != "none":
-                    # Try splitting by comma first (most common in Excel), then newline, then space
-                    if ',' in email_str:
-                        email_list = [e.strip() for e in email_str.split(',') if e.strip() and '@' in e.strip() and e.strip().lower() != "nan"]
-                    elif '\n' in email_str:
-                        email_list = [e.strip() for e in email_str.split('\n') if e.strip() and '@' in e.strip() and e.strip().lower() != "nan"]
-                    else:
-                        # Split by space and filter for valid emails
-                        email_list = [e.strip() for e in email_str.split() if e.strip() and '@' in e.strip() and e.strip().lower() != "nan"]
+                parts = email_str.split()
+            email_list = [e.strip() for e in parts if e.strip() and '@' in e.strip() and e.strip().lower() != "nan"]
+
+        # Create one training record per trainer
+        for idx, trainer_name in enumerate(trainer_names):
+            # Match email with trainer index (1-to-1 matching)
+            if idx < len(email_list):
+                trainer_email = email_list[idx]
+            elif len(email_list) == 1:
+                # If only one email but multiple trainers, use the same email for all
+                trainer_email = email_list[0]
             else:
-                email_str = "None"
-            
-            # ALWAYS log splitting details for debugging (not just when multiple)
-            logging.info(f"🔍 Row {i+2} SPLITTING:")
-            logging.info(f"   Trainer string: {repr(trainer_str)}")
-            logging.info(f"   Split into {len(trainer_names)} trainer(s): {trainer_names}")
-            logging.info(f"   Email string: {repr(email_str)}")
-            logging.info(f"   Split into {len(email_list)} email(s): {email_list}")
-            
-            # Create one training record per trainer
-            for idx, trainer_name in enumerate(trainer_names):
-                # Match email with trainer index (1-to-1 matching)
-                if idx < len(email_list):
-                    trainer_email = email_list[idx]
-                elif len(email_list) == 1:
-                    # If only one email but multiple trainers, use the same email for all
-                    trainer_email = email_list[0]
-                else:
-                    trainer_email = None
-                
-                logging.info(f"Row {i+2}, Trainer {idx+1}/{len(trainer_names)}: '{trainer_name}' -> email: '{trainer_email}'")
-                
-                trainings_to_add.append(
-                    TrainingDetail(
-                        division=division_val,
-                        department=department_val,
-                        competency=competency_val,
-                        skill=skill_val,
-                        training_name=training_name_val,
-                        training_topics=training_topics_val,
-                        prerequisites=prerequisites_val,
-                        skill_category=skill_category_val,
-                        trainer_name=trainer_name,
-                        email=trainer_email,
-                        training_date=final_date,
-                        duration=duration_str,
-                        seats=seats_str,
-                        time=time_val,
-                        training_type=training_type_val,
-                        assessment_details=assessment_details_val,
-                    )
-                )
-            
-            if len(trainer_names) > 1:
-                logging.info(f"✅ Row {i+2}: Successfully split into {len(trainer_names)} separate training records")
-        
-        logging.info(f"-> Training validation complete: {len(trainings_to_add)} valid rows, {skipped_training_count} skipped.")
+                trainer_email = None
+            records.append({**row, "trainer_name": trainer_name, "email": trainer_email})
+    return records, int((~valid).sum())
 
-        # --- 3. Load Employee Competency ---
-        logging.info("Step 3.5: Reading 'Employee Competency' sheet from Excel...")
-        excel_file_source.seek(0)
-        competencies_to_add = []
-        skipped_competency_count = 0
-        
+
+def normalize_competency_frame(df: pd.DataFrame, columns: Dict[str, List[str]]) -> Tuple[List[dict], int]:
+    """Validates a chunk of 'Employee Competency' rows."""
+    frame = pd.DataFrame({
+        field: _strip_column(_column(df, columns[field]))
+        for field in COMPETENCY_COLUMNS if field not in ("employee_empid", "target_date")
+    })
+    frame["employee_empid"] = _empid_column(_column(df, columns["employee_empid"]))
+    # Handle target_date - convert from Excel date to Python date
+    frame["target_date"] = _date_column(_column(df, columns["target_date"]), "Employee Competency")
+
+    # Validate required fields
+    valid = _present(frame["employee_empid"])
+    _log_missing("Employee Competency", frame.index[~valid], {"employee_empid": valid})
+    return frame[valid].to_dict("records"), int((~valid).sum())
+
+
+def clean_header_name(name: Any) -> str:
+    """Standardizes a single header the same way clean_headers() does for a DataFrame."""
+    return (
+        str(name).strip()
+        .lower()
+        .replace(" ", "_")
+        .replace("/", "_")
+        .replace(",", "_")
+        .replace("*", "")
+    )
+
+
+# --- Row sources ---
+# Both yield chunk DataFrames with cleaned headers, indexed by Excel row number
+# (the header is row 1).
+
+def iter_dataframe_chunks(workbook: pd.ExcelFile, sheet_name: str, chunk_rows: int = EXCEL_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Reads the whole sheet into a DataFrame, then hands it out in chunks."""
+    df = clean_headers(workbook.parse(sheet_name))
+    df = df.loc[:, ~df.columns.duplicated()]
+    df.index = range(2, len(df) + 2)
+    logger.info(f"-> Found {len(df)} rows in '{sheet_name}'.")
+    logger.info(f"-> Column names after cleaning: {list(df.columns)}")
+    if len(df) > 0 and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("-> First 3 rows of data:")
+        for row_number, row in df.head(3).iterrows():
+            logger.debug(f"   Row {row_number}: {row.to_dict()}")
+
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def iter_sheet_chunks_streaming(workbook: Any, sheet_name: str, chunk_rows: int = EXCEL_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Streams a sheet of a read-only openpyxl workbook, holding at most chunk_rows
+    rows in memory. Headers are cleaned like clean_headers(); unnamed and
+    duplicate headers are named the way pandas would name them.
+    Fully empty rows are skipped.
+    """
+    rows = workbook[sheet_name].iter_rows(values_only=True)
+    header_row = next(rows, None)
+    if header_row is None:
+        logger.info(f"-> '{sheet_name}' is empty.")
+        return
+
+    headers, seen = [], {}
+    for idx, name in enumerate(header_row):
+        header = clean_header_name(name if name is not None else f"Unnamed: {idx}")
+        if header in seen:
+            seen[header] += 1
+            header = f"{header}.{seen[header]}"
+        else:
+            seen[header] = 0
+        headers.append(header)
+    width = len(headers)
+    logger.info(f"-> Streaming '{sheet_name}' in chunks of {chunk_rows} rows.")
+    logger.info(f"-> Column names after cleaning: {headers}")
+
+    chunk, row_numbers, row_number = [], [], 1
+    for values in rows:
+        row_number += 1
+        if all(v is None or (isinstance(v, str) and not v.strip()) for v in values):
+            continue
+        # read-only sheets may report ragged rows
+        chunk.append(tuple(values[:width]) + (None,) * (width - len(values)))
+        row_numbers.append(row_number)
+        if len(chunk) >= chunk_rows:
+            yield pd.DataFrame.from_records(chunk, columns=headers, index=row_numbers)
+            chunk, row_numbers = [], []
+    if chunk:
+        yield pd.DataFrame.from_records(chunk, columns=headers, index=row_numbers)
+
+
+def iter_sheet_chunks(workbook: Any, sheet_name: str, chunk_rows: int = EXCEL_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Chunks a sheet from either kind of workbook returned by open_workbook()."""
+    if isinstance(workbook, pd.ExcelFile):
+        return iter_dataframe_chunks(workbook, sheet_name, chunk_rows)
+    return iter_sheet_chunks_streaming(workbook, sheet_name, chunk_rows)
+
+
+# --- Parse stage ---
+# Reading and normalizing a sheet is CPU-bound pandas/openpyxl work. It runs in a
+# process pool so the event loop keeps serving requests; normalized chunks come
+# back through a bounded queue (which also keeps memory flat while streaming) and
+# only the database writes are awaited on the loop.
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_manager: Any = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn: forked children would inherit the event loop and pooled DB connections
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=IMPORT_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_logging,
+        )
+    return _parse_pool
+
+
+def _get_parse_manager() -> Any:
+    global _parse_manager
+    if _parse_manager is None:
+        _parse_manager = multiprocessing.get_context("spawn").Manager()
+    return _parse_manager
+
+
+def shutdown_parse_pool() -> None:
+    """Stops the parse worker processes; call from the application shutdown hook."""
+    global _parse_pool, _parse_manager
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+    if _parse_manager is not None:
+        _parse_manager.shutdown()
+        _parse_manager = None
+
+
+def _portable_source(source: Any) -> Any:
+    """Path or bytes of an upload, so it can be handed to a worker process."""
+    if isinstance(source, (str, bytes)):
+        return source
+    if isinstance(source, os.PathLike):
+        return os.fspath(source)
+    source.seek(0)
+    return source.read()
+
+
+def _local_source(source: Any) -> Any:
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def check_sheets(available_sheets: List[str], required_sheets=()) -> None:
+    """
+    Raises:
+        ValueError: If a required sheet is missing (message lists the available sheets)
+    """
+    missing_sheets = [name for name in required_sheets if name not in available_sheets]
+    if missing_sheets:
+        missing = "', '".join(missing_sheets)
+        logger.error(f"Sheet '{missing}' not found! Available sheets: {available_sheets}")
+        raise ValueError(f"Sheet '{missing}' not found. Available sheets: {available_sheets}")
+
+
+def read_sheet_names(source: Any) -> List[str]:
+    """Sheet names of a workbook (read-only open, no cell data is loaded)."""
+    workbook = load_workbook(_local_source(source), read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def parse_sheet(source: Any, sheet_name: str, streaming: bool, spec: Dict[str, List[list]],
+                normalize: Callable, chunk_rows: int = EXCEL_CHUNK_ROWS) -> Iterator[Tuple[str, Any]]:
+    """
+    Reads and normalizes one sheet.
+
+    Yields:
+        ("columns", resolved column map) once, then ("chunk", (records, rows skipped, rows read))
+    """
+    workbook = open_workbook(_local_source(source), streaming=streaming)
+    try:
+        columns = None
+        for chunk in iter_sheet_chunks(workbook, sheet_name, chunk_rows):
+            if columns is None:
+                columns = resolve_columns(chunk.columns, spec)
+                yield "columns", columns
+            records, skipped = normalize(chunk, columns)
+            yield "chunk", (records, skipped, len(chunk))
+    finally:
+        workbook.close()
+
+
+class _ParseCancelled(Exception):
+    pass
+
+
+def _put(out: Any, stop: Any, item: Tuple[str, Any]) -> None:
+    """Blocks while the queue is full; gives up once the consumer has gone away."""
+    while True:
         try:
-            df_competency_raw = pd.read_excel(excel_file_source, sheet_name="Employee Competency", engine='openpyxl')
-        except ValueError as e:
-            # List available sheets if the sheet name is wrong
-            excel_file_source.seek(0)
-            xl_file = pd.ExcelFile(excel_file_source, engine='openpyxl')
-            available_sheets = xl_file.sheet_names
-            logging.warning(f"Sheet 'Employee Competency' not found! Available sheets: {available_sheets}")
-            logging.warning("-> Continuing without Employee Competency data...")
-            df_competency_raw = None
-        
-        if df_competency_raw is not None:
-            logging.info(f"-> Original column names (before cleaning): {list(df_competency_raw.columns)}")
-            
-            df_competency = df_competency_raw.replace({np.nan: None})
-            df_competency = clean_headers(df_competency)
-            logging.info(f"-> Found {len(df_competency)} rows in 'Employee Competency'.")
-            logging.info(f"-> Column names after cleaning: {list(df_competency.columns)}")
-            
-            # Show first few rows
-            if len(df_competency) > 0:
-                logging.info("-> First 3 rows of data:")
-                for idx in range(min(3, len(df_competency))):
-                    logging.info(f"   Row {idx+2}: {df_competency.iloc[idx].to_dict()}")
-            
-            for i, row in df_competency.iterrows():
-                try:
-                    # Map Excel columns to database columns using flexible matching
-                    row_dict = row.to_dict()
-                    
-                    employee_empid = find_column_flexible(row_dict, ['employee_id', 'employeeid', 'empid', 'employee_empid'])
-                    if employee_empid:
-                        # Convert float to int then to string (handles Excel's 5504763.0 -> "5504763")
-                        if isinstance(employee_empid, float):
-                            employee_empid = str(int(employee_empid))
-                        else:
-                            employee_empid = str(employee_empid).strip()
-                    else:
-                        employee_empid = None
-                    
-                    employee_name = find_column_flexible(row_dict, ['employee_name', 'employeename', 'employee name', 'name'])
-                    if employee_name and isinstance(employee_name, str):
-                        employee_name = employee_name.strip()
-                    
-                    division = find_column_flexible(row_dict, ['division'])
-                    if division and isinstance(division, str):
-                        division = division.strip()
-                    
-                    department = find_column_flexible(row_dict, ['department'])
-                    if department and isinstance(department, str):
-                        department = department.strip()
-                    
-                    project = find_column_flexible(row_dict, ['project'])
-                    if project and isinstance(project, str):
-                        project = project.strip()
-                    
-                    role_specific_comp = find_column_flexible(row_dict, ['role_specific_competency_(mhs)', 'role_specific_competency', 'role_specific_comp', 'role specific competency (mhs)'])
-                    if role_specific_comp and isinstance(role_specific_comp, str):
-                        role_specific_comp = role_specific_comp.strip()
-                    
-                    destination = find_column_flexible(row_dict, ['designation', 'destination', 'desination'])
-                    if destination and isinstance(destination, str):
-                        destination = destination.strip()
-                    
-                    competency = find_column_flexible(row_dict, ['competency', 'competence'])
-                    if competency and isinstance(competency, str):
-                        competency = competency.strip()
-                    
-                    skill = find_column_flexible(row_dict, ['skill'])
-                    if skill and isinstance(skill, str):
-                        skill = skill.strip()
-                    
-                    current_expertise = find_column_flexible(row_dict, ['current_expertise_level', 'current_expertise', 'current expertise level', 'current expertise'])
-                    if current_expertise and isinstance(current_expertise, str):
-                        current_expertise = current_expertise.strip()
-                    
-                    target_expertise = find_column_flexible(row_dict, ['target_expertise_level', 'target_expertise', 'target expertise level', 'target expertise'])
-                    if target_expertise and isinstance(target_expertise, str):
-                        target_expertise = target_expertise.strip()
-                    
-                    comments = find_column_flexible(row_dict, ['comments', 'comment'])
-                    if comments and isinstance(comments, str):
-                        comments = comments.strip()
-                    
-                    # Handle target_date - convert from Excel date to Python date
-                    target_date = find_column_flexible(row_dict, ['target_date', 'target date'])
-                    try:
-                        final_target_date = pd.to_datetime(target_date).date() if pd.notna(target_date) and target_date else None
-                    except Exception:
-                        final_target_date = None
-                    
-                    # Validate required fields
-                    if not employee_empid:
-                        skipped_competency_count += 1
-                        logging.warning(f"Skipping Employee Competency row {i+2} due to missing employee_empid")
-                        continue
-                    
-                    # Create EmployeeCompetency object
-                    competencies_to_add.append(
-                        EmployeeCompetency(
-                            employee_empid=employee_empid,
-                            employee_name=employee_name,
-                            department=department,
-                            division=division,
-                            project=project,
-                            role_specific_comp=role_specific_comp,
-                            destination=destination,
-                            competency=competency,
-                            skill=skill,
-                            current_expertise=current_expertise,
-                            target_expertise=target_expertise,
-                            comments=comments,
-                            target_date=final_target_date
-                        )
-                    )
-                    
-                    if i < 3:  # Log first 3 successful rows
-                        logging.info(f"✅ Employee Competency row {i+2} added: employee={employee_empid} ({employee_name}), skill={skill}, competency={competency}")
-                        
-                except Exception as row_error:
-                    skipped_competency_count += 1
-                    logging.warning(f"Skipping Employee Competency row {i+2} due to error: {row_error}")
-                    continue
-            
-            logging.info(f"-> Employee Competency validation complete: {len(competencies_to_add)} valid rows, {skipped_competency_count} skipped.")
+            out.put(item, timeout=1)
+            return
+        except queue.Full:
+            if stop.is_set():
+                raise _ParseCancelled()
+
+
+def _parse_sheet_worker(source: Any, sheet_name: str, streaming: bool, spec: Dict[str, List[list]],
+                        normalize: Callable, chunk_rows: int, out: Any, stop: Any) -> None:
+    """Worker-process entry point: pumps parse_sheet() output into the queue."""
+    try:
+        for item in parse_sheet(source, sheet_name, streaming, spec, normalize, chunk_rows):
+            _put(out, stop, item)
+        _put(out, stop, ("done", None))
+    except _ParseCancelled:
+        pass
+    except Exception as error:
+        _put(out, stop, ("error", error))
+
+
+async def run_parse(func: Callable, *args) -> Any:
+    """Runs one parse-stage function in the process pool (inline when IMPORT_PARSE_WORKERS=0)."""
+    if IMPORT_PARSE_WORKERS <= 0:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(_get_parse_pool(), func, *args)
+
+
+def _start_sheet_parse(source: Any, sheet_name: str, streaming: bool, spec: Dict[str, List[list]],
+                       normalize: Callable) -> Tuple[Any, Any, asyncio.Future]:
+    """Submits parse_sheet() to the process pool; returns (output queue, stop event, worker future)."""
+    manager = _get_parse_manager()
+    # A DataFrame-mode worker already holds its whole sheet, so it may run to the end
+    # while the writer is busy with another sheet; streaming keeps the bound (flat memory)
+    maxsize = IMPORT_PARSE_QUEUE_CHUNKS if streaming else 0
+    out, stop = manager.Queue(maxsize=maxsize), manager.Event()
+    worker = asyncio.get_running_loop().run_in_executor(
+        _get_parse_pool(), _parse_sheet_worker, source, sheet_name, streaming,
+        spec, normalize, EXCEL_CHUNK_ROWS, out, stop)
+    return out, stop, worker
+
+
+def _poll_queue(out: Any, timeout: float) -> Optional[Tuple[str, Any]]:
+    """Next item from a parse worker's queue, or None if nothing arrived within timeout."""
+    try:
+        return out.get(timeout=timeout) if timeout > 0 else out.get_nowait()
+    except queue.Empty:
+        return None
+
+
+async def _drain_sheet_parse(out: Any, worker: asyncio.Future) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Yields a started parse's output until it reports done (or re-raises its error).
+    The queue is polled so a worker that dies without posting its sentinel (killed
+    process, unpicklable error) fails the import instead of hanging it.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await loop.run_in_executor(None, _poll_queue, out, _PARSE_POLL_SECONDS)
+        if item is None:
+            if not worker.done():
+                continue
+            # The worker has ended; anything it queued before that is already in the queue
+            item = await loop.run_in_executor(None, _poll_queue, out, 0)
+            if item is None:
+                if not worker.cancelled() and worker.exception() is not None:
+                    raise worker.exception()
+                raise RuntimeError("Parse worker ended without reporting its result")
+        kind, payload = item
+        if kind == "done":
+            break
+        if kind == "error":
+            raise payload
+        yield kind, payload
+    await worker
+
+
+async def parse_sheet_async(source: Any, sheet_name: str, streaming: bool, spec: Dict[str, List[list]],
+                            normalize: Callable) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    parse_sheet() running in the process pool. The worker stays at most
+    IMPORT_PARSE_QUEUE_CHUNKS chunks ahead of the consumer when streaming.
+
+    Args:
+        source: Path or bytes (see _portable_source)
+    """
+    if IMPORT_PARSE_WORKERS <= 0:
+        for item in parse_sheet(source, sheet_name, streaming, spec, normalize):
+            yield item
+        return
+
+    out, stop, worker = _start_sheet_parse(source, sheet_name, streaming, spec, normalize)
+    try:
+        async for item in _drain_sheet_parse(out, worker):
+            yield item
+    finally:
+        # Lets a worker blocked on a full queue exit if we stopped early
+        stop.set()
+
+
+@asynccontextmanager
+async def parse_sheets_parallel(source: Any, streaming: bool,
+                                sheets: Dict[str, Tuple[Dict[str, List[list]], Callable]]
+                                ) -> AsyncIterator[Dict[str, AsyncIterator[Tuple[str, Any]]]]:
+    """
+    Starts parsing several sheets at once, one worker process per sheet, and
+    yields {sheet name: output iterator}. The caller drains the iterators in
+    whatever order its inserts need (e.g. foreign-key order) while the other
+    sheets keep parsing; with IMPORT_PARSE_WORKERS below the sheet count the
+    remaining sheets wait for a free worker.
+
+    Args:
+        source: Path or bytes (see _portable_source)
+        sheets: Sheet name -> (column spec, normalize function)
+    """
+    if IMPORT_PARSE_WORKERS <= 0:
+        yield {name: parse_sheet_async(source, name, streaming, spec, normalize)
+               for name, (spec, normalize) in sheets.items()}
+        return
+
+    started = {name: _start_sheet_parse(source, name, streaming, spec, normalize)
+               for name, (spec, normalize) in sheets.items()}
+    try:
+        yield {name: _drain_sheet_parse(out, worker) for name, (out, _, worker) in started.items()}
+    finally:
+        # Workers of sheets that were not (fully) consumed stop at their next blocked put
+        for _, stop, _ in started.values():
+            stop.set()
+
+
+async def _load_sheet_rows(db: AsyncSession, parsed: AsyncIterator[Tuple[str, Any]], target: Any,
+                           label: str, assign_ids: bool = False) -> Tuple[int, int]:
+    """
+    Bulk-inserts normalized chunks as they arrive from the parse stage (see
+    app/bulk_load.py), so neither ORM objects nor the session grow with the sheet.
+
+    Args:
+        parsed: Output of parse_sheet_async()
+        target: Model to insert into, or a merge staging table
+        assign_ids: Give the rows IDs 1..N in sheet order (the table must be empty;
+            follow with _sync_id_sequence())
+
+    Returns:
+        tuple: (records inserted, rows skipped)
+    """
+    inserted = skipped = 0
+    async for kind, payload in parsed:
+        if kind == "columns":
+            logger.info(f"-> {label} column mapping: {payload}")
+            unresolved = [field for field, names in payload.items() if not names]
+            if unresolved:
+                logger.warning(f"-> {label}: no column found for {unresolved}")
+            continue
+
+        records, chunk_skipped, chunk_rows = payload
+        skipped += chunk_skipped
+        if assign_ids:
+            for offset, record in enumerate(records, start=inserted + 1):
+                record["id"] = offset
+        chunk_inserted = await bulk_insert(db, target, records)
+        inserted += chunk_inserted
+        report_progress(stage=label, parsed=chunk_rows, validated=chunk_rows - chunk_skipped,
+                        inserted=chunk_inserted, skipped=chunk_skipped)
+        logger.info(f"-> {label}: {inserted} records written, {skipped} rows skipped so far")
+    return inserted, skipped
+
+
+async def _sync_id_sequence(db: AsyncSession, model: Any, last_id: int) -> None:
+    """Moves the table's ID sequence past explicitly assigned IDs 1..last_id (next ID is last_id + 1)."""
+    await db.execute(
+        text("SELECT setval(pg_get_serial_sequence(:table_name, 'id'), :value, :is_called)"),
+        {"table_name": model.__tablename__, "value": max(last_id, 1), "is_called": last_id > 0},
+    )
+
 
-        # --- 4. Add all objects to the session ---
-        logging.info(f"Step 4: Preparing to add {len(trainers_to_add)} trainers, {len(trainings_to_add)} trainings, and {len(competencies_to_add)} employee competencies to the database session.")
-        if trainers_to_add:
-            db.add_all(trainers_to_add)
-            logging.info(f"✅ Added {len(trainers_to_add)} trainer records to session.")
+# --- Merge mode ---
+# mode="merge" loads the upload into temporary staging tables, matches staged rows
+# to existing rows by natural key, and applies only the differences. IDs of
+# matched rows are kept, so assignments, requests and submissions survive a refresh.
+
+MODE_REPLACE = "replace"
+MODE_MERGE = "merge"
+
+# Natural keys per table. Keys may repeat (e.g. the same trainer listed twice);
+# the n-th occurrence in the upload matches the n-th existing row by id.
+MERGE_KEYS = {
+    Trainer: ("skill", "competency", "trainer_name", "expertise_level"),
+    # The session date is part of the key: a rescheduled session is a new training
+    TrainingDetail: ("training_name", "trainer_name", "training_date"),
+    EmployeeCompetency: ("employee_empid", "competency", "skill"),
+}
+
+# Sheet each table is loaded from
+SHEET_MODELS = {
+    Trainer: TRAINERS_SHEET,
+    TrainingDetail: TRAININGS_SHEET,
+    EmployeeCompetency: COMPETENCY_SHEET,
+}
+
+# Tables referencing training_details.id, in foreign-key delete order: cleared
+# entirely by a replace and for removed trainings by a merge (training_trainers cascades)
+TRAINING_DEPENDENT_TABLES = (
+    "assignment_submissions",
+    "feedback_submissions",
+    "shared_assignments",
+    "shared_feedback",
+    "training_requests",
+    "training_assignments",
+    "training_attendance",
+    "manager_performance_feedback",
+)
+
+
+async def _create_staging_table(db: AsyncSession, model: Any) -> Table:
+    """
+    Creates a temporary table (dropped on commit) with the model's non-key
+    columns plus row_order, which numbers rows in upload order.
+    """
+    staging = Table(
+        f"staging_{model.__tablename__}",
+        MetaData(),
+        Column("row_order", BigInteger, Identity()),
+        *(Column(column.name, column.type) for column in model.__table__.columns if not column.primary_key),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+    connection = await db.connection()
+    await connection.run_sync(staging.create)
+    return staging
+
+
+async def _merge_staged_rows(db: AsyncSession, model: Any, staging: Table) -> Tuple[Dict[str, int], List[int]]:
+    """
+    Applies the difference between a staging table and the model's table.
+
+    Returns:
+        tuple: (counts of inserted/updated/deleted/unchanged rows, IDs of inserted rows)
+    """
+    table = model.__tablename__
+    keys = MERGE_KEYS[model]
+    values = [column.name for column in model.__table__.columns
+              if not column.primary_key and column.name not in keys]
+    match = f"merge_{table}"
+
+    def keyed(alias: str, order_by: str) -> str:
+        # Null-safe, hashable key columns plus the occurrence number of each key
+        key_columns = [f"COALESCE({alias}.{key}::text, '')" for key in keys]
+        return (
+            ", ".join(f"{expr} AS k_{key}" for expr, key in zip(key_columns, keys))
+            + f", ROW_NUMBER() OVER (PARTITION BY {', '.join(key_columns)} ORDER BY {alias}.{order_by}) AS occ"
+        )
+
+    join_keys = " AND ".join([f"s.k_{key} = t.k_{key}" for key in keys] + ["s.occ = t.occ"])
+    await db.execute(text(f"""
+        CREATE TEMPORARY TABLE {match} ON COMMIT DROP AS
+        SELECT s.row_order, t.id
+        FROM (SELECT x.row_order, {keyed('x', 'row_order')} FROM {staging.name} x) s
+        FULL JOIN (SELECT x.id, {keyed('x', 'id')} FROM {table} x) t ON {join_keys}
+    """))
+
+    matched = (await db.execute(text(
+        f"SELECT COUNT(*) FROM {match} WHERE row_order IS NOT NULL AND id IS NOT NULL"))).scalar()
+
+    removed = f"SELECT id FROM {match} WHERE row_order IS NULL"
+    if model is TrainingDetail:
+        for dependent in TRAINING_DEPENDENT_TABLES:
+            await db.execute(text(f"DELETE FROM {dependent} WHERE training_id IN ({removed})"))
+    deleted = (await db.execute(text(f"DELETE FROM {table} WHERE id IN ({removed})"))).rowcount
+
+    updated = 0
+    if values:
+        updated = (await db.execute(text(f"""
+            UPDATE {table} t
+            SET {', '.join(f'{value} = s.{value}' for value in values)}
+            FROM {match} m JOIN {staging.name} s ON s.row_order = m.row_order
+            WHERE t.id = m.id
+              AND ({' OR '.join(f't.{value} IS DISTINCT FROM s.{value}' for value in values)})
+        """))).rowcount
+
+    columns = ", ".join(list(keys) + values)
+    inserted_ids = (await db.execute(text(f"""
+        INSERT INTO {table} ({columns})
+        SELECT {', '.join(f's.{column}' for column in list(keys) + values)}
+        FROM {staging.name} s JOIN {match} m ON m.row_order = s.row_order
+        WHERE m.id IS NULL
+        ORDER BY s.row_order
+        RETURNING id
+    """))).scalars().all()
+
+    counts = {
+        "inserted": len(inserted_ids),
+        "updated": updated,
+        "deleted": deleted,
+        "unchanged": matched - updated,
+    }
+    logger.info(f"-> Merged {table}: {counts}")
+    return counts, list(inserted_ids)
+
+
+def _should_stream(excel_file_source: Any, stream: Optional[bool]) -> bool:
+    """Streams when asked to, or (stream=None) when the upload is at least EXCEL_STREAM_MIN_BYTES."""
+    if stream is not None:
+        return stream
+    try:
+        if hasattr(excel_file_source, "seek"):
+            excel_file_source.seek(0, 2)
+            size = excel_file_source.tell()
+            excel_file_source.seek(0)
         else:
-            logging.warning("⚠️ No trainer records to add - all rows were skipped!")
-        
-        if trainings_to_add:
-            db.add_all(trainings_to_add)
-            logging.info(f"✅ Added {len(trainings_to_add)} training records to session.")
+            size = os.path.getsize(excel_file_source)
+    except (OSError, TypeError, ValueError):
+        return False
+    return size >= EXCEL_STREAM_MIN_BYTES
+
+
+async def load_all_from_excel(excel_file_source: Any, db: AsyncSession, stream: Optional[bool] = None,
+                              mode: str = MODE_REPLACE, force: bool = False) -> Dict[str, Any]:
+    """
+    Loads all data from a given Excel file source in a single, safe transaction.
+    Loads three sheets: "Trainers Details", "Training Details", and "Employee Competency"
+
+    Args:
+        excel_file_source: Path or file-like object of the .xlsx upload
+        db: Database session
+        stream: True to read rows lazily (openpyxl read-only), False to parse each
+            sheet into a DataFrame, None to decide by file size (EXCEL_STREAM_MIN_BYTES).
+            Both modes flush rows to the database every EXCEL_CHUNK_ROWS rows.
+        mode: "replace" clears the tables (and all training activity) and reloads them;
+            "merge" applies only the inserts, updates and deletes needed to match the
+            upload (see MERGE_KEYS). A sheet missing from the upload is left untouched in merge mode.
+        force: Re-apply sheets whose content hash matches the last applied upload
+            (by default they are skipped, see app/upload_hashes.py)
+
+    Returns:
+        dict: Change summary per sheet, e.g. {"mode": "merge", "trainings": {"inserted": 3, ...}},
+            plus "skipped_sheets" (sheets left untouched because their content is unchanged)
+
+    Raises:
+        ValueError: Unknown mode, missing sheets, or no valid rows
+    """
+    if mode not in (MODE_REPLACE, MODE_MERGE):
+        raise ValueError(f"Unknown refresh mode '{mode}'. Use '{MODE_REPLACE}' or '{MODE_MERGE}'.")
+    logger.info(f"--- Starting Excel data load (All 3 sheets: Trainers Details, Training Details, Employee Competency), mode={mode} ---")
+    try:
+        # Open the workbook once and validate sheet names before clearing anything
+        streaming = _should_stream(excel_file_source, stream)
+        logger.info(f"Step 0: Opening workbook and checking sheet names ({'streaming' if streaming else 'DataFrame'} mode)...")
+        source = _portable_source(excel_file_source)
+        sheet_names = await run_parse(read_sheet_names, source)
+        check_sheets(sheet_names, (TRAINERS_SHEET, TRAININGS_SHEET))
+        has_competency_sheet = COMPETENCY_SHEET in sheet_names
+        logger.info(f"-> Sheets found: {sheet_names}")
+
+        # Content hashes: sheets identical to the last applied upload are skipped.
+        # A byte-identical workbook reuses the recorded sheet hashes without reading them.
+        all_sheets = (TRAINERS_SHEET, TRAININGS_SHEET, COMPETENCY_SHEET)
+        present_sheets = [name for name in all_sheets if name in sheet_names]
+        workbook_hash = await run_parse(file_content_hash, source)
+        applied = await get_applied_hashes(db, [file_key(WORKBOOK_FILE)] + [sheet_key(name) for name in all_sheets])
+        if is_unchanged(applied, file_key(WORKBOOK_FILE), workbook_hash, force):
+            sheet_hashes = {name: applied.get(sheet_key(name)) for name in present_sheets}
         else:
-            logging.warning("⚠️ No training records to add - all rows were skipped!")
-        
-        if competencies_to_add:
-            db.add_all(competencies_to_add)
-            logging.info(f"✅ Added {len(competencies_to_add)} employee competency records to session.")
+            # One worker process per sheet, like the parse stage
+            sheet_hashes = dict(zip(present_sheets, await asyncio.gather(
+                *(run_parse(sheet_content_hash, source, name) for name in present_sheets))))
+        if mode == MODE_REPLACE and not has_competency_sheet:
+            # Replace clears the table of a missing sheet; remember that it is empty
+            sheet_hashes[COMPETENCY_SHEET] = MISSING_SHEET_HASH
+        skipped_sheets = [name for name, sheet_hash in sheet_hashes.items()
+                          if is_unchanged(applied, sheet_key(name), sheet_hash, force)]
+        changed_sheets = [name for name in sheet_hashes if name not in skipped_sheets]
+        if skipped_sheets:
+            logger.info(f"-> Unchanged since the last upload, skipping: {skipped_sheets}")
+        if not changed_sheets:
+            logger.info("✅ All sheets match the last applied upload; nothing to do.")
+            return {"mode": mode, "unchanged": True, "skipped_sheets": skipped_sheets,
+                    "trainers": {"inserted": 0, "skipped": 0},
+                    "trainings": {"inserted": 0, "skipped": 0},
+                    "employee_competencies": {"inserted": 0, "skipped": 0}}
+        load_trainers = TRAINERS_SHEET in changed_sheets
+        load_trainings = TRAININGS_SHEET in changed_sheets
+        load_competency = COMPETENCY_SHEET in changed_sheets
+
+        if mode == MODE_REPLACE:
+            targets = {model: model for model in MERGE_KEYS}
+            logger.info(f"Step 1: Clearing old data from tables of changed sheets {changed_sheets}...")
+            # Delete in order to respect foreign key constraints:
+            if load_trainings:
+                # 1-2. Delete every table that references training_details (same list as merge)
+                for dependent in TRAINING_DEPENDENT_TABLES:
+                    await db.execute(text(f"DELETE FROM {dependent}"))
+                await db.execute(text("DELETE FROM training_trainers"))
+                # 3. Now safe to delete training_details
+                await db.execute(text("DELETE FROM training_details"))
+            if load_competency:
+                # 4. Delete employee_competency (no dependencies on training_details)
+                await db.execute(text("DELETE FROM employee_competency"))
+            if load_trainers:
+                # 5. Finally delete trainers (no dependencies)
+                await db.execute(text("DELETE FROM trainers"))
+            logger.info("-> Old data cleared successfully.")
+            # Reloaded tables get IDs 1..N assigned during the bulk insert and their
+            # sequences are moved past them (no renumbering pass after commit)
         else:
-            logging.warning("⚠️ No employee competency records to add - all rows were skipped or sheet not found!")
-        
+            # Upload is staged first and diffed against the tables after all sheets are read
+            logger.info("Step 1: Creating staging tables for merge...")
+            targets = {model: await _create_staging_table(db, model)
+                       for model, sheet in SHEET_MODELS.items() if sheet in changed_sheets}
+
+        # --- 1-3. Parse all sheets in parallel, insert in foreign-key order ---
+        # Each sheet is parsed and normalized in its own worker process; this single
+        # writer drains them trainers -> trainings -> competency, bulk-inserting chunks
+        # as they arrive, while the sheets it has not reached yet keep parsing
+        sheets = {TRAINERS_SHEET: (TRAINER_COLUMNS, normalize_trainer_frame),
+                  TRAININGS_SHEET: (TRAINING_COLUMNS, normalize_training_frame),
+                  COMPETENCY_SHEET: (COMPETENCY_COLUMNS, normalize_competency_frame)}
+        sheets = {name: parser for name, parser in sheets.items()
+                  if name in changed_sheets and name in sheet_names}
+        logger.info(f"-> Parsing {len(sheets)} sheets in parallel worker processes...")
+        assign_ids = mode == MODE_REPLACE
+        async with parse_sheets_parallel(source, streaming, sheets) as parsed:
+            # --- 1. Load Trainers Details ---
+            trainers_added, skipped_count = 0, 0
+            if load_trainers:
+                logger.info("Step 2: Writing 'Trainers Details' rows...")
+                trainers_added, skipped_count = await _load_sheet_rows(
+                    db, parsed[TRAINERS_SHEET], targets[Trainer], "Trainer", assign_ids=assign_ids)
+                logger.info(f"-> Trainer validation complete: {trainers_added} valid rows, {skipped_count} skipped.")
+
+            # --- 2. Load Training Details ---
+            trainings_added, skipped_training_count = 0, 0
+            if load_trainings:
+                logger.info("Step 3: Writing 'Training Details' rows...")
+                trainings_added, skipped_training_count = await _load_sheet_rows(
+                    db, parsed[TRAININGS_SHEET], targets[TrainingDetail], "Training", assign_ids=assign_ids)
+                logger.info(f"-> Training validation complete: {trainings_added} valid rows, {skipped_training_count} skipped.")
+
+            # --- 3. Load Employee Competency ---
+            competencies_added, skipped_competency_count = 0, 0
+            if load_competency and has_competency_sheet:
+                logger.info("Step 3.5: Writing 'Employee Competency' rows...")
+                competencies_added, skipped_competency_count = await _load_sheet_rows(
+                    db, parsed[COMPETENCY_SHEET], targets[EmployeeCompetency], "Employee Competency",
+                    assign_ids=assign_ids)
+                logger.info(f"-> Employee Competency validation complete: {competencies_added} valid rows, {skipped_competency_count} skipped.")
+            elif not has_competency_sheet:
+                logger.warning(f"Sheet 'Employee Competency' not found! Available sheets: {sheet_names}")
+                logger.warning("-> Continuing without Employee Competency data...")
+
+        # --- 4. Summary ---
+        if load_trainers and not trainers_added:
+            logger.warning("⚠️ No trainer records to add - all rows were skipped!")
+        if load_trainings and not trainings_added:
+            logger.warning("⚠️ No training records to add - all rows were skipped!")
+        if load_competency and not competencies_added:
+            logger.warning("⚠️ No employee competency records to add - all rows were skipped or sheet not found!")
+
         # Final summary
-        logging.info("=" * 80)
-        logging.info("📊 FINAL SUMMARY:")
-        logging.info(f"   Trainers: {len(trainers_to_add)} valid rows, {skipped_count} skipped")
-        logging.info(f"   Trainings: {len(trainings_to_add)} valid rows, {skipped_training_count} skipped")
-        logging.info(f"   Employee Competencies: {len(competencies_to_add)} valid rows, {skipped_competency_count} skipped")
-        logging.info(f"   Total rows to insert: {len(trainers_to_add) + len(trainings_to_add) + len(competencies_to_add)}")
-        logging.info("=" * 80)
-        
-        if not trainers_to_add and not trainings_to_add and not competencies_to_add:
-            logging.error("❌ CRITICAL: No data to insert! All rows were skipped.")
-            logging.error("   Possible reasons:")
-            logging.error("   1. Column names in Excel don't match expected names")
-            logging.error("   2. All rows have empty required fields")
-            logging.error("   3. Sheet names are incorrect (should be 'Trainers Details', 'Training Details', and 'Employee Competency')")
-            logging.error("   Check the logs above for detailed information about skipped rows.")
+        logger.info("=" * 80)
+        logger.info("📊 FINAL SUMMARY:")
+        logger.info(f"   Trainers: {trainers_added} valid rows, {skipped_count} skipped")
+        logger.info(f"   Trainings: {trainings_added} valid rows, {skipped_training_count} skipped")
+        logger.info(f"   Employee Competencies: {competencies_added} valid rows, {skipped_competency_count} skipped")
+        logger.info(f"   Total rows inserted: {trainers_added + trainings_added + competencies_added}")
+        logger.info("=" * 80)
+
+        if sheets and not trainers_added and not trainings_added and not competencies_added:
+            logger.error("❌ CRITICAL: No data to insert! All rows were skipped.")
+            logger.error("   Possible reasons:")
+            logger.error("   1. Column names in Excel don't match expected names")
+            logger.error("   2. All rows have empty required fields")
+            logger.error("   3. Sheet names are incorrect (should be 'Trainers Details', 'Training Details', and 'Employee Competency')")
+            logger.error("   Check the logs above for detailed information about skipped rows.")
             raise ValueError("No valid data found in Excel file. All rows were skipped during validation.")
 
-        logging.info("-> Data added to session successfully.")
+        logger.info("-> Data flushed to the database successfully.")
+
+        if mode == MODE_REPLACE:
+            # IDs were assigned during the insert; continue the sequences after them
+            for model, loaded, added in ((Trainer, load_trainers, trainers_added),
+                                         (TrainingDetail, load_trainings, trainings_added),
+                                         (EmployeeCompetency, load_competency, competencies_added)):
+                if loaded:
+                    await _sync_id_sequence(db, model, added)
+
+        summary = {
+            "mode": mode,
+            "unchanged": False,
+            "skipped_sheets": skipped_sheets,
+            "trainers": {"inserted": trainers_added, "skipped": skipped_count},
+            "trainings": {"inserted": trainings_added, "skipped": skipped_training_count},
+            "employee_competencies": {"inserted": competencies_added, "skipped": skipped_competency_count},
+        }
+        if mode == MODE_MERGE:
+            logger.info("Step 4.5: Applying changes against the current tables...")
+            if load_trainers:
+                summary["trainers"].update((await _merge_staged_rows(db, Trainer, targets[Trainer]))[0])
+            if load_trainings:
+                training_changes, new_training_ids = await _merge_staged_rows(db, TrainingDetail, targets[TrainingDetail])
+                summary["trainings"].update(training_changes)
+                # Kept trainings keep their trainer rows (trainer_name is part of the key);
+                # removed ones cascade, so only new trainings need resolving
+                await rebuild_training_trainers(db, new_training_ids)
+            if load_competency:
+                summary["employee_competencies"].update(
+                    (await _merge_staged_rows(db, EmployeeCompetency, targets[EmployeeCompetency]))[0])
+        elif load_trainings:
+            # Resolve free-text trainer names to usernames once, in the same transaction
+            await rebuild_training_trainers(db)
+
+        # Remember what the tables now hold. The workbook hash is only kept when the
+        # upload has every sheet, so a byte-identical upload can be skipped unread.
+        applied_hashes = {sheet_key(name): sheet_hashes[name] for name in changed_sheets}
+        applied_hashes[file_key(WORKBOOK_FILE)] = workbook_hash if len(present_sheets) == len(all_sheets) else None
+        await record_hashes(db, applied_hashes)
 
         # --- 5. Commit the transaction ---
-        logging.info("Step 5: Committing transaction to the database...")
+        logger.info("Step 5: Committing transaction to the database...")
         try:
             await db.commit()
-            logging.info(f"✅ COMMIT SUCCESSFUL! Database updated: {len(trainers_to_add)} trainers, {len(trainings_to_add)} trainings, {len(competencies_to_add)} employee competencies.")
+            if load_trainings:
+                invalidate_trainer_index()
+                # Shared assignments / feedback may have been cleared with their trainings
+                invalidate_shared_content()
+            logger.info(f"✅ COMMIT SUCCESSFUL! Database updated: {summary}")
             
             # Verify the data was actually inserted
             from sqlalchemy import select, func
@@ -711,156 +1151,116 @@ async def load_all_from_excel(excel_file_source: Any, db: AsyncSession):
             competencies_count_result = await db.execute(select(func.count(EmployeeCompetency.id)))
             competencies_count = competencies_count_result.scalar()
             
-            logging.info(f"✅ VERIFICATION: Database now contains {trainers_count} trainers, {trainings_count} trainings, and {competencies_count} employee competencies.")
+            logger.info(f"✅ VERIFICATION: Database now contains {trainers_count} trainers, {trainings_count} trainings, and {competencies_count} employee competencies.")
             
             if trainers_count == 0 and trainings_count == 0 and competencies_count == 0:
-                logging.error("⚠️ WARNING: Commit succeeded but no data found in database! Possible transaction rollback.")
-            
-            # Verify and fix IDs to start from 1 and be sequential
-            logging.info("Step 6: Verifying and fixing IDs to start from 1...")
-            try:
-                # Check trainers IDs
-                if trainers_count > 0:
-                    min_trainer_id_result = await db.execute(text("SELECT MIN(id) FROM trainers"))
-                    min_trainer_id = min_trainer_id_result.scalar()
-                    if min_trainer_id != 1:
-                        logging.info(f"-> Fixing trainers IDs (currently starting from {min_trainer_id}, resetting to 1)...")
-                        # Trainers table has no foreign key dependencies, safe to update
-                        await db.execute(text("""
-                            WITH numbered_rows AS (
-                                SELECT id, ROW_NUMBER() OVER (ORDER BY id) as new_id
-                                FROM trainers
-                            )
-                            UPDATE trainers t
-                            SET id = nr.new_id
-                            FROM numbered_rows nr
-                            WHERE t.id = nr.id
-                        """))
-                        # Reset sequence to continue from max ID + 1
-                        max_trainer_id_result = await db.execute(text("SELECT MAX(id) FROM trainers"))
-                        max_trainer_id = max_trainer_id_result.scalar()
-                        if max_trainer_id:
-                            next_id = max_trainer_id + 1
-                            try:
-                                await db.execute(text(f"ALTER SEQUENCE trainers_id_seq RESTART WITH {next_id}"))
-                            except Exception:
-                                # Sequence might have different name, try to find it
-                                seq_result = await db.execute(text("""
-                                    SELECT sequence_name FROM information_schema.sequences 
-                                    WHERE sequence_name LIKE '%trainers%id%'
-                                """))
-                                seq_name = seq_result.scalar()
-                                if seq_name:
-                                    await db.execute(text(f"ALTER SEQUENCE {seq_name} RESTART WITH {next_id}"))
-                            logging.info(f"-> Trainers IDs reset to start from 1, sequence continues from {next_id}")
-                    else:
-                        logging.info("-> Trainers IDs already start from 1 ✓")
-                
-                # Check training_details IDs
-                if trainings_count > 0:
-                    min_training_id_result = await db.execute(text("SELECT MIN(id) FROM training_details"))
-                    min_training_id = min_training_id_result.scalar()
-                    if min_training_id != 1:
-                        # Check if there are any training_requests that reference training_details
-                        training_requests_count_result = await db.execute(text("SELECT COUNT(*) FROM training_requests"))
-                        training_requests_count = training_requests_count_result.scalar()
-                        
-                        if training_requests_count > 0:
-                            logging.warning(f"-> Cannot fix training_details IDs automatically: {training_requests_count} training_requests exist with foreign key references.")
-                            logging.warning("-> IDs will remain as inserted. To fix IDs, please clear training_requests first.")
-                        else:
-                            logging.info(f"-> Fixing training_details IDs (currently starting from {min_training_id}, resetting to 1)...")
-                            # No foreign key constraints, safe to update
-                            await db.execute(text("""
-                                WITH numbered_rows AS (
-                                    SELECT id, ROW_NUMBER() OVER (ORDER BY id) as new_id
-                                    FROM training_details
-                                )
-                                UPDATE training_details td
-                                SET id = nr.new_id
-                                FROM numbered_rows nr
-                                WHERE td.id = nr.id
-                            """))
-                            # Reset sequence to continue from max ID + 1
-                            max_training_id_result = await db.execute(text("SELECT MAX(id) FROM training_details"))
-                            max_training_id = max_training_id_result.scalar()
-                            if max_training_id:
-                                next_id = max_training_id + 1
-                                try:
-                                    await db.execute(text(f"ALTER SEQUENCE training_details_id_seq RESTART WITH {next_id}"))
-                                except Exception:
-                                    # Sequence might have different name, try to find it
-                                    seq_result = await db.execute(text("""
-                                        SELECT sequence_name FROM information_schema.sequences 
-                                        WHERE sequence_name LIKE '%training_details%id%'
-                                    """))
-                                    seq_name = seq_result.scalar()
-                                    if seq_name:
-                                        await db.execute(text(f"ALTER SEQUENCE {seq_name} RESTART WITH {next_id}"))
-                                logging.info(f"-> Training_details IDs reset to start from 1, sequence continues from {next_id}")
-                    else:
-                        logging.info("-> Training_details IDs already start from 1 ✓")
-                
-                await db.commit()
-                logging.info("✅ ID verification and fix complete.")
-            except Exception as id_fix_error:
-                logging.warning(f"⚠️ Could not fix IDs automatically: {id_fix_error}")
-                logging.warning("IDs may not start from 1, but data was inserted successfully.")
+                logger.error("⚠️ WARNING: Commit succeeded but no data found in database! Possible transaction rollback.")
+
         except Exception as commit_error:
-            logging.error(f"❌ COMMIT FAILED: {commit_error}", exc_info=True)
+            logger.error(f"❌ COMMIT FAILED: {commit_error}", exc_info=True)
             raise
 
+        return summary
+
     except Exception as e:
-        logging.error(f"❌ An error occurred during the Excel loading process: {e}", exc_info=True)
-        logging.error("Rolling back all changes. Your database is in its original state.")
+        logger.error(f"❌ An error occurred during the Excel loading process: {e}", exc_info=True)
+        logger.error("Rolling back all changes. Your database is in its original state.")
         await db.rollback()
         raise
 
 
-async def load_manager_employee_from_csv(csv_file_source: Any, db: AsyncSession):
+def parse_manager_employee_csv(csv_file_source: Any) -> Tuple[pd.DataFrame, int, int]:
+    """
+    Reads and validates the manager-employee CSV (runs in the parse process pool).
+
+    Returns:
+        tuple: (valid relationships as a DataFrame of ManagerEmployee columns,
+                rows skipped, rows read)
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    df = pd.read_csv(_local_source(csv_file_source))
+    logger.info(f"-> Found {len(df)} rows in CSV file.")
+    logger.info(f"-> Column names: {list(df.columns)}")
+    
+    # Clean column names (strip whitespace, lowercase, replace spaces with underscores)
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    logger.info(f"-> Cleaned column names: {list(df.columns)}")
+    
+    # Show first few rows
+    if len(df) > 0 and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("-> First 3 rows of data:")
+        for idx in range(min(3, len(df))):
+            logger.debug(f"   Row {idx+1}: {df.iloc[idx].to_dict()}")
+
+    # Validate required columns
+    required_columns = ['manager_empid', 'manager_name', 'employee_empid', 'employee_name']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns in CSV: {', '.join(missing_columns)}")
+
+    # Clean whole columns at once (CSV row numbers: header is row 1)
+    df.index = range(2, len(df) + 2)
+    relations = pd.DataFrame({column: _text_column(df[column]) for column in required_columns})
+    for column in ('manager_is_trainer', 'employee_is_trainer'):
+        # Boolean flags: 't'/'true'/'1'/'yes'/'y' (any case) are true, anything else false
+        if column in df.columns:
+            relations[column] = df[column].notna() & df[column].astype(str).str.strip().str.lower().isin(['t', 'true', '1', 'yes', 'y'])
+        else:
+            relations[column] = False
+
+    # Validate required fields
+    valid = _present(relations['manager_empid']) & _present(relations['employee_empid'])
+    skipped_count = int((~valid).sum())
+    for row_number in relations.index[~valid]:
+        logger.warning(f"Skipping row {row_number} due to missing manager_empid or employee_empid")
+    relations = relations[valid]
+    return relations, skipped_count, len(df)
+
+
+async def load_manager_employee_from_csv(csv_file_source: Any, db: AsyncSession, force: bool = False) -> Dict[str, Any]:
     """
     Loads manager-employee relationship data from a CSV file.
     Expected CSV columns: manager_empid, manager_name, employee_empid, employee_name, 
                          manager_is_trainer, employee_is_trainer
+
+    Args:
+        csv_file_source: Path or file-like object of the .csv upload
+        db: Database session
+        force: Reload even if the file matches the last applied upload
+
+    Returns:
+        dict: {"skipped": True} when the file is unchanged, else the rows inserted and skipped
     """
-    logging.info("--- Starting Manager-Employee CSV data load ---")
+    logger.info("--- Starting Manager-Employee CSV data load ---")
     try:
-        logging.info("Step 1: Clearing old data from manager_employee table...")
+        source = _portable_source(csv_file_source)
+        csv_hash = await run_parse(file_content_hash, source)
+        applied = await get_applied_hashes(db, [file_key(MANAGER_EMPLOYEE_FILE)])
+        if is_unchanged(applied, file_key(MANAGER_EMPLOYEE_FILE), csv_hash, force):
+            logger.info("✅ CSV matches the last applied upload; nothing to do.")
+            return {"skipped": True, "inserted": 0, "rows_skipped": 0}
+
+        logger.info("Step 1: Clearing old data from manager_employee table...")
         await db.execute(text("DELETE FROM manager_employee"))
-        logging.info("-> Old data cleared successfully.")
+        logger.info("-> Old data cleared successfully.")
 
         # Read CSV file
-        logging.info("Step 2: Reading CSV file...")
-        df = pd.read_csv(csv_file_source)
-        logging.info(f"-> Found {len(df)} rows in CSV file.")
-        logging.info(f"-> Column names: {list(df.columns)}")
-        
-        # Clean column names (strip whitespace, lowercase, replace spaces with underscores)
-        df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-        logging.info(f"-> Cleaned column names: {list(df.columns)}")
-        
-        # Show first few rows
-        if len(df) > 0:
-            logging.info("-> First 3 rows of data:")
-            for idx in range(min(3, len(df))):
-                logging.info(f"   Row {idx+1}: {df.iloc[idx].to_dict()}")
-
-        # Validate required columns
-        required_columns = ['manager_empid', 'manager_name', 'employee_empid', 'employee_name']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns in CSV: {', '.join(missing_columns)}")
+        logger.info("Step 2: Reading CSV file...")
+        relations, skipped_count, rows_read = await run_parse(parse_manager_employee_csv, source)
+        report_progress(stage="Manager-Employee", parsed=rows_read, validated=len(relations), skipped=skipped_count)
 
         # Step 3: Collect all unique user IDs and create missing users
-        logging.info("Step 3: Collecting unique user IDs from CSV...")
-        all_manager_ids = set(df['manager_empid'].dropna().astype(str).unique())
-        all_employee_ids = set(df['employee_empid'].dropna().astype(str).unique())
+        logger.info("Step 3: Collecting unique user IDs from CSV...")
+        all_manager_ids = set(relations['manager_empid'].unique())
+        all_employee_ids = set(relations['employee_empid'].unique())
         all_user_ids = all_manager_ids.union(all_employee_ids)
-        logging.info(f"-> Found {len(all_user_ids)} unique user IDs in CSV ({len(all_manager_ids)} managers, {len(all_employee_ids)} employees)")
+        logger.info(f"-> Found {len(all_user_ids)} unique user IDs in CSV ({len(all_manager_ids)} managers, {len(all_employee_ids)} employees)")
         
         # Check which users already exist
         from sqlalchemy import select, func
-        from app.auth_utils import get_password_hash
+        from app.auth_utils import get_password_hash_async
         
         existing_users_result = await db.execute(
             select(User.username).where(User.username.in_(all_user_ids))
@@ -868,127 +1268,69 @@ async def load_manager_employee_from_csv(csv_file_source: Any, db: AsyncSession)
         existing_usernames = set(existing_users_result.scalars().all())
         missing_user_ids = all_user_ids - existing_usernames
         
-        logging.info(f"-> Found {len(existing_usernames)} existing users, {len(missing_user_ids)} new users to create")
+        logger.info(f"-> Found {len(existing_usernames)} existing users, {len(missing_user_ids)} new users to create")
         
         # Create missing users with default password
         if missing_user_ids:
-            logging.info(f"Step 4: Creating {len(missing_user_ids)} missing user accounts...")
+            logger.info(f"Step 4: Creating {len(missing_user_ids)} missing user accounts...")
             try:
-                # Hash password once before the loop to avoid bcrypt initialization issues
-                # Use a shorter password to avoid any potential issues
+                # Hash password once before the loop; every new user shares this default hash
                 default_password = "password123"
-                try:
-                    # Try to hash with bcrypt
-                    default_password_hash = get_password_hash(default_password)
-                    logging.info(f"✅ Password hashed successfully using bcrypt")
-                except Exception as hash_error:
-                    # Fallback: use pbkdf2_sha256 if bcrypt fails
-                    logging.warning(f"Bcrypt hash failed: {hash_error}")
-                    logging.warning("Trying pbkdf2_sha256 as alternative...")
-                    from passlib.context import CryptContext
-                    fallback_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-                    default_password_hash = fallback_context.hash(default_password)
-                    logging.warning("Using pbkdf2_sha256 hash - password verification should still work")
+                default_password_hash = await get_password_hash_async(default_password)
+                logger.info("✅ Default password hashed successfully using pbkdf2_sha256")
                 
-                new_users = []
-                for user_id in missing_user_ids:
-                    new_users.append(
-                        User(
-                            username=str(user_id),
-                            hashed_password=default_password_hash,
-                            created_at=datetime.utcnow()
-                        )
-                    )
-                db.add_all(new_users)
+                created_at = datetime.utcnow()
+                created_count = await bulk_insert(db, User, [
+                    {"username": str(user_id), "hashed_password": default_password_hash, "created_at": created_at}
+                    for user_id in missing_user_ids
+                ])
                 # Commit users first so they're available for foreign key constraints
                 await db.commit()
-                logging.info(f"✅ Created and committed {len(new_users)} new user accounts with default password '{default_password}'")
+                logger.info(f"✅ Created and committed {created_count} new user accounts with default password '{default_password}'")
                 
                 # Verify users were created
                 verify_users_result = await db.execute(
                     select(func.count(User.username)).where(User.username.in_(missing_user_ids))
                 )
                 verified_count = verify_users_result.scalar()
-                logging.info(f"✅ Verified: {verified_count} out of {len(missing_user_ids)} users exist in database")
+                logger.info(f"✅ Verified: {verified_count} out of {len(missing_user_ids)} users exist in database")
                 
                 # Note: Users can change their password after first login
             except Exception as user_error:
-                logging.error(f"❌ Failed to create users: {user_error}", exc_info=True)
+                logger.error(f"❌ Failed to create users: {user_error}", exc_info=True)
                 await db.rollback()
                 raise ValueError(f"Failed to create user accounts: {user_error}")
         else:
-            logging.info("Step 4: All users already exist in database, skipping user creation.")
+            logger.info("Step 4: All users already exist in database, skipping user creation.")
 
-        # Process rows
-        manager_employees_to_add = []
-        skipped_count = 0
-        
-        for i, row in df.iterrows():
-            try:
-                # Get required fields
-                manager_empid = str(row.get('manager_empid', '')).strip() if pd.notna(row.get('manager_empid')) else None
-                manager_name = str(row.get('manager_name', '')).strip() if pd.notna(row.get('manager_name')) else None
-                employee_empid = str(row.get('employee_empid', '')).strip() if pd.notna(row.get('employee_empid')) else None
-                employee_name = str(row.get('employee_name', '')).strip() if pd.notna(row.get('employee_name')) else None
-                
-                # Get boolean fields (handle 'f'/'t', 'false'/'true', '0'/'1', etc.)
-                manager_is_trainer_val = row.get('manager_is_trainer', False)
-                employee_is_trainer_val = row.get('employee_is_trainer', False)
-                
-                # Convert to boolean
-                def to_bool(val):
-                    if pd.isna(val) or val is None:
-                        return False
-                    if isinstance(val, bool):
-                        return val
-                    val_str = str(val).lower().strip()
-                    return val_str in ['t', 'true', '1', 'yes', 'y']
-                
-                manager_is_trainer = to_bool(manager_is_trainer_val)
-                employee_is_trainer = to_bool(employee_is_trainer_val)
-                
-                # Validate required fields
-                if not manager_empid or not employee_empid:
-                    skipped_count += 1
-                    logging.warning(f"Skipping row {i+2} due to missing manager_empid or employee_empid")
-                    continue
-                
-                # Create ManagerEmployee object
-                manager_employees_to_add.append(
-                    ManagerEmployee(
-                        manager_empid=manager_empid,
-                        manager_name=manager_name,
-                        employee_empid=employee_empid,
-                        employee_name=employee_name,
-                        manager_is_trainer=manager_is_trainer,
-                        employee_is_trainer=employee_is_trainer
-                    )
-                )
-                
-                if i < 3:  # Log first 3 successful rows
-                    logging.info(f"✅ Row {i+2} added: manager={manager_empid} ({manager_name}), employee={employee_empid} ({employee_name})")
-                    
-            except Exception as row_error:
-                skipped_count += 1
-                logging.warning(f"Skipping row {i+2} due to error: {row_error}")
-                continue
-        
-        logging.info(f"-> Validation complete: {len(manager_employees_to_add)} valid rows, {skipped_count} skipped.")
-        
-        # Add all objects to the session
-        logging.info(f"Step 5: Adding {len(manager_employees_to_add)} manager-employee relationships to database session...")
-        if manager_employees_to_add:
-            db.add_all(manager_employees_to_add)
-            logging.info("-> Data added to session successfully.")
-        else:
-            logging.warning("⚠️ No manager-employee records to add - all rows were skipped!")
+        logger.info(f"-> Validation complete: {len(relations)} valid rows, {skipped_count} skipped.")
+
+        # Bulk insert the relationships
+        logger.info(f"Step 5: Inserting {len(relations)} manager-employee relationships...")
+        if relations.empty:
+            logger.warning("⚠️ No manager-employee records to add - all rows were skipped!")
             raise ValueError("No valid data found in CSV file. All rows were skipped during validation.")
+        relations_added = 0
+        for start in range(0, len(relations), EXCEL_CHUNK_ROWS):
+            chunk_added = await bulk_insert(
+                db, ManagerEmployee, relations.iloc[start:start + EXCEL_CHUNK_ROWS].to_dict('records'))
+            relations_added += chunk_added
+            report_progress(inserted=chunk_added)
+        logger.info("-> Data inserted successfully.")
+
+        # Display names feed trainer matching, so re-resolve trainers in the same transaction
+        await rebuild_training_trainers(db)
+        await record_hashes(db, {file_key(MANAGER_EMPLOYEE_FILE): csv_hash})
 
         # Commit the transaction
-        logging.info("Step 6: Committing transaction to the database...")
+        logger.info("Step 6: Committing transaction to the database...")
         try:
             await db.commit()
-            logging.info(f"✅ COMMIT SUCCESSFUL! Database updated with {len(manager_employees_to_add)} manager-employee relationships.")
+            logger.info(f"✅ COMMIT SUCCESSFUL! Database updated with {relations_added} manager-employee relationships.")
+            
+            # Names and trainer flags may have changed for anyone in the hierarchy
+            invalidate_identity_cache()
+            invalidate_trainer_index()
             
             # Verify the data was actually inserted
             from sqlalchemy import select, func
@@ -998,64 +1340,48 @@ async def load_manager_employee_from_csv(csv_file_source: Any, db: AsyncSession)
             )
             total_count = count_result.scalar()
             
-            logging.info(f"✅ VERIFICATION: Database now contains {total_count} manager-employee relationships.")
+            logger.info(f"✅ VERIFICATION: Database now contains {total_count} manager-employee relationships.")
             
         except Exception as commit_error:
-            logging.error(f"❌ COMMIT FAILED: {commit_error}", exc_info=True)
+            logger.error(f"❌ COMMIT FAILED: {commit_error}", exc_info=True)
             raise
 
+        return {"skipped": False, "inserted": relations_added, "rows_skipped": skipped_count}
+
     except Exception as e:
-        logging.error(f"❌ An error occurred during the CSV loading process: {e}", exc_info=True)
-        logging.error("Rolling back all changes. Your database is in its original state.")
+        logger.error(f"❌ An error occurred during the CSV loading process: {e}", exc_info=True)
+        logger.error("Rolling back all changes. Your database is in its original state.")
         await db.rollback()
         raise
 
 
-async def load_employee_competency_from_excel(excel_file_source: Any, db: AsyncSession):
+async def load_employee_competency_from_excel(excel_file_source: Any, db: AsyncSession, stream: Optional[bool] = None):
     """
     Loads employee competency data from the 'Employee Competency' sheet in an Excel file.
     Expected Excel columns: Division, Department, Employee ID, Employee Name, 
     Role Specific Competency (MHS), Designation, Competency, Project, Skill,
     Current Expertise Level, Target Expertise Level, Target Date, Comments
+
+    Args:
+        excel_file_source: Path or file-like object of the .xlsx upload
+        db: Database session
+        stream: Read rows lazily (True), as a DataFrame (False) or by file size (None);
+            see load_all_from_excel()
     """
-    logging.info("--- Starting Employee Competency Excel data load ---")
+    logger.info("--- Starting Employee Competency Excel data load ---")
     try:
-        logging.info("Step 1: Clearing old data from employee_competency table...")
+        # Validate the sheet before clearing anything
+        streaming = _should_stream(excel_file_source, stream)
+        source = _portable_source(excel_file_source)
+        check_sheets(await run_parse(read_sheet_names, source), (COMPETENCY_SHEET,))
+
+        logger.info("Step 1: Clearing old data from employee_competency table...")
         await db.execute(text("DELETE FROM employee_competency"))
-        # Reset the sequence to start from 1 after deletion
-        await db.execute(text("ALTER SEQUENCE employee_competency_id_seq RESTART WITH 1"))
-        logging.info("-> Old data cleared successfully.")
-        logging.info("-> ID sequence reset to start from 1.")
+        logger.info("-> Old data cleared successfully.")
 
-        # Read Excel file
-        logging.info("Step 2: Reading 'Employee Competency' sheet from Excel...")
-        excel_file_source.seek(0)
-        try:
-            df_raw = pd.read_excel(excel_file_source, sheet_name="Employee Competency", engine='openpyxl')
-        except ValueError as e:
-            # List available sheets if the sheet name is wrong
-            excel_file_source.seek(0)
-            xl_file = pd.ExcelFile(excel_file_source, engine='openpyxl')
-            available_sheets = xl_file.sheet_names
-            logging.error(f"Sheet 'Employee Competency' not found! Available sheets: {available_sheets}")
-            raise ValueError(f"Sheet 'Employee Competency' not found. Available sheets: {available_sheets}")
-        
-        logging.info(f"-> Original column names (before cleaning): {list(df_raw.columns)}")
-        
-        df = df_raw.replace({np.nan: None})
-        df = clean_headers(df)
-        logging.info(f"-> Found {len(df)} rows in 'Employee Competency'.")
-        logging.info(f"-> Column names after cleaning: {list(df.columns)}")
-        
-        # Show first few rows
-        if len(df) > 0:
-            logging.info("-> First 3 rows of data:")
-            for idx in range(min(3, len(df))):
-                logging.info(f"   Row {idx+2}: {df.iloc[idx].to_dict()}")
-
-        # Step 3: Temporarily disable foreign key constraint to allow loading data first
-        logging.info("Step 3: Temporarily disabling foreign key constraint...")
-        logging.info("   Note: All data will be loaded. Users can be registered separately later.")
+        # Step 2: Temporarily disable foreign key constraint to allow loading data first
+        logger.info("Step 2: Temporarily disabling foreign key constraint...")
+        logger.info("   Note: All data will be loaded. Users can be registered separately later.")
         
         # Get the constraint name
         constraint_result = await db.execute(text("""
@@ -1073,159 +1399,36 @@ async def load_employee_competency_from_excel(excel_file_source: Any, db: AsyncS
                 await db.execute(text(f"ALTER TABLE employee_competency DROP CONSTRAINT IF EXISTS {constraint_name}"))
                 await db.commit()
                 fk_disabled = True
-                logging.info(f"   ✅ Foreign key constraint '{constraint_name}' temporarily disabled")
+                logger.info(f"   ✅ Foreign key constraint '{constraint_name}' temporarily disabled")
             except Exception as e:
-                logging.warning(f"   ⚠️  Could not disable constraint: {e}")
-                logging.warning("   Will try to load data anyway (may fail if users don't exist)")
+                logger.warning(f"   ⚠️  Could not disable constraint: {e}")
+                logger.warning("   Will try to load data anyway (may fail if users don't exist)")
         else:
-            logging.warning("   ⚠️  Foreign key constraint not found - may already be disabled")
+            logger.warning("   ⚠️  Foreign key constraint not found - may already be disabled")
 
-        # Step 4: Process all rows from Excel
-        logging.info("Step 4: Processing all rows from Excel...")
+        # Steps 3-5: Read, validate and flush the rows chunk by chunk
+        logger.info(f"Step 3: Reading 'Employee Competency' sheet from Excel ({'streaming' if streaming else 'DataFrame'} mode)...")
+        competencies_added, skipped_count = await _load_sheet_rows(
+            db, parse_sheet_async(source, COMPETENCY_SHEET, streaming, COMPETENCY_COLUMNS, normalize_competency_frame),
+            EmployeeCompetency, "Employee Competency", assign_ids=True)
+        await _sync_id_sequence(db, EmployeeCompetency, competencies_added)
 
-        # Process rows
-        competencies_to_add = []
-        skipped_count = 0
-        
-        for i, row in df.iterrows():
-            try:
-                # Map Excel columns to database columns using flexible matching
-                row_dict = row.to_dict()
-                
-                employee_empid = find_column_flexible(row_dict, ['employee_id', 'employeeid', 'empid', 'employee_empid'])
-                if employee_empid:
-                    # Convert float to int then to string (handles Excel's 5504763.0 -> "5504763")
-                    if isinstance(employee_empid, float):
-                        employee_empid = str(int(employee_empid))
-                    else:
-                        employee_empid = str(employee_empid).strip()
-                else:
-                    employee_empid = None
-                
-                employee_name = find_column_flexible(row_dict, ['employee_name', 'employeename', 'employee name', 'name'])
-                if employee_name and isinstance(employee_name, str):
-                    employee_name = employee_name.strip()
-                
-                division = find_column_flexible(row_dict, ['division'])
-                if division and isinstance(division, str):
-                    division = division.strip()
-                
-                department = find_column_flexible(row_dict, ['department'])
-                if department and isinstance(department, str):
-                    department = department.strip()
-                
-                project = find_column_flexible(row_dict, ['project'])
-                if project and isinstance(project, str):
-                    project = project.strip()
-                
-                role_specific_comp = find_column_flexible(row_dict, ['role_specific_competency_(mhs)', 'role_specific_competency', 'role_specific_comp', 'role specific competency (mhs)'])
-                if role_specific_comp and isinstance(role_specific_comp, str):
-                    role_specific_comp = role_specific_comp.strip()
-                
-                destination = find_column_flexible(row_dict, ['designation', 'destination', 'desination'])
-                if destination and isinstance(destination, str):
-                    destination = destination.strip()
-                
-                competency = find_column_flexible(row_dict, ['competency', 'competence'])
-                if competency and isinstance(competency, str):
-                    competency = competency.strip()
-                
-                skill = find_column_flexible(row_dict, ['skill'])
-                if skill and isinstance(skill, str):
-                    skill = skill.strip()
-                
-                current_expertise = find_column_flexible(row_dict, ['current_expertise_level', 'current_expertise', 'current expertise level', 'current expertise'])
-                if current_expertise and isinstance(current_expertise, str):
-                    current_expertise = current_expertise.strip()
-                
-                target_expertise = find_column_flexible(row_dict, ['target_expertise_level', 'target_expertise', 'target expertise level', 'target expertise'])
-                if target_expertise and isinstance(target_expertise, str):
-                    target_expertise = target_expertise.strip()
-                
-                comments = find_column_flexible(row_dict, ['comments', 'comment'])
-                if comments and isinstance(comments, str):
-                    comments = comments.strip()
-                
-                # Handle target_date - convert from Excel date to Python date
-                target_date = find_column_flexible(row_dict, ['target_date', 'target date'])
-                final_target_date = pd.to_datetime(target_date).date() if pd.notna(target_date) and target_date else None
-                
-                # Validate required fields
-                if not employee_empid:
-                    skipped_count += 1
-                    logging.warning(f"Skipping row {i+2} due to missing employee_empid")
-                    continue
-                
-                # Create EmployeeCompetency object (load all data, no user validation)
-                competencies_to_add.append(
-                    EmployeeCompetency(
-                        employee_empid=employee_empid,
-                        employee_name=employee_name,
-                        department=department,
-                        division=division,
-                        project=project,
-                        role_specific_comp=role_specific_comp,
-                        destination=destination,
-                        competency=competency,
-                        skill=skill,
-                        current_expertise=current_expertise,
-                        target_expertise=target_expertise,
-                        comments=comments,
-                        target_date=final_target_date
-                    )
-                )
-                
-                if i < 3:  # Log first 3 successful rows
-                    logging.info(f"✅ Row {i+2} added: employee={employee_empid} ({employee_name}), skill={skill}, competency={competency}")
-                    
-            except Exception as row_error:
-                skipped_count += 1
-                logging.warning(f"Skipping row {i+2} due to error: {row_error}")
-                continue
-        
-        logging.info(f"-> Validation complete: {len(competencies_to_add)} valid rows, {skipped_count} skipped.")
-        
-        # Add all objects to the session
-        logging.info(f"Step 5: Adding {len(competencies_to_add)} employee competency records to database session...")
-        if competencies_to_add:
-            db.add_all(competencies_to_add)
-            logging.info("-> Data added to session successfully.")
-        else:
-            logging.warning("⚠️ No employee competency records to add - all rows were skipped!")
+        logger.info(f"-> Validation complete: {competencies_added} valid rows, {skipped_count} skipped.")
+        if not competencies_added:
+            logger.warning("⚠️ No employee competency records to add - all rows were skipped!")
             raise ValueError("No valid data found in Excel file. All rows were skipped during validation.")
 
+        # The competency table now differs from the last full workbook upload
+        await record_hashes(db, {
+            sheet_key(COMPETENCY_SHEET): await run_parse(sheet_content_hash, source, COMPETENCY_SHEET),
+            file_key(WORKBOOK_FILE): None,
+        })
+
         # Commit the transaction
-        logging.info("Step 6: Committing transaction to the database...")
+        logger.info("Step 6: Committing transaction to the database...")
         try:
             await db.commit()
-            logging.info(f"✅ COMMIT SUCCESSFUL! Database updated with {len(competencies_to_add)} employee competency records.")
-            
-            # Step 7: Reset IDs to be sequential starting from 1
-            logging.info("Step 7: Resetting IDs to start from 1...")
-            # First reset sequence to 1
-            await db.execute(text("ALTER SEQUENCE employee_competency_id_seq RESTART WITH 1"))
-            
-            # Update all IDs sequentially starting from 1
-            await db.execute(text("""
-                WITH numbered_rows AS (
-                    SELECT id, ROW_NUMBER() OVER (ORDER BY id) as new_id
-                    FROM employee_competency
-                )
-                UPDATE employee_competency ec
-                SET id = nr.new_id
-                FROM numbered_rows nr
-                WHERE ec.id = nr.id
-            """))
-            
-            # Set sequence to continue from max ID + 1
-            max_id_result = await db.execute(text("SELECT MAX(id) FROM employee_competency"))
-            max_id = max_id_result.scalar()
-            if max_id:
-                next_id = max_id + 1
-                await db.execute(text(f"ALTER SEQUENCE employee_competency_id_seq RESTART WITH {next_id}"))
-                logging.info(f"-> IDs reset to start from 1, sequence continues from {next_id}")
-            
-            await db.commit()
+            logger.info(f"✅ COMMIT SUCCESSFUL! Database updated with {competencies_added} employee competency records.")
             
             # Verify the data was actually inserted
             from sqlalchemy import select, func
@@ -1233,28 +1436,22 @@ async def load_employee_competency_from_excel(excel_file_source: Any, db: AsyncS
                 select(func.count()).select_from(EmployeeCompetency)
             )
             total_count = count_result.scalar()
+            logger.info(f"✅ VERIFICATION: Database now contains {total_count} employee competency records.")
             
-            # Verify IDs start from 1
-            min_id_result = await db.execute(text("SELECT MIN(id) FROM employee_competency"))
-            min_id = min_id_result.scalar()
-            
-            logging.info(f"✅ VERIFICATION: Database now contains {total_count} employee competency records.")
-            logging.info(f"✅ IDs start from {min_id} and are sequential.")
-            
-            # Step 8: Keep foreign key constraint disabled
+            # Step 7: Keep foreign key constraint disabled
             # Data loads first, users register later through application
             # Linking happens automatically when employee_empid matches username after registration
             if fk_disabled:
-                logging.info("Step 8: Foreign key constraint remains disabled.")
-                logging.info("   ✅ Data loaded successfully. Users will register separately through application.")
-                logging.info("   ✅ Linking will happen automatically when employee_empid matches username.")
+                logger.info("Step 7: Foreign key constraint remains disabled.")
+                logger.info("   ✅ Data loaded successfully. Users will register separately through application.")
+                logger.info("   ✅ Linking will happen automatically when employee_empid matches username.")
             
         except Exception as commit_error:
-            logging.error(f"❌ COMMIT FAILED: {commit_error}", exc_info=True)
+            logger.error(f"❌ COMMIT FAILED: {commit_error}", exc_info=True)
             raise
 
     except Exception as e:
-        logging.error(f"❌ An error occurred during the Employee Competency loading process: {e}", exc_info=True)
-        logging.error("Rolling back all changes. Your database is in its original state.")
+        logger.error(f"❌ An error occurred during the Employee Competency loading process: {e}", exc_info=True)
+        logger.error("Rolling back all changes. Your database is in its original state.")
         await db.rollback()
         raise
\ No newline at end of file
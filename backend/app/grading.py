@@ -0,0 +1,237 @@
+"""
+Assignment Grading Module
+
+Purpose: Grade assignment submissions against a precompiled answer key
+Features:
+- Answer key compiled once when a trainer shares (or edits) an assignment and
+  stored on SharedAssignment.answer_key, so questions are not re-parsed per submission
+- Per-question correct options kept as an integer bitmask; grading a choice
+  question is one mask comparison
+- Per-question results produced at submit time and stored on the submission
+- Bulk regrade when an assignment is edited: all of its submissions are scored
+  in one NumPy pass and written back with a single UPDATE
+
+Grading rules:
+- single-choice: exactly one option selected, and it is a correct option
+- multiple-choice: the selected options equal the correct options
+- text-input and other types: never auto-graded as correct (manual review)
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import json_loads
+from app.models import AssignmentSubmission
+
+SINGLE_CHOICE = "single-choice"
+MULTIPLE_CHOICE = "multiple-choice"
+TEXT_INPUT = "text-input"
+CHOICE_TYPES = (SINGLE_CHOICE, MULTIPLE_CHOICE)
+
+# Option masks are packed into uint64 for the vectorized regrade
+MAX_VECTOR_OPTIONS = 64
+
+logger = logging.getLogger(__name__)
+
+
+def option_mask(indices: Iterable[int], max_index: Optional[int] = None) -> Optional[int]:
+    """
+    Bitmask of option indices; None if an index is negative or above max_index
+    (it can never match). Pass max_index for submitted answers so an arbitrarily
+    large index is rejected before it is turned into a mask.
+    """
+    mask = 0
+    for index in indices:
+        if index < 0 or (max_index is not None and index > max_index):
+            return None
+        mask |= 1 << index
+    return mask
+
+
+def compile_answer_key(questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Compiles an assignment's questions into its answer key (JSON-serializable).
+
+    Args:
+        questions: Question payloads as stored in SharedAssignment.assignment_data
+
+    Returns:
+        list: One entry per question: {"type", "mask", "correct"}; mask and
+        correct (sorted option indices) are 0 / [] for non-choice questions
+    """
+    key = []
+    for question in questions:
+        question_type = question.get("type")
+        correct = []
+        if question_type in CHOICE_TYPES:
+            correct = [index for index, option in enumerate(question.get("options", []))
+                       if option.get("isCorrect", False)]
+        key.append({"type": question_type, "mask": option_mask(correct), "correct": correct})
+    return key
+
+
+def is_correct(entry: Dict[str, Any], selected: List[int]) -> bool:
+    """Grades one answer against its answer key entry."""
+    question_type = entry["type"]
+    if question_type == SINGLE_CHOICE:
+        return len(selected) == 1 and selected[0] >= 0 and bool(entry["mask"] >> selected[0] & 1)
+    if question_type == MULTIPLE_CHOICE:
+        return option_mask(selected, max(entry["correct"], default=-1)) == entry["mask"]
+    return False
+
+
+def grade_submission(answer_key: List[Dict[str, Any]],
+                     answers: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Grades a submission.
+
+    Args:
+        answer_key: Output of compile_answer_key()
+        answers: Answer payloads (questionIndex, selectedOptions, textAnswer)
+
+    Returns:
+        tuple: (per-question results in the QuestionResult shape, number correct).
+        Answers to questions outside the key are ignored; negative indices count
+        from the end, as in Python.
+    """
+    results = []
+    correct_count = 0
+    for answer in answers:
+        question_index = answer.get("questionIndex", 0)
+        if not -len(answer_key) <= question_index < len(answer_key):
+            continue
+        entry = answer_key[question_index]
+        selected = list(answer.get("selectedOptions") or [])
+        correct = is_correct(entry, selected)
+        correct_count += correct
+        results.append({
+            "questionIndex": question_index,
+            "isCorrect": correct,
+            "correctAnswers": entry["correct"],
+            "userAnswers": selected,
+            "userTextAnswer": answer.get("textAnswer") if entry["type"] == TEXT_INPUT else None,
+        })
+    return results, correct_count
+
+
+def score_percent(correct_count: int, total_questions: int) -> int:
+    """Score out of 100, rounded down (0 for an assignment without questions)."""
+    return int(correct_count / total_questions * 100) if total_questions > 0 else 0
+
+
+def score_answers_vectorized(answer_key: List[Dict[str, Any]],
+                             submissions: List[List[Dict[str, Any]]]) -> np.ndarray:
+    """
+    Number of correct answers per submission, computed for all submissions at once.
+    Same rules as grade_submission(): every answer is flattened into one row
+    (submission, question, selected mask, selection size) and graded with array
+    operations against the key.
+
+    Returns:
+        numpy.ndarray: Correct answer count per submission (int64, same order)
+    """
+    submission_index, question_index, selected_masks, selected_counts, valid = [], [], [], [], []
+    for position, answers in enumerate(submissions):
+        for answer in answers:
+            selected = answer.get("selectedOptions") or []
+            mask = option_mask(selected, MAX_VECTOR_OPTIONS - 1)
+            submission_index.append(position)
+            question_index.append(answer.get("questionIndex", 0))
+            # A negative option index never matches; one beyond the key's options
+            # cannot match either, so it is left out of the packed mask
+            valid.append(mask is not None)
+            selected_masks.append(mask if valid[-1] else 0)
+            selected_counts.append(len(selected))
+
+    if not submission_index:
+        return np.zeros(len(submissions), dtype=np.int64)
+
+    key_types = np.array([1 if entry["type"] == SINGLE_CHOICE else 2 if entry["type"] == MULTIPLE_CHOICE else 0
+                          for entry in answer_key] or [0], dtype=np.int8)
+    key_masks = np.array([entry["mask"] or 0 for entry in answer_key] or [0], dtype=np.uint64)
+
+    questions = np.array(question_index, dtype=np.int64)
+    # Answers beyond the key are ignored; negative indices count from the end, as in Python
+    in_key = (questions < len(answer_key)) & (questions >= -len(answer_key))
+    questions = np.where(in_key, questions % max(len(answer_key), 1), 0)
+    types = key_types[questions]
+    expected = key_masks[questions]
+    masks = np.array(selected_masks, dtype=np.uint64)
+    counts = np.array(selected_counts, dtype=np.int64)
+    valid = np.array(valid, dtype=bool)
+
+    single = (types == 1) & (counts == 1) & ((masks & expected) != 0)
+    multiple = (types == 2) & (masks == expected)
+    correct = in_key & valid & (single | multiple)
+    return np.bincount(np.array(submission_index), weights=correct, minlength=len(submissions)).astype(np.int64)
+
+
+def score_submissions(answer_key: List[Dict[str, Any]],
+                      submissions: List[List[Dict[str, Any]]]) -> np.ndarray:
+    """
+    Number of correct answers per submission: vectorized, unless the key has
+    options too wide for uint64 masks, in which case each submission is graded
+    with grade_submission().
+    """
+    if any(entry["correct"] and max(entry["correct"]) >= MAX_VECTOR_OPTIONS for entry in answer_key):
+        return np.array([grade_submission(answer_key, answers)[1] for answers in submissions], dtype=np.int64)
+    return score_answers_vectorized(answer_key, submissions)
+
+
+async def regrade_submissions(db: AsyncSession, shared_assignment_id: int,
+                              answer_key: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Re-scores every submission of an edited assignment against its new answer key
+    and writes the results with one UPDATE, in the caller's transaction. Stored
+    per-question results are cleared; the result endpoint re-grades a submission
+    once, on first view.
+
+    Returns:
+        dict: {"regraded": submissions updated, "scores_changed": submissions whose score changed}
+    """
+    result = await db.execute(
+        select(AssignmentSubmission.id, AssignmentSubmission.answers_data, AssignmentSubmission.score)
+        .where(AssignmentSubmission.shared_assignment_id == shared_assignment_id)
+    )
+    rows = result.all()
+    if not rows:
+        return {"regraded": 0, "scores_changed": 0}
+    # str while the column is still TEXT (before migrate_json_columns.py)
+    answers = [json_loads(row.answers_data) if isinstance(row.answers_data, str) else row.answers_data
+               for row in rows]
+    correct_counts = score_submissions(answer_key, answers)
+
+    total_questions = len(answer_key)
+    # Same float arithmetic as score_percent(), so unchanged answers keep their score
+    scores = ((correct_counts / total_questions * 100).astype(np.int64) if total_questions > 0
+              else np.zeros_like(correct_counts))
+    old_scores = np.array([-1 if row.score is None else row.score for row in rows], dtype=np.int64)
+    scores_changed = int(np.count_nonzero(scores != old_scores))
+
+    await db.execute(
+        text("""
+            UPDATE assignment_submissions AS s
+            SET score = v.score,
+                correct_answers = v.correct_answers,
+                total_questions = :total_questions,
+                question_results = NULL
+            FROM unnest(CAST(:ids AS integer[]), CAST(:scores AS integer[]), CAST(:correct AS integer[]))
+                AS v(id, score, correct_answers)
+            WHERE s.id = v.id
+        """),
+        {
+            "ids": [row.id for row in rows],
+            "scores": scores.tolist(),
+            "correct": correct_counts.tolist(),
+            "total_questions": total_questions,
+        },
+    )
+    logger.info(f"Regraded {len(rows)} submissions of assignment {shared_assignment_id}: {scores_changed} scores changed")
+    return {"regraded": len(rows), "scores_changed": scores_changed}
@@ -0,0 +1,96 @@
+"""
+Identity Cache Module
+
+Purpose: Cache per-user facts from the manager_employee hierarchy
+Features:
+- Display name, manager name and trainer flags for the authenticated user
+- Single-statement load on cache miss
+- TTL + LRU cache with a size cap (see app/cache.py)
+- Invalidated when the hierarchy is reloaded from CSV
+
+Configuration (environment variables):
+- IDENTITY_CACHE_TTL_SECONDS: entry lifetime (default 300, 0 disables the cache)
+- IDENTITY_CACHE_MAX_ENTRIES: size cap (default 10000)
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import os
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.cache import TTLCache
+from app.models import ManagerEmployee
+
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "10000"))
+
+# username -> (employee_name, manager_name, employee_is_trainer, manager_is_trainer)
+identity_cache = TTLCache(IDENTITY_CACHE_MAX_ENTRIES, IDENTITY_CACHE_TTL_SECONDS)
+
+
+class Identity(BaseModel):
+    """Authenticated user plus the hierarchy facts routes need for authorization."""
+    username: str
+    role: str
+    employee_name: Optional[str] = None  # Name when the user appears as an employee
+    manager_name: Optional[str] = None  # Name when the user appears as a manager
+    employee_is_trainer: bool = False
+    manager_is_trainer: bool = False
+
+    @property
+    def display_name(self) -> str:
+        """Employee name, then manager name, then the username itself."""
+        return self.employee_name or self.manager_name or self.username
+
+    @property
+    def is_trainer(self) -> bool:
+        """True if the user is flagged as a trainer on either side of the hierarchy."""
+        return self.employee_is_trainer or self.manager_is_trainer
+
+
+def _build_identity_lookup(username: str):
+    """
+    One statement returning the user's row facts from both sides of manager_employee.
+    Each scalar subquery is an index-only scan on the covering indexes.
+    """
+    def first(column, key_column):
+        return select(column).where(key_column == username).limit(1).scalar_subquery()
+
+    return select(
+        first(ManagerEmployee.employee_name, ManagerEmployee.employee_empid),
+        first(ManagerEmployee.manager_name, ManagerEmployee.manager_empid),
+        first(ManagerEmployee.employee_is_trainer, ManagerEmployee.employee_empid),
+        first(ManagerEmployee.manager_is_trainer, ManagerEmployee.manager_empid),
+    )
+
+
+async def load_identity(db: AsyncSession, username: str, role: str) -> Identity:
+    """
+    Return the Identity for username, from the cache or with a single query on miss.
+    """
+    facts = identity_cache.get(username)
+    if facts is None:
+        generation = identity_cache.generation
+        result = await db.execute(_build_identity_lookup(username))
+        employee_name, manager_name, employee_is_trainer, manager_is_trainer = result.one()
+        facts = (employee_name, manager_name, bool(employee_is_trainer), bool(manager_is_trainer))
+        identity_cache.set(username, facts, generation=generation)
+
+    employee_name, manager_name, employee_is_trainer, manager_is_trainer = facts
+    return Identity(
+        username=username,
+        role=role,
+        employee_name=employee_name,
+        manager_name=manager_name,
+        employee_is_trainer=employee_is_trainer,
+        manager_is_trainer=manager_is_trainer,
+    )
+
+
+def invalidate_identity_cache(username: Optional[str] = None) -> None:
+    """Drop cached facts for one user, or for everyone (after a hierarchy reload)."""
+    identity_cache.invalidate(username)
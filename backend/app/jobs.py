@@ -0,0 +1,221 @@
+"""
+Background Import Jobs Module
+
+Purpose: Run Excel/CSV data refreshes outside the HTTP request
+Features:
+- Uploads are spooled to a temporary file and queued; the endpoint returns a job ID at once
+- A single in-process worker runs one refresh at a time, in submission order
+- Progress counters (rows parsed / validated / inserted / skipped) reported by the
+  loaders through report_progress(), readable with GET /jobs/{job_id}
+- Final summary or error kept on the job; the last JOBS_MAX_HISTORY jobs are retained
+
+Readers keep being served while a refresh runs: the import holds one database
+connection, and its changes become visible only when it commits.
+
+Configuration (environment variables):
+- JOBS_MAX_HISTORY: finished jobs kept for status lookups (default 100)
+- JOBS_TEMP_DIR: directory for spooled uploads (default: system temp directory)
+
+Note: Jobs live in the worker process that accepted the upload. With several
+uvicorn workers, poll the status through the same worker (sticky sessions) or
+run imports on a single worker.
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import UploadFile
+
+JOBS_MAX_HISTORY = int(os.getenv("JOBS_MAX_HISTORY", "100"))
+JOBS_TEMP_DIR = os.getenv("JOBS_TEMP_DIR") or None
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class ImportJob:
+    """State of one queued data refresh."""
+
+    def __init__(self, kind: str, filename: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.path = path
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.progress = {"rows_parsed": 0, "rows_validated": 0, "rows_inserted": 0, "rows_skipped": 0}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # "validation" for bad input (the old endpoints answered 400), "internal" otherwise
+        self.error_type: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "error_type": self.error_type,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+_current_job: ContextVar[Optional[ImportJob]] = ContextVar("current_import_job", default=None)
+
+
+def report_progress(stage: Optional[str] = None, parsed: int = 0, validated: int = 0,
+                    inserted: int = 0, skipped: int = 0) -> None:
+    """
+    Adds to the running job's progress counters. A no-op outside a job
+    (e.g. when a loader is called from a script).
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    if stage is not None:
+        job.stage = stage
+    job.progress["rows_parsed"] += parsed
+    job.progress["rows_validated"] += validated
+    job.progress["rows_inserted"] += inserted
+    job.progress["rows_skipped"] += skipped
+
+
+async def save_upload(upload: UploadFile, suffix: str = "") -> str:
+    """
+    Spools an upload to a temporary file in fixed-size chunks.
+
+    Returns:
+        str: Path of the temporary file (removed by the job queue when the job finishes)
+    """
+    handle, path = tempfile.mkstemp(suffix=suffix, prefix="orbit-upload-", dir=JOBS_TEMP_DIR)
+    try:
+        with os.fdopen(handle, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                out.write(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+class JobQueue:
+    """FIFO of import jobs served by a single background worker task."""
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts the worker; call from the application startup hook."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(), name="import-job-worker")
+
+    async def stop(self) -> None:
+        """Cancels the worker; queued jobs are dropped and their uploads removed."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for job in self._jobs.values():
+            if job.status == QUEUED:
+                job.status, job.error, job.error_type = FAILED, "Server shut down before the job started", "internal"
+                _remove_file(job.path)
+
+    def submit(self, kind: str, filename: str, path: str,
+               runner: Callable[[str], Awaitable[Dict[str, Any]]]) -> ImportJob:
+        """
+        Queues an import.
+
+        Args:
+            kind: Job type shown in the status, e.g. "excel_refresh"
+            filename: Original upload name
+            path: Spooled upload (see save_upload)
+            runner: Coroutine function called with the path; returns the job summary
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        job = ImportJob(kind, filename, path)
+        self._jobs[job.id] = job
+        self._trim()
+        self._queue.put_nowait((job, runner))
+        logger.info(f"Queued {kind} job {job.id} for '{filename}' ({self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get(job_id)
+
+    def _trim(self) -> None:
+        """Forgets the oldest finished jobs beyond JOBS_MAX_HISTORY."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (SUCCEEDED, FAILED)]
+        for job_id in finished[:max(0, len(finished) - JOBS_MAX_HISTORY)]:
+            del self._jobs[job_id]
+
+    async def _run(self) -> None:
+        while True:
+            job, runner = await self._queue.get()
+            token = _current_job.set(job)
+            job.status, job.started_at = RUNNING, datetime.utcnow()
+            logger.info(f"Starting {job.kind} job {job.id} ('{job.filename}')")
+            try:
+                job.result = await runner(job.path)
+                job.status = SUCCEEDED
+                logger.info(f"Finished {job.kind} job {job.id}")
+            except asyncio.CancelledError:
+                job.status, job.error, job.error_type = FAILED, "Server shut down during the job", "internal"
+                raise
+            except ValueError as ve:
+                job.status, job.error, job.error_type = FAILED, str(ve), "validation"
+                logger.error(f"{job.kind} job {job.id} failed validation: {ve}")
+            except Exception as e:
+                job.status, job.error, job.error_type = FAILED, f"An internal error occurred: {e}", "internal"
+                logger.error(f"{job.kind} job {job.id} failed: {e}", exc_info=True)
+            finally:
+                job.finished_at = datetime.utcnow()
+                job.stage = None
+                _current_job.reset(token)
+                _remove_file(job.path)
+                self._queue.task_done()
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+job_queue = JobQueue()
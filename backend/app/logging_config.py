@@ -0,0 +1,107 @@
+"""
+Logging Configuration Module
+
+Purpose: Central logging setup for the API process
+Features:
+- Global level plus per-module overrides
+- Plain text or JSON (one object per line) output
+- Sampling helper for hot-path debug events (e.g. per-request auth checks)
+
+Configuration (environment variables):
+- LOG_LEVEL: root level (default INFO)
+- LOG_LEVELS: per-module overrides, comma separated, e.g.
+  "app.excel_loader=WARNING,app.auth_utils=DEBUG,sqlalchemy.engine=INFO"
+- LOG_FORMAT: "text" (default) or "json"
+- LOG_SAMPLE_RATE: fraction of sampled debug events that are emitted (default 0.01)
+
+Modules should log through logging.getLogger(__name__) so per-module levels apply,
+and guard expensive message construction inside loops with
+logger.isEnabledFor(logging.DEBUG).
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import json
+import logging
+import os
+import random
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied "extra" fields
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object, including any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _parse_levels(spec: str) -> dict:
+    """Parse "module=LEVEL,module2=LEVEL" into a dict, ignoring malformed entries."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """
+    Install the root handler and apply levels. Safe to call more than once;
+    later calls replace the handler installed by earlier ones.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if getattr(existing, "_orbit_handler", False):
+            root.removeHandler(existing)
+    handler._orbit_handler = True
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+
+    for name, level in _parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+
+def log_sampled(logger: logging.Logger, level: int, msg: str, *args, rate: float = None) -> None:
+    """
+    Emit a log event for only a fraction of calls.
+
+    The level check runs first, so a disabled event costs one comparison and no
+    formatting. Pass %-style args rather than an f-string so formatting is deferred.
+
+    Args:
+        logger: Logger to emit on
+        level: Logging level, e.g. logging.DEBUG
+        msg: %-style message
+        rate: Fraction of events to keep (defaults to LOG_SAMPLE_RATE)
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if random.random() >= (LOG_SAMPLE_RATE if rate is None else rate):
+        return
+    logger.log(level, msg, *args)
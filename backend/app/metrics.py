@@ -0,0 +1,290 @@
+"""
+Request Metrics Module
+
+Purpose: Per-request timing and SQL instrumentation with a Prometheus endpoint
+Features:
+- ASGI middleware recording wall time per route template
+- SQLAlchemy cursor hooks on async_engine recording DB time, statement count and rows
+- Slow-request log including the SQL captured for that request
+- Prometheus text exposition (rendered by GET /metrics in main.py), including
+  connection pool, password hashing pool and in-process cache statistics
+
+Configuration (environment variables):
+- SLOW_REQUEST_MS: requests slower than this are logged with their SQL (default 1000, 0 disables)
+- METRICS_MAX_CAPTURED_STATEMENTS: SQL statements kept per request for the slow log (default 50)
+
+Note: Metrics are kept per worker process. With several uvicorn workers each worker
+reports its own counters; aggregate them in Prometheus by instance.
+
+Rows are taken from the DBAPI cursor rowcount, which covers rows returned by
+SELECT and rows affected by INSERT/UPDATE/DELETE.
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+from app.database import async_engine, get_pool_status
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+METRICS_MAX_CAPTURED_STATEMENTS = int(os.getenv("METRICS_MAX_CAPTURED_STATEMENTS", "50"))
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestStats:
+    """SQL activity collected while serving one request."""
+
+    __slots__ = ("db_seconds", "statements", "rows", "captured")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.rows = 0
+        # (milliseconds, SQL text) of the first METRICS_MAX_CAPTURED_STATEMENTS statements
+        self.captured: List[Tuple[float, str]] = []
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class _Histogram:
+    """Cumulative histogram with fixed buckets (Prometheus semantics)."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class _RouteMetrics:
+    """Aggregated metrics for one (method, route) pair."""
+
+    def __init__(self):
+        self.status_counts: Dict[int, int] = {}
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.statements = _Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+_routes: Dict[Tuple[str, str], _RouteMetrics] = {}
+
+
+# --- SQLAlchemy hooks ---
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    if stats is None:
+        return
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats.db_seconds += elapsed
+    stats.statements += 1
+    rowcount = getattr(cursor, "rowcount", -1)
+    if rowcount and rowcount > 0:
+        stats.rows += rowcount
+    if len(stats.captured) < METRICS_MAX_CAPTURED_STATEMENTS:
+        stats.captured.append((elapsed * 1000, statement))
+
+
+# --- ASGI middleware ---
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no response buffering) that times each HTTP request and
+    attributes the SQL executed while serving it.
+
+    Requests are grouped by route template (e.g. /assignments/training/{training_id}/candidates)
+    so path parameters do not explode the number of series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            _record(scope["method"], route_path, status_code, elapsed, stats)
+
+
+def _record(method: str, route_path: str, status_code: int, elapsed: float, stats: RequestStats) -> None:
+    """Fold one finished request into the aggregates and log it if slow."""
+    metrics = _routes.get((method, route_path))
+    if metrics is None:
+        metrics = _routes[(method, route_path)] = _RouteMetrics()
+    metrics.status_counts[status_code] = metrics.status_counts.get(status_code, 0) + 1
+    metrics.duration.observe(elapsed)
+    metrics.statements.observe(stats.statements)
+    metrics.db_seconds += stats.db_seconds
+    metrics.rows += stats.rows
+
+    if SLOW_REQUEST_MS > 0 and elapsed * 1000 >= SLOW_REQUEST_MS:
+        sql_lines = "\n".join(f"  [{ms:.1f} ms] {' '.join(sql.split())}" for ms, sql in stats.captured)
+        if stats.statements > len(stats.captured):
+            sql_lines += f"\n  ... {stats.statements - len(stats.captured)} more statement(s)"
+        logger.warning(
+            f"Slow request: {method} {route_path} -> {status_code} in {elapsed * 1000:.0f} ms "
+            f"(db {stats.db_seconds * 1000:.0f} ms, {stats.statements} statements, {stats.rows} rows)\n{sql_lines}"
+        )
+
+
+# --- Prometheus exposition ---
+
+def _labels(**labels) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _histogram_lines(name: str, histogram: _Histogram, **labels) -> List[str]:
+    lines = []
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.total}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+    # Imported here: these modules import app.database as well
+    from app.auth_utils import get_hashing_metrics
+    from app.identity import identity_cache
+    from app.trainer_index import trainer_index_cache
+    from app.shared_content_cache import shared_content_cache
+
+    lines = [
+        "# HELP http_requests_total HTTP requests by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    routes = sorted(_routes.items())
+    for (method, path), metrics in routes:
+        for status_code, count in sorted(metrics.status_counts.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=path, status=status_code)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Wall time per request.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, path), metrics in routes:
+        lines += _histogram_lines("http_request_duration_seconds", metrics.duration, method=method, route=path)
+
+    lines += [
+        "# HELP http_request_db_statements SQL statements executed per request.",
+        "# TYPE http_request_db_statements histogram",
+    ]
+    for (method, path), metrics in routes:
+        lines += _histogram_lines("http_request_db_statements", metrics.statements, method=method, route=path)
+
+    lines += [
+        "# HELP http_request_db_seconds_total Time spent executing SQL while serving requests.",
+        "# TYPE http_request_db_seconds_total counter",
+    ]
+    for (method, path), metrics in routes:
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=path)} {metrics.db_seconds}")
+
+    lines += [
+        "# HELP http_request_db_rows_total Rows returned or affected by SQL while serving requests.",
+        "# TYPE http_request_db_rows_total counter",
+    ]
+    for (method, path), metrics in routes:
+        lines.append(f"http_request_db_rows_total{_labels(method=method, route=path)} {metrics.rows}")
+
+    pool = get_pool_status()
+    lines += [
+        "# HELP db_pool_connections Connections in the SQLAlchemy pool by state.",
+        "# TYPE db_pool_connections gauge",
+        f"db_pool_connections{_labels(state='checked_in')} {pool['checked_in']}",
+        f"db_pool_connections{_labels(state='checked_out')} {pool['checked_out']}",
+        f"db_pool_connections{_labels(state='overflow')} {pool['overflow']}",
+        "# HELP db_pool_size Configured persistent pool size.",
+        "# TYPE db_pool_size gauge",
+        f"db_pool_size {pool['pool_size']}",
+    ]
+
+    hashing = get_hashing_metrics()
+    lines += [
+        "# HELP password_hash_queue Password hashing callers waiting for / running on the pool.",
+        "# TYPE password_hash_queue gauge",
+        f"password_hash_queue{_labels(state='queued')} {hashing['queued']}",
+        f"password_hash_queue{_labels(state='in_flight')} {hashing['in_flight']}",
+        "# HELP password_hash_completed_total Password hashes computed.",
+        "# TYPE password_hash_completed_total counter",
+        f"password_hash_completed_total {hashing['completed']}",
+        "# HELP password_hash_seconds_total Time password hashes spent queued and running.",
+        "# TYPE password_hash_seconds_total counter",
+        f"password_hash_seconds_total{_labels(phase='wait')} {hashing['wait_seconds_total']}",
+        f"password_hash_seconds_total{_labels(phase='run')} {hashing['run_seconds_total']}",
+    ]
+
+    caches = {"identity": identity_cache, "trainer_index": trainer_index_cache,
+              "shared_content": shared_content_cache}
+    lines += [
+        "# HELP cache_requests_total In-process cache lookups by result.",
+        "# TYPE cache_requests_total counter",
+    ]
+    for name, cache in caches.items():
+        stats = cache.stats()
+        lines.append(f"cache_requests_total{_labels(cache=name, result='hit')} {stats['hits']}")
+        lines.append(f"cache_requests_total{_labels(cache=name, result='miss')} {stats['misses']}")
+    lines += [
+        "# HELP cache_entries Entries currently held by in-process caches.",
+        "# TYPE cache_entries gauge",
+    ]
+    for name, cache in caches.items():
+        lines.append(f"cache_entries{_labels(cache=name)} {cache.stats()['size']}")
+
+    return "\n".join(lines) + "\n"
@@ -11,6 +11,7 @@ Models:
 - AdditionalSkill: Self-reported additional skills
 - Trainer: Trainer information and expertise
 - TrainingDetail: Training session details
+- TrainingTrainer: Resolved trainer usernames per training
 - TrainingAssignment: Training assignments to employees
 - TrainingRequest: Training approval requests
 - AssignmentSubmission: Assignment exam submissions
@@ -18,17 +19,22 @@ Models:
 - SharedAssignment: Shared assignments from trainers
 - SharedFeedback: Shared feedback forms from trainers
 - ManagerPerformanceFeedback: Manager feedback on employee performance
+- UploadHash: Content hash of the last applied upload per sheet / file
 
 @author Orbit Skill Development Team
 @date 2025
 """
 
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Boolean, Text, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
 
+# Question / answer payloads: JSONB on PostgreSQL (queryable and indexable in SQL)
+JSONPayload = JSON().with_variant(JSONB(), "postgresql")
+
 class User(Base):
     """
     User model - Stores user account information and authentication data.
@@ -53,6 +59,13 @@ class ManagerEmployee(Base):
     employee_name = Column(String)
     manager_is_trainer = Column(Boolean, default=False, nullable=False)
     employee_is_trainer = Column(Boolean, default=False, nullable=False)
+    # Covering indexes for login / identity lookups (index-only scans on either side of the relation)
+    __table_args__ = (
+        Index('ix_manager_employee_manager_cover', 'manager_empid',
+              postgresql_include=['manager_name', 'manager_is_trainer']),
+        Index('ix_manager_employee_employee_cover', 'employee_empid',
+              postgresql_include=['employee_name', 'employee_is_trainer']),
+    )
 
 class EmployeeCompetency(Base):
     __tablename__ = 'employee_competency'
@@ -70,6 +83,11 @@ class EmployeeCompetency(Base):
     target_expertise = Column(String)
     comments = Column(String)
     target_date = Column(Date)
+
+    __table_args__ = (
+        # Dashboards (by employee) and skill updates (employee + skill)
+        Index('ix_employee_competency_employee_skill', 'employee_empid', 'skill'),
+    )
     employee = relationship("User")
 
 class AdditionalSkill(Base):
@@ -112,6 +130,22 @@ class TrainingDetail(Base):
     seats = Column(String, nullable=True)
     assessment_details = Column(String, nullable=True)
 
+class TrainingTrainer(Base):
+    """
+    Resolved trainers of a training (see app/trainer_index.py).
+
+    training_details.trainer_name is free text from Excel; this table maps it to
+    usernames once so authorization checks are an indexed lookup.
+    """
+    __tablename__ = 'training_trainers'
+    training_id = Column(Integer, ForeignKey('training_details.id', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
+    trainer_username = Column(String, ForeignKey('users.username'), primary_key=True)
+
+    __table_args__ = (
+        # "Which trainings does this user teach" (the PK covers lookups by training)
+        Index('ix_training_trainers_trainer', 'trainer_username', 'training_id'),
+    )
+
 class TrainingAssignment(Base):
     __tablename__ = 'training_assignments'
     id = Column(Integer, primary_key=True, index=True)
@@ -121,6 +155,11 @@ class TrainingAssignment(Base):
     # Match existing DB column name 'assignment_date' (timestamp)
     assignment_date = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # One assignment per employee per training; bulk inserts rely on it for ON CONFLICT DO NOTHING
+        Index('uq_training_assignments_training_employee', 'training_id', 'employee_empid', unique=True),
+    )
+
 class TrainingAttendance(Base):
     __tablename__ = 'training_attendance'
     id = Column(Integer, primary_key=True, index=True)
@@ -132,6 +171,12 @@ class TrainingAttendance(Base):
     training = relationship("TrainingDetail")
     employee = relationship("User", foreign_keys=[employee_empid])
 
+    __table_args__ = (
+        # One row per employee per training (attendance is re-marked by replacing the training's rows);
+        # checked on every assignment / feedback access
+        Index('uq_training_attendance_training_employee', 'training_id', 'employee_empid', unique=True),
+    )
+
 class TrainingRequest(Base):
     __tablename__ = 'training_requests'
     id = Column(Integer, primary_key=True, index=True)
@@ -147,6 +192,15 @@ class TrainingRequest(Base):
     employee = relationship("User", foreign_keys=[employee_empid])
     manager = relationship("User", foreign_keys=[manager_empid])
 
+    __table_args__ = (
+        # One request per employee per training; also serves "my requests"
+        Index('uq_training_requests_employee_training', 'employee_empid', 'training_id', unique=True),
+        Index('ix_training_requests_manager_status', 'manager_empid', 'status'),
+        # A manager's pending queue, newest first; decided requests are not indexed
+        Index('ix_training_requests_pending', 'manager_empid', 'request_date',
+              postgresql_where=text("status = 'pending'")),
+    )
+
 class SharedAssignment(Base):
     __tablename__ = 'shared_assignments'
     id = Column(Integer, primary_key=True, index=True)
@@ -154,7 +208,8 @@ class SharedAssignment(Base):
     trainer_username = Column(String, ForeignKey('users.username'), nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    assignment_data = Column(Text, nullable=False)  # JSON string storing questions and options
+    assignment_data = Column(JSONPayload, nullable=False)  # List of questions and options
+    answer_key = Column(JSONPayload, nullable=True)  # Compiled from assignment_data on share (app/grading.py)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     # Relationships
@@ -166,7 +221,7 @@ class SharedFeedback(Base):
     id = Column(Integer, primary_key=True, index=True)
     training_id = Column(Integer, ForeignKey('training_details.id'), nullable=False)
     trainer_username = Column(String, ForeignKey('users.username'), nullable=False)
-    feedback_data = Column(Text, nullable=False)  # JSON string storing feedback questions
+    feedback_data = Column(JSONPayload, nullable=False)  # {"defaultQuestions": [...], "customQuestions": [...]}
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     # Relationships
@@ -179,29 +234,45 @@ class AssignmentSubmission(Base):
     training_id = Column(Integer, ForeignKey('training_details.id'), nullable=False)
     shared_assignment_id = Column(Integer, ForeignKey('shared_assignments.id'), nullable=False)
     employee_empid = Column(String, ForeignKey('users.username'), nullable=False)
-    answers_data = Column(Text, nullable=False)  # JSON string storing user answers
+    answers_data = Column(JSONPayload, nullable=False)  # List of answers (questionIndex, selectedOptions, ...)
     score = Column(Integer, nullable=True)  # Score out of 100
     total_questions = Column(Integer, nullable=False)
     correct_answers = Column(Integer, nullable=False)
+    question_results = Column(JSONPayload, nullable=True)  # Per-question results, graded at submit time
     submitted_at = Column(DateTime, default=datetime.utcnow)
     # Relationships
     training = relationship("TrainingDetail")
     shared_assignment = relationship("SharedAssignment")
     employee = relationship("User", foreign_keys=[employee_empid])
 
+    __table_args__ = (
+        # An employee's submissions for a training (latest first at read time)
+        Index('ix_assignment_submissions_training_employee', 'training_id', 'employee_empid'),
+        # Containment queries on answers, e.g. answers_data @> '[{"questionIndex": 3, "selectedOptions": [2]}]'
+        Index('ix_assignment_submissions_answers', 'answers_data',
+              postgresql_using='gin', postgresql_ops={'answers_data': 'jsonb_path_ops'}),
+    )
+
 class FeedbackSubmission(Base):
     __tablename__ = 'feedback_submissions'
     id = Column(Integer, primary_key=True, index=True)
     training_id = Column(Integer, ForeignKey('training_details.id'), nullable=False)
     shared_feedback_id = Column(Integer, ForeignKey('shared_feedback.id'), nullable=False)
     employee_empid = Column(String, ForeignKey('users.username'), nullable=False)
-    responses_data = Column(Text, nullable=False)  # JSON string storing feedback responses
+    responses_data = Column(JSONPayload, nullable=False)  # List of responses (questionIndex, selectedOption, ...)
     submitted_at = Column(DateTime, default=datetime.utcnow)
     # Relationships
     training = relationship("TrainingDetail")
     shared_feedback = relationship("SharedFeedback")
     employee = relationship("User", foreign_keys=[employee_empid])
 
+    __table_args__ = (
+        Index('ix_feedback_submissions_training_employee', 'training_id', 'employee_empid'),
+        # Containment queries on responses, e.g. responses_data @> '[{"selectedOption": "Excellent"}]'
+        Index('ix_feedback_submissions_responses', 'responses_data',
+              postgresql_using='gin', postgresql_ops={'responses_data': 'jsonb_path_ops'}),
+    )
+
 class ManagerPerformanceFeedback(Base):
     __tablename__ = 'manager_performance_feedback'
     id = Column(Integer, primary_key=True, index=True)
@@ -225,3 +296,21 @@ class ManagerPerformanceFeedback(Base):
     employee = relationship("User", foreign_keys=[employee_empid])
     manager = relationship("User", foreign_keys=[manager_empid])
 
+    __table_args__ = (
+        # Latest feedback and history for an employee's training, ordered by updated_at
+        Index('ix_manager_performance_feedback_training_employee', 'training_id', 'employee_empid', 'updated_at'),
+    )
+
+class UploadHash(Base):
+    """
+    Content hash of the last upload applied to the tables (see app/upload_hashes.py).
+
+    Attributes:
+        source: What was hashed, e.g. "sheet:Training Details" or "file:workbook"
+        content_hash: SHA-256 hex digest of the content
+        applied_at: When the content was last committed
+    """
+    __tablename__ = 'upload_hashes'
+    source = Column(String, primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
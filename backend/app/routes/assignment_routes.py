@@ -10,7 +10,9 @@ Features:
 
 Endpoints:
 - POST /assignments/: Assign training to employee
+- POST /assignments/bulk: Assign many (training, employee) pairs in one transaction
 - GET /assignments/my: Get current user's assignments
+- GET /assignments/my/dashboard: Assignments with attendance, score and feedback status
 - GET /assignments/manager/team: Get team assignments (manager only)
 - DELETE /assignments/{id}: Delete assignment
 
@@ -22,23 +24,52 @@ from fastapi import APIRouter, Depends, HTTPException
 from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from typing import List
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import delete, and_, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.database import get_db_async
 from app import models
-from app.auth_utils import get_current_active_user # Using your auth dependency
+from app.auth_utils import get_current_active_user, get_current_identity # Using your auth dependency
+from app.identity import Identity
+from app.trainer_index import is_training_trainer
 
 router = APIRouter(
     prefix="/assignments",
     tags=["Assignments"]
 )
 
+# Upper bound on pairs accepted by POST /assignments/bulk
+MAX_BULK_ASSIGNMENTS = 5000
+
 class AssignmentCreate(BaseModel):
     """Request schema for creating a training assignment"""
     training_id: int
     employee_username: str
 
+class BulkAssignmentCreate(BaseModel):
+    """
+    Request schema for bulk assignment.
+    Pairs in 'assignments' are combined with the cross product of
+    'training_ids' x 'employee_usernames'; either part may be empty.
+    """
+    assignments: List[AssignmentCreate] = []
+    training_ids: List[int] = []
+    employee_usernames: List[str] = []
+
+class BulkAssignmentOutcome(BaseModel):
+    """Result for one requested (training, employee) pair"""
+    training_id: int
+    employee_username: str
+    # assigned | already_assigned | duplicate_in_request | training_not_found | not_in_team
+    status: str
+
+class BulkAssignmentResponse(BaseModel):
+    """Response schema for bulk assignment"""
+    assigned_count: int
+    results: List[BulkAssignmentOutcome]
+
 @router.post("/", status_code=201)
 async def assign_training_to_employee(
     assignment: AssignmentCreate,
@@ -107,6 +138,149 @@ async def assign_training_to_employee(
             detail=f"Failed to assign training: {str(e)}"
         )
 
+@router.post("/bulk", response_model=BulkAssignmentResponse, status_code=200)
+async def bulk_assign_trainings(
+    bulk: BulkAssignmentCreate,
+    db: AsyncSession = Depends(get_db_async),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Assigns many trainings to team members in one request.
+
+    Training existence, team membership and existing assignments are each checked
+    with one set-based query, and all new rows are written with a single multi-row
+    INSERT ... ON CONFLICT DO NOTHING in one transaction. Returns one outcome per
+    requested pair, in request order.
+    """
+    manager_username = current_user.get("username")
+
+    pairs = [(a.training_id, a.employee_username) for a in bulk.assignments]
+    pairs.extend((t, e) for t in bulk.training_ids for e in bulk.employee_usernames)
+    if not pairs:
+        raise HTTPException(
+            status_code=400,
+            detail="No assignments requested"
+        )
+    if len(pairs) > MAX_BULK_ASSIGNMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many assignments in one request (maximum {MAX_BULK_ASSIGNMENTS})"
+        )
+
+    training_ids = {t for t, _ in pairs}
+    employee_usernames = {e for _, e in pairs}
+
+    # Trainings that exist
+    trainings_result = await db.execute(
+        select(models.TrainingDetail.id).where(models.TrainingDetail.id.in_(training_ids))
+    )
+    existing_trainings = set(trainings_result.scalars().all())
+
+    # Requested employees that are in this manager's team
+    team_result = await db.execute(
+        select(models.ManagerEmployee.employee_empid).where(
+            models.ManagerEmployee.manager_empid == manager_username,
+            models.ManagerEmployee.employee_empid.in_(employee_usernames)
+        )
+    )
+    team_members = set(team_result.scalars().all())
+
+    # Assignments that already exist (by anyone)
+    existing_result = await db.execute(
+        select(models.TrainingAssignment.training_id, models.TrainingAssignment.employee_empid).where(
+            models.TrainingAssignment.training_id.in_(training_ids),
+            models.TrainingAssignment.employee_empid.in_(employee_usernames)
+        )
+    )
+    already_assigned = set(existing_result.all())
+
+    statuses = []
+    to_insert = []
+    seen = set()
+    for pair in pairs:
+        training_id, employee_username = pair
+        if pair in seen:
+            statuses.append("duplicate_in_request")
+            continue
+        seen.add(pair)
+        if training_id not in existing_trainings:
+            statuses.append("training_not_found")
+        elif employee_username not in team_members:
+            statuses.append("not_in_team")
+        elif pair in already_assigned:
+            statuses.append("already_assigned")
+        else:
+            statuses.append("assigned")
+            to_insert.append({
+                "training_id": training_id,
+                "employee_empid": employee_username,
+                "manager_empid": manager_username,
+                "assignment_date": datetime.utcnow()
+            })
+
+    inserted = set()
+    if to_insert:
+        try:
+            insert_stmt = pg_insert(models.TrainingAssignment).values(to_insert).on_conflict_do_nothing().returning(
+                models.TrainingAssignment.training_id, models.TrainingAssignment.employee_empid
+            )
+            insert_result = await db.execute(insert_stmt)
+            inserted = set(insert_result.all())
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to assign trainings: {str(e)}"
+            )
+
+    results = []
+    for (training_id, employee_username), outcome in zip(pairs, statuses):
+        # Rows skipped by ON CONFLICT were assigned concurrently by another request
+        if outcome == "assigned" and (training_id, employee_username) not in inserted:
+            outcome = "already_assigned"
+        results.append(BulkAssignmentOutcome(
+            training_id=training_id,
+            employee_username=employee_username,
+            status=outcome
+        ))
+
+    return BulkAssignmentResponse(assigned_count=len(inserted), results=results)
+
+def _to_iso(val):
+    """Serialize a training date (date, datetime or ISO-like string) for JSON."""
+    if isinstance(val, (date, datetime)):
+        return val.isoformat()
+    if isinstance(val, str):
+        try:
+            # Try parse ISO-like strings
+            return datetime.fromisoformat(val).date().isoformat()
+        except Exception:
+            return val
+    return None
+
+def _serialize_training(td: models.TrainingDetail) -> dict:
+    """Minimal training fields returned to the engineer dashboard."""
+    return {
+        "id": td.id,
+        "division": td.division,
+        "department": td.department,
+        "competency": td.competency,
+        "skill": td.skill,
+        "training_name": td.training_name,
+        "training_topics": td.training_topics,
+        "prerequisites": td.prerequisites,
+        "skill_category": td.skill_category,
+        "trainer_name": td.trainer_name,
+        "email": td.email,
+        "training_date": _to_iso(td.training_date),
+        "duration": td.duration,
+        "time": td.time,
+        "training_type": td.training_type,
+        "seats": td.seats,
+        "assessment_details": td.assessment_details,
+    }
+
 @router.get("/my")
 async def get_my_assigned_trainings(
     db: AsyncSession = Depends(get_db_async),
@@ -130,40 +304,106 @@ async def get_my_assigned_trainings(
     result = await db.execute(stmt)
     trainings = result.scalars().all()
 
-    # Serialize minimal fields
-    def to_iso(val):
-        if isinstance(val, (date, datetime)):
-            return val.isoformat()
-        if isinstance(val, str):
-            try:
-                # Try parse ISO-like strings
-                return datetime.fromisoformat(val).date().isoformat()
-            except Exception:
-                return val
-        return None
-
-    def serialize(td: models.TrainingDetail):
-        return {
-            "id": td.id,
-            "division": td.division,
-            "department": td.department,
-            "competency": td.competency,
-            "skill": td.skill,
-            "training_name": td.training_name,
-            "training_topics": td.training_topics,
-            "prerequisites": td.prerequisites,
-            "skill_category": td.skill_category,
-            "trainer_name": td.trainer_name,
-            "email": td.email,
-            "training_date": to_iso(td.training_date),
-            "duration": td.duration,
-            "time": td.time,
-            "training_type": td.training_type,
-            "seats": td.seats,
-            "assessment_details": td.assessment_details,
-        }
+    return [_serialize_training(t) for t in trainings]
 
-    return [serialize(t) for t in trainings]
+@router.get("/my/dashboard")
+async def get_my_training_dashboard(
+    db: AsyncSession = Depends(get_db_async),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Returns the current user's assigned trainings together with everything the
+    engineer dashboard shows per training: attendance, whether an assignment and
+    feedback form are shared, the latest assignment score and whether feedback
+    was submitted.
+
+    Replaces one /assignments/my call plus two /result calls per training. Uses
+    three queries regardless of how many trainings are assigned. As with the
+    /result endpoints, submission status is only reported for attended trainings.
+    """
+    employee_username = current_user.get("username")
+
+    # 1. Assigned trainings with attendance and shared-content availability
+    attended = exists().where(
+        models.TrainingAttendance.training_id == models.TrainingDetail.id,
+        models.TrainingAttendance.employee_empid == employee_username,
+        models.TrainingAttendance.attended == True
+    )
+    shared_assignment_id = select(models.SharedAssignment.id).where(
+        models.SharedAssignment.training_id == models.TrainingDetail.id
+    ).limit(1).scalar_subquery()
+    shared_feedback_id = select(models.SharedFeedback.id).where(
+        models.SharedFeedback.training_id == models.TrainingDetail.id
+    ).limit(1).scalar_subquery()
+
+    trainings_stmt = select(
+        models.TrainingDetail,
+        attended.label("attended"),
+        shared_assignment_id.label("shared_assignment_id"),
+        shared_feedback_id.label("shared_feedback_id")
+    ).where(
+        models.TrainingDetail.id.in_(
+            select(models.TrainingAssignment.training_id).where(
+                models.TrainingAssignment.employee_empid == employee_username
+            )
+        )
+    )
+    training_rows = (await db.execute(trainings_stmt)).all()
+    if not training_rows:
+        return []
+
+    # 2. Latest submission per training for the currently shared assignment
+    submissions_stmt = select(
+        models.AssignmentSubmission.training_id,
+        models.AssignmentSubmission.score,
+        models.AssignmentSubmission.total_questions,
+        models.AssignmentSubmission.submitted_at
+    ).join(
+        models.SharedAssignment,
+        and_(
+            models.SharedAssignment.id == models.AssignmentSubmission.shared_assignment_id,
+            models.SharedAssignment.training_id == models.AssignmentSubmission.training_id
+        )
+    ).where(
+        models.AssignmentSubmission.employee_empid == employee_username
+    ).distinct(
+        models.AssignmentSubmission.training_id
+    ).order_by(
+        models.AssignmentSubmission.training_id,
+        models.AssignmentSubmission.submitted_at.desc()
+    )
+    latest_submissions = {
+        row.training_id: row for row in (await db.execute(submissions_stmt)).all()
+    }
+
+    # 3. Trainings whose currently shared feedback form was submitted
+    feedback_stmt = select(models.FeedbackSubmission.training_id).join(
+        models.SharedFeedback,
+        and_(
+            models.SharedFeedback.id == models.FeedbackSubmission.shared_feedback_id,
+            models.SharedFeedback.training_id == models.FeedbackSubmission.training_id
+        )
+    ).where(
+        models.FeedbackSubmission.employee_empid == employee_username
+    ).distinct()
+    feedback_submitted = set((await db.execute(feedback_stmt)).scalars().all())
+
+    dashboard = []
+    for training, has_attended, assignment_id, feedback_id in training_rows:
+        submission = latest_submissions.get(training.id) if has_attended else None
+        item = _serialize_training(training)
+        item.update({
+            "attended": bool(has_attended),
+            "assignment_shared": assignment_id is not None,
+            "feedback_shared": feedback_id is not None,
+            "assignment_submitted": submission is not None,
+            "assignment_score": submission.score if submission else None,
+            "assignment_total_questions": submission.total_questions if submission else None,
+            "assignment_submitted_at": _to_iso(submission.submitted_at) if submission else None,
+            "feedback_submitted": bool(has_attended) and training.id in feedback_submitted,
+        })
+        dashboard.append(item)
+    return dashboard
 
 @router.get("/manager/team")
 async def get_team_assigned_trainings(
@@ -251,19 +491,14 @@ async def delete_assignment(
 async def get_training_candidates(
     training_id: int,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Returns list of all candidates assigned to a specific training.
     Includes their attendance status.
     Only accessible by the trainer of that training.
     """
-    trainer_username = current_user.get("username")
-    if not trainer_username:
-        raise HTTPException(
-            status_code=401,
-            detail="Could not validate credentials"
-        )
+    trainer_username = identity.username
     
     # Verify the training exists and get trainer name
     training_stmt = select(models.TrainingDetail).where(
@@ -286,33 +521,8 @@ async def get_training_candidates(
             detail="Training has no trainer assigned"
         )
     
-    # Get employee/manager name for matching
-    employee_result = await db.execute(
-        select(models.ManagerEmployee.employee_name).where(
-            models.ManagerEmployee.employee_empid == trainer_username
-        ).distinct()
-    )
-    employee_name = employee_result.scalar_one_or_none()
-    
-    manager_result = await db.execute(
-        select(models.ManagerEmployee.manager_name).where(
-            models.ManagerEmployee.manager_empid == trainer_username
-        ).distinct()
-    )
-    manager_name = manager_result.scalar_one_or_none()
-    
-    display_name = employee_name or manager_name
-    trainer_username_lower = str(trainer_username).lower().strip()
-    display_name_lower = (display_name or "").lower().strip() if display_name else ""
-    trainer_name_lower = trainer_name.lower().strip()
-    
-    # Check if current user is the trainer
-    is_trainer = (
-        trainer_username_lower == trainer_name_lower or
-        display_name_lower == trainer_name_lower
-    )
-    
-    if not is_trainer:
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, trainer_username, training.id):
         raise HTTPException(
             status_code=403,
             detail="Only the trainer of this training can view candidates"
@@ -359,18 +569,13 @@ async def mark_training_attendance(
     training_id: int,
     attendance_data: AttendanceMarkRequest,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Marks attendance for candidates who attended the training.
     Only accessible by the trainer of that training.
     """
-    trainer_username = current_user.get("username")
-    if not trainer_username:
-        raise HTTPException(
-            status_code=401,
-            detail="Could not validate credentials"
-        )
+    trainer_username = identity.username
     
     # Verify the training exists and get trainer name
     training_stmt = select(models.TrainingDetail).where(
@@ -393,33 +598,8 @@ async def mark_training_attendance(
             detail="Training has no trainer assigned"
         )
     
-    # Get employee/manager name for matching
-    employee_result = await db.execute(
-        select(models.ManagerEmployee.employee_name).where(
-            models.ManagerEmployee.employee_empid == trainer_username
-        ).distinct()
-    )
-    employee_name = employee_result.scalar_one_or_none()
-    
-    manager_result = await db.execute(
-        select(models.ManagerEmployee.manager_name).where(
-            models.ManagerEmployee.manager_empid == trainer_username
-        ).distinct()
-    )
-    manager_name = manager_result.scalar_one_or_none()
-    
-    display_name = employee_name or manager_name
-    trainer_username_lower = str(trainer_username).lower().strip()
-    display_name_lower = (display_name or "").lower().strip() if display_name else ""
-    trainer_name_lower = trainer_name.lower().strip()
-    
-    # Check if current user is the trainer
-    is_trainer = (
-        trainer_username_lower == trainer_name_lower or
-        display_name_lower == trainer_name_lower
-    )
-    
-    if not is_trainer:
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, trainer_username, training.id):
         raise HTTPException(
             status_code=403,
             detail="Only the trainer of this training can mark attendance"
@@ -446,8 +626,9 @@ async def mark_training_attendance(
     )
     await db.execute(delete_stmt)
     
-    # Create new attendance records
-    for empid in attendance_data.candidate_empids:
+    # Create new attendance records (one per employee; duplicate IDs in the request are ignored)
+    attended_empids = set(attendance_data.candidate_empids)
+    for empid in attended_empids:
         attendance = models.TrainingAttendance(
             training_id=training_id,
             employee_empid=empid,
@@ -457,7 +638,7 @@ async def mark_training_attendance(
     
     # Also mark non-attended candidates as False (optional, but helps with tracking)
     for empid in valid_empids:
-        if empid not in attendance_data.candidate_empids:
+        if empid not in attended_empids:
             attendance = models.TrainingAttendance(
                 training_id=training_id,
                 employee_empid=empid,
@@ -469,6 +650,6 @@ async def mark_training_attendance(
     
     return {
         "message": "Attendance marked successfully",
-        "attended_count": len(attendance_data.candidate_empids),
+        "attended_count": len(attended_empids),
         "total_assigned": len(valid_empids)
     }
\ No newline at end of file
@@ -24,7 +24,8 @@ from sqlalchemy import update
 from app.database import get_db_async
 # Ensure you import your AdditionalSkill model
 from app.models import User, ManagerEmployee, EmployeeCompetency, AdditionalSkill
-from app.auth_utils import get_current_active_user, get_current_active_manager
+from app.auth_utils import get_current_active_manager, get_current_identity, get_current_manager_identity
+from app.identity import Identity
 from pydantic import BaseModel
 
 # Create a single router for both endpoints with a common prefix
@@ -91,21 +92,18 @@ def get_status_from_levels(current_level_str: str, target_level_str: str) -> str
 
 @router.get("/manager/dashboard")
 async def get_manager_data(
-    current_user: dict = Depends(get_current_active_manager),
+    identity: Identity = Depends(get_current_manager_identity),
     db: AsyncSession = Depends(get_db_async)
 ):
     """
     Fetches dashboard data for a manager, including their own skills 
     and their team's core AND additional skills.
     """
-    manager_username = current_user.get("username")
+    manager_username = identity.username
 
-    # Resolve manager display name from ManagerEmployee table if available
-    manager_name_result = await db.execute(
-        select(ManagerEmployee.manager_name).where(ManagerEmployee.manager_empid == manager_username)
-    )
-    manager_name_row = manager_name_result.first()
-    manager_display_name = manager_name_row[0] if manager_name_row and manager_name_row[0] else manager_username
+    # Manager display name and trainer flag come from the identity cache
+    manager_display_name = identity.manager_name or manager_username
+    manager_is_trainer = identity.manager_is_trainer
 
     # Fetch manager's own skills
     manager_skills_result = await db.execute(
@@ -120,13 +118,6 @@ async def get_manager_data(
         } for comp in manager_skills_orm
     ]
 
-    # Fetch manager_is_trainer from ManagerEmployee table
-    manager_trainer_result = await db.execute(
-        select(ManagerEmployee.manager_is_trainer).where(ManagerEmployee.manager_empid == manager_username)
-    )
-    manager_is_trainer_row = manager_trainer_result.first()
-    manager_is_trainer = manager_is_trainer_row[0] if manager_is_trainer_row else False
-    
     # Step 1: Get all employee IDs and names reporting to the current manager
     manager_relations_result = await db.execute(
         select(ManagerEmployee.employee_empid, ManagerEmployee.employee_name).where(ManagerEmployee.manager_empid == manager_username)
@@ -201,32 +192,23 @@ async def get_manager_data(
 
 @router.get("/engineer")
 async def get_engineer_data(
-    current_user: dict = Depends(get_current_active_user),
+    identity: Identity = Depends(get_current_identity),
     db: AsyncSession = Depends(get_db_async)
 ):
     """
     Fetches skill competency data for a single engineer.
     """
-    employee_username = current_user.get("username")
+    employee_username = identity.username
 
-    if current_user.get("role") != "employee":
+    if identity.role != "employee":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this resource"
         )
 
-    # MODIFIED: Fetch employee's name and trainer status in one query
-    employee_details_result = await db.execute(
-        select(
-            ManagerEmployee.employee_name,
-            ManagerEmployee.employee_is_trainer
-        ).where(ManagerEmployee.employee_empid == employee_username)
-    )
-    employee_details = employee_details_result.first()
-
-    # Safely unpack details, providing default values if the employee is not found
-    employee_name = employee_details.employee_name if employee_details else None
-    is_trainer = employee_details.employee_is_trainer if employee_details else False
+    # Employee's name and trainer status come from the identity cache
+    employee_name = identity.employee_name
+    is_trainer = identity.employee_is_trainer
     
     # Fetch user ID
     user_id_result = await db.execute(
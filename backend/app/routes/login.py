@@ -6,6 +6,7 @@ Features:
 - User login with username and password
 - JWT token generation
 - Role detection (manager/employee)
+- Single round trip: hash, role and display name are resolved in one SQL statement
 
 Endpoint:
 - POST /login: Authenticate user and return JWT token
@@ -17,63 +18,80 @@ The main login route is in app/auth.py
 @date 2025
 """
 
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import exists, func, update
 from app.database import get_db_async
 from app.models import User, ManagerEmployee
-from app.auth_utils import verify_password, create_access_token
+from app.auth_utils import verify_and_update_password_async, create_access_token
 from app.schemas import UserLogin
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def build_login_lookup(username: str):
+    """
+    Build the single statement that resolves everything /login needs for a user.
+
+    Returns one row (hashed_password, is_manager, display_name), or no row if the user
+    does not exist. Both subqueries are answered from the covering indexes on
+    manager_employee(manager_empid) and manager_employee(employee_empid).
+    """
+    # User is a manager if anyone reports to them; manager takes precedence over employee
+    is_manager = exists().where(ManagerEmployee.manager_empid == User.username)
+
+    # Prefer the employee name, then the manager name, then the username itself
+    employee_name = (
+        select(ManagerEmployee.employee_name)
+        .where(ManagerEmployee.employee_empid == User.username)
+        .limit(1)
+        .scalar_subquery()
+    )
+    manager_name = (
+        select(ManagerEmployee.manager_name)
+        .where(ManagerEmployee.manager_empid == User.username)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    return select(
+        User.hashed_password,
+        is_manager.label("is_manager"),
+        func.coalesce(employee_name, manager_name, User.username).label("display_name"),
+    ).where(User.username == username)
 
 @router.post("/login")
 async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db_async)):
-    # Check user
-    result = await db.execute(select(User).where(User.username == user_data.username))
-    user = result.scalars().first()
+    # Fetch hash, role and display name in one round trip
+    result = await db.execute(build_login_lookup(user_data.username))
+    row = result.first()
 
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not row:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # Determine role from manager_employee table
-    # Check if user is a manager (has employees reporting to them)
-    manager_check = await db.execute(
-        select(ManagerEmployee).where(ManagerEmployee.manager_empid == user_data.username)
-    )
-    is_manager = manager_check.scalars().first() is not None
-    
-    # Check if user is an employee (reports to a manager)
-    employee_check = await db.execute(
-        select(ManagerEmployee).where(ManagerEmployee.employee_empid == user_data.username)
-    )
-    is_employee = employee_check.scalars().first() is not None
-    
-    # Determine role: manager takes precedence if user is both
-    if is_manager:
-        role = "manager"
-    elif is_employee:
-        role = "employee"
-    else:
-        # User exists but not in manager_employee table - default to employee
-        role = "employee"
-
-    # Fetch employee name to add to the token
-    name_result = await db.execute(
-        select(ManagerEmployee.employee_name).where(ManagerEmployee.employee_empid == user_data.username)
-    )
-    employee_name = name_result.scalars().first()
-    
-    # If employee_name is None, use username as fallback
-    if employee_name is None:
-        # Try to get manager name if user is a manager
-        # Note: A manager can have multiple rows (one per employee), so we use first() instead of scalar_one_or_none()
-        manager_name_result = await db.execute(
-            select(ManagerEmployee.manager_name).where(ManagerEmployee.manager_empid == user_data.username)
-        )
-        manager_name = manager_name_result.scalars().first()
-        employee_name = manager_name or user_data.username
+    is_valid, upgraded_hash = await verify_and_update_password_async(user_data.password, row.hashed_password)
+    if not is_valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Transparently upgrade legacy (bcrypt / low-round) hashes on successful login
+    if upgraded_hash:
+        try:
+            await db.execute(
+                update(User).where(User.username == user_data.username).values(hashed_password=upgraded_hash)
+            )
+            await db.commit()
+        except Exception as e:
+            # A failed upgrade must not block the login; it will be retried next time
+            await db.rollback()
+            logger.warning(f"Could not persist upgraded password hash for {user_data.username}: {e}")
+
+    # Determine role: manager takes precedence if user is both.
+    # Users not in manager_employee at all default to employee.
+    role = "manager" if row.is_manager else "employee"
+    employee_name = row.display_name
 
     # Create token with username, role, and employee_name
     token = create_access_token({"sub": user_data.username, "role": role, "employee_name": employee_name})
-    return {"access_token": token, "token_type": "bearer", "role": role}
\ No newline at end of file
+    return {"access_token": token, "token_type": "bearer", "role": role}
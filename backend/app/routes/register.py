@@ -25,7 +25,7 @@ from sqlalchemy import select
 from app.schemas import UserRegister
 from app.database import get_db_async
 from app.models import User
-from app.auth_utils import get_password_hash
+from app.auth_utils import get_password_hash_async
 
 router = APIRouter()
 
@@ -40,7 +40,7 @@ async def register_user(user: UserRegister, db: AsyncSession = Depends(get_db_as
         raise HTTPException(status_code=400, detail="Username already exists")
 
     # Hash password and create user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     new_user = User(
         username=user.emp_id,
         hashed_password=hashed_password,
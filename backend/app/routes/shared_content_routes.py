@@ -15,6 +15,7 @@ Endpoints:
 - GET /shared-content/assignments/{trainingId}/result: Get assignment results
 - POST /shared-content/feedback: Share a feedback form (trainer)
 - POST /shared-content/feedback/submit: Submit feedback
+- GET /shared-content/trainer/assignments/{trainingId}/analytics: Option counts per question (trainer)
 - GET /shared-content/manager/team/assignments: Get team assignment submissions
 - GET /shared-content/manager/team/feedback: Get team feedback submissions
 - POST /shared-content/manager/performance-feedback: Provide performance feedback
@@ -29,11 +30,15 @@ from sqlalchemy.future import select
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import json
+from sqlalchemy import distinct, func, text
 
-from app.database import get_db_async
+from app.database import get_db_async, json_loads
 from app import models
-from app.auth_utils import get_current_active_user, get_current_active_manager
+from app.auth_utils import get_current_active_user, get_current_active_manager, get_current_identity, get_current_manager_identity
+from app.identity import Identity
+from app.trainer_index import is_training_trainer
+from app.grading import compile_answer_key, grade_submission, regrade_submissions, score_percent
+from app.shared_content_cache import ASSIGNMENT, FEEDBACK, cached_response, invalidate_shared_content
 
 router = APIRouter(
     prefix="/shared-content",
@@ -67,6 +72,9 @@ class SharedAssignmentResponse(BaseModel):
     questions: List[Dict[str, Any]]
     created_at: datetime
     updated_at: datetime
+    # Set when an edit re-scored existing submissions
+    regraded_submissions: Optional[int] = None
+    scores_changed: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -93,23 +101,35 @@ class SharedFeedbackResponse(BaseModel):
     class Config:
         from_attributes = True
 
+async def _load_answer_key(db: AsyncSession, shared_assignment_id: int) -> List[Dict[str, Any]]:
+    """
+    Answer key of an assignment. Assignments shared before keys were stored get
+    theirs compiled here and saved with the caller's next commit.
+    """
+    shared_assignment = await db.get(models.SharedAssignment, shared_assignment_id)
+    if shared_assignment.answer_key is None:
+        shared_assignment.answer_key = compile_answer_key(_json_payload(shared_assignment.assignment_data))
+    return shared_assignment.answer_key
+
+def _json_payload(value: Any) -> Any:
+    """
+    Payload of a JSON column. The driver decodes JSONB itself; a str means the
+    column is still TEXT (before migrate_json_columns.py has run).
+    """
+    return json_loads(value) if isinstance(value, str) else value
+
 # --- Routes ---
 
 @router.post("/assignments", response_model=SharedAssignmentResponse, status_code=status.HTTP_201_CREATED)
 async def share_assignment(
     assignment_data: SharedAssignmentCreate,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Allows a trainer to share an assignment for a training they have scheduled.
     """
-    trainer_username = current_user.get("username")
-    if not trainer_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    trainer_username = identity.username
 
     # Verify the training exists
     training_stmt = select(models.TrainingDetail).where(
@@ -133,80 +153,17 @@ async def share_assignment(
             detail="Training has no trainer assigned"
         )
     
-    # Get employee/manager name from ManagerEmployee table for additional matching
-    # Check both employee_empid and manager_empid to support both employees and managers
-    employee_result = await db.execute(
-        select(models.ManagerEmployee.employee_name).where(
-            models.ManagerEmployee.employee_empid == trainer_username
-        )
-    )
-    employee_name = employee_result.scalars().first()
-    
-    manager_result = await db.execute(
-        select(models.ManagerEmployee.manager_name).where(
-            models.ManagerEmployee.manager_empid == trainer_username
-        )
-    )
-    manager_name = manager_result.scalars().first()
-    
-    display_name = employee_name or manager_name
-    
-    trainer_username_lower = str(trainer_username).lower().strip()
-    display_name_lower = (display_name or "").lower().strip() if display_name else ""
-    
-    # Split trainer_name by comma (Excel format) or newline, then check each
-    trainer_names = []
-    if ',' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split(',') if t.strip()]
-    elif '\n' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split('\n') if t.strip()]
-    else:
-        trainer_names = [trainer_name.strip()]
-    
-    # Check multiple matching strategies for each trainer name:
-    is_trainer = False
-    for single_trainer_name in trainer_names:
-        trainer_name_lower = single_trainer_name.lower().strip()
-        
-        # 1. Exact match with username
-        if trainer_name_lower == trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 2. Exact match with display name
-        if display_name_lower and trainer_name_lower == display_name_lower:
-            is_trainer = True
-            break
-        
-        # 3. Contains username (for partial matches)
-        if trainer_username_lower in trainer_name_lower or trainer_name_lower in trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 4. Contains display name (for partial matches)
-        if display_name_lower:
-            if display_name_lower in trainer_name_lower or trainer_name_lower in display_name_lower:
-                is_trainer = True
-                break
-        
-        # 5. Check if any part of display name matches (e.g., "Sharib Jawed" matches "Sharib" or "Jawed")
-        if display_name_lower:
-            name_parts = [part.strip() for part in display_name_lower.split() if len(part.strip()) > 2]
-            for part in name_parts:
-                if part in trainer_name_lower or trainer_name_lower in part:
-                    is_trainer = True
-                    break
-            if is_trainer:
-                break
-    
-    if not is_trainer:
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, trainer_username, training.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only share assignments for trainings you have scheduled"
         )
 
-    # Convert questions to JSON string
-    questions_json = json.dumps([q.dict() for q in assignment_data.questions])
+    # Stored as JSONB; the driver encodes it. The answer key is compiled once here
+    # so submissions are graded without re-reading the questions
+    questions_payload = [q.dict() for q in assignment_data.questions]
+    answer_key = compile_answer_key(questions_payload)
 
     # Check if assignment already exists for this training (update existing)
     existing_stmt = select(models.SharedAssignment).where(
@@ -219,19 +176,16 @@ async def share_assignment(
         # Update existing assignment
         existing_assignment.title = assignment_data.title
         existing_assignment.description = assignment_data.description
-        existing_assignment.assignment_data = questions_json
+        existing_assignment.assignment_data = questions_payload
+        existing_assignment.answer_key = answer_key
         existing_assignment.updated_at = datetime.utcnow()
+        # Stored scores were graded against the old questions; re-score them in the same transaction
+        regrade = await regrade_submissions(db, existing_assignment.id, answer_key)
         await db.commit()
+        invalidate_shared_content(existing_assignment.training_id)
         await db.refresh(existing_assignment)
         
-        # Parse and return
-        try:
-            questions_data = json.loads(existing_assignment.assignment_data)
-        except (json.JSONDecodeError, TypeError) as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to parse assignment data: {str(e)}"
-            )
+        questions_data = _json_payload(existing_assignment.assignment_data)
         return SharedAssignmentResponse(
             id=existing_assignment.id,
             training_id=existing_assignment.training_id,
@@ -240,7 +194,9 @@ async def share_assignment(
             description=existing_assignment.description,
             questions=questions_data,
             created_at=existing_assignment.created_at,
-            updated_at=existing_assignment.updated_at
+            updated_at=existing_assignment.updated_at,
+            regraded_submissions=regrade["regraded"],
+            scores_changed=regrade["scores_changed"]
         )
     else:
         # Create new assignment
@@ -249,20 +205,15 @@ async def share_assignment(
             trainer_username=trainer_username,
             title=assignment_data.title,
             description=assignment_data.description,
-            assignment_data=questions_json
+            assignment_data=questions_payload,
+            answer_key=answer_key
         )
         db.add(new_assignment)
         await db.commit()
+        invalidate_shared_content(new_assignment.training_id)
         await db.refresh(new_assignment)
 
-        # Parse and return
-        try:
-            questions_data = json.loads(new_assignment.assignment_data)
-        except (json.JSONDecodeError, TypeError) as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to parse assignment data: {str(e)}"
-            )
+        questions_data = _json_payload(new_assignment.assignment_data)
         return SharedAssignmentResponse(
             id=new_assignment.id,
             training_id=new_assignment.training_id,
@@ -278,17 +229,12 @@ async def share_assignment(
 async def share_feedback(
     feedback_data: SharedFeedbackCreate,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Allows a trainer to share feedback form for a training they have scheduled.
     """
-    trainer_username = current_user.get("username")
-    if not trainer_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    trainer_username = identity.username
 
     # Verify the training exists
     training_stmt = select(models.TrainingDetail).where(
@@ -312,83 +258,18 @@ async def share_feedback(
             detail="Training has no trainer assigned"
         )
     
-    # Get employee/manager name from ManagerEmployee table for additional matching
-    # Check both employee_empid and manager_empid to support both employees and managers
-    employee_result = await db.execute(
-        select(models.ManagerEmployee.employee_name).where(
-            models.ManagerEmployee.employee_empid == trainer_username
-        )
-    )
-    employee_name = employee_result.scalars().first()
-    
-    manager_result = await db.execute(
-        select(models.ManagerEmployee.manager_name).where(
-            models.ManagerEmployee.manager_empid == trainer_username
-        )
-    )
-    manager_name = manager_result.scalars().first()
-    
-    display_name = employee_name or manager_name
-    
-    trainer_username_lower = str(trainer_username).lower().strip()
-    display_name_lower = (display_name or "").lower().strip() if display_name else ""
-    
-    # Split trainer_name by comma (Excel format) or newline, then check each
-    trainer_names = []
-    if ',' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split(',') if t.strip()]
-    elif '\n' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split('\n') if t.strip()]
-    else:
-        trainer_names = [trainer_name.strip()]
-    
-    # Check multiple matching strategies for each trainer name:
-    is_trainer = False
-    for single_trainer_name in trainer_names:
-        trainer_name_lower = single_trainer_name.lower().strip()
-        
-        # 1. Exact match with username
-        if trainer_name_lower == trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 2. Exact match with display name
-        if display_name_lower and trainer_name_lower == display_name_lower:
-            is_trainer = True
-            break
-        
-        # 3. Contains username (for partial matches)
-        if trainer_username_lower in trainer_name_lower or trainer_name_lower in trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 4. Contains display name (for partial matches)
-        if display_name_lower:
-            if display_name_lower in trainer_name_lower or trainer_name_lower in display_name_lower:
-                is_trainer = True
-                break
-        
-        # 5. Check if any part of display name matches (e.g., "Sharib Jawed" matches "Sharib" or "Jawed")
-        if display_name_lower:
-            name_parts = [part.strip() for part in display_name_lower.split() if len(part.strip()) > 2]
-            for part in name_parts:
-                if part in trainer_name_lower or trainer_name_lower in part:
-                    is_trainer = True
-                    break
-            if is_trainer:
-                break
-    
-    if not is_trainer:
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, trainer_username, training.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only share feedback for trainings you have scheduled"
         )
 
-    # Convert feedback data to JSON string
-    feedback_json = json.dumps({
+    # Stored as JSONB; the driver encodes it
+    feedback_payload = {
         "defaultQuestions": feedback_data.defaultQuestions or [],
         "customQuestions": [q.dict() for q in feedback_data.customQuestions]
-    })
+    }
 
     # Check if feedback already exists for this training (update existing)
     existing_stmt = select(models.SharedFeedback).where(
@@ -399,13 +280,13 @@ async def share_feedback(
 
     if existing_feedback:
         # Update existing feedback
-        existing_feedback.feedback_data = feedback_json
+        existing_feedback.feedback_data = feedback_payload
         existing_feedback.updated_at = datetime.utcnow()
         await db.commit()
+        invalidate_shared_content(existing_feedback.training_id)
         await db.refresh(existing_feedback)
         
-        # Parse and return
-        feedback_data_parsed = json.loads(existing_feedback.feedback_data)
+        feedback_data_parsed = _json_payload(existing_feedback.feedback_data)
         return SharedFeedbackResponse(
             id=existing_feedback.id,
             training_id=existing_feedback.training_id,
@@ -420,14 +301,14 @@ async def share_feedback(
         new_feedback = models.SharedFeedback(
             training_id=feedback_data.training_id,
             trainer_username=trainer_username,
-            feedback_data=feedback_json
+            feedback_data=feedback_payload
         )
         db.add(new_feedback)
         await db.commit()
+        invalidate_shared_content(new_feedback.training_id)
         await db.refresh(new_feedback)
 
-        # Parse and return
-        feedback_data_parsed = json.loads(new_feedback.feedback_data)
+        feedback_data_parsed = _json_payload(new_feedback.feedback_data)
         return SharedFeedbackResponse(
             id=new_feedback.id,
             training_id=new_feedback.training_id,
@@ -484,28 +365,30 @@ async def get_shared_assignment(
             detail="You can only access assignments for trainings you attended. Please contact your trainer if you believe this is an error."
         )
 
-    # Get the shared assignment
-    assignment_stmt = select(models.SharedAssignment).where(
-        models.SharedAssignment.training_id == training_id
-    )
-    result = await db.execute(assignment_stmt)
-    shared_assignment = result.scalar_one_or_none()
+    # Every attendee gets the same body: serve it pre-serialized (app/shared_content_cache.py)
+    async def load_shared_assignment() -> Optional[SharedAssignmentResponse]:
+        assignment_stmt = select(models.SharedAssignment).where(
+            models.SharedAssignment.training_id == training_id
+        )
+        result = await db.execute(assignment_stmt)
+        shared_assignment = result.scalar_one_or_none()
 
-    if not shared_assignment:
-        return None
+        if not shared_assignment:
+            return None
 
-    # Parse and return
-    questions_data = json.loads(shared_assignment.assignment_data)
-    return SharedAssignmentResponse(
-        id=shared_assignment.id,
-        training_id=shared_assignment.training_id,
-        trainer_username=shared_assignment.trainer_username,
-        title=shared_assignment.title,
-        description=shared_assignment.description,
-        questions=questions_data,
-        created_at=shared_assignment.created_at,
-        updated_at=shared_assignment.updated_at
-    )
+        questions_data = _json_payload(shared_assignment.assignment_data)
+        return SharedAssignmentResponse(
+            id=shared_assignment.id,
+            training_id=shared_assignment.training_id,
+            trainer_username=shared_assignment.trainer_username,
+            title=shared_assignment.title,
+            description=shared_assignment.description,
+            questions=questions_data,
+            created_at=shared_assignment.created_at,
+            updated_at=shared_assignment.updated_at
+        )
+
+    return await cached_response(ASSIGNMENT, training_id, load_shared_assignment)
 
 @router.get("/feedback/{training_id}", response_model=Optional[SharedFeedbackResponse])
 async def get_shared_feedback(
@@ -553,43 +436,40 @@ async def get_shared_feedback(
             detail="You can only access feedback for trainings you attended. Please contact your trainer if you believe this is an error."
         )
 
-    # Get the shared feedback
-    feedback_stmt = select(models.SharedFeedback).where(
-        models.SharedFeedback.training_id == training_id
-    )
-    result = await db.execute(feedback_stmt)
-    shared_feedback = result.scalar_one_or_none()
+    # Every attendee gets the same body: serve it pre-serialized (app/shared_content_cache.py)
+    async def load_shared_feedback() -> Optional[SharedFeedbackResponse]:
+        feedback_stmt = select(models.SharedFeedback).where(
+            models.SharedFeedback.training_id == training_id
+        )
+        result = await db.execute(feedback_stmt)
+        shared_feedback = result.scalar_one_or_none()
 
-    if not shared_feedback:
-        return None
+        if not shared_feedback:
+            return None
 
-    # Parse and return
-    feedback_data_parsed = json.loads(shared_feedback.feedback_data)
-    return SharedFeedbackResponse(
-        id=shared_feedback.id,
-        training_id=shared_feedback.training_id,
-        trainer_username=shared_feedback.trainer_username,
-        defaultQuestions=feedback_data_parsed.get("defaultQuestions", []),
-        customQuestions=feedback_data_parsed.get("customQuestions", []),
-        created_at=shared_feedback.created_at,
-        updated_at=shared_feedback.updated_at
-    )
+        feedback_data_parsed = _json_payload(shared_feedback.feedback_data)
+        return SharedFeedbackResponse(
+            id=shared_feedback.id,
+            training_id=shared_feedback.training_id,
+            trainer_username=shared_feedback.trainer_username,
+            defaultQuestions=feedback_data_parsed.get("defaultQuestions", []),
+            customQuestions=feedback_data_parsed.get("customQuestions", []),
+            created_at=shared_feedback.created_at,
+            updated_at=shared_feedback.updated_at
+        )
+
+    return await cached_response(FEEDBACK, training_id, load_shared_feedback)
 
 @router.get("/trainer/assignments/{training_id}", response_model=Optional[SharedAssignmentResponse])
 async def get_shared_assignment_for_trainer(
     training_id: int,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Allows trainers to check if assignment is already shared for their training.
     """
-    trainer_username = current_user.get("username")
-    if not trainer_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    trainer_username = identity.username
 
     # Verify the training exists
     training_stmt = select(models.TrainingDetail).where(
@@ -609,73 +489,8 @@ async def get_shared_assignment_for_trainer(
     if not trainer_name:
         return None
     
-    # Get employee/manager name for matching
-    # Check both employee_empid and manager_empid to support both employees and managers
-    employee_result = await db.execute(
-        select(models.ManagerEmployee.employee_name).where(
-            models.ManagerEmployee.employee_empid == trainer_username
-        ).distinct()
-    )
-    employee_name = employee_result.scalar_one_or_none()
-    
-    manager_result = await db.execute(
-        select(models.ManagerEmployee.manager_name).where(
-            models.ManagerEmployee.manager_empid == trainer_username
-        ).distinct()
-    )
-    manager_name = manager_result.scalar_one_or_none()
-    
-    display_name = employee_name or manager_name
-    
-    trainer_username_lower = str(trainer_username).lower().strip()
-    display_name_lower = (display_name or "").lower().strip() if display_name else ""
-    
-    # Split trainer_name by comma (Excel format) or newline, then check each
-    trainer_names = []
-    if ',' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split(',') if t.strip()]
-    elif '\n' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split('\n') if t.strip()]
-    else:
-        trainer_names = [trainer_name.strip()]
-    
-    # Check multiple matching strategies for each trainer name:
-    is_trainer = False
-    for single_trainer_name in trainer_names:
-        trainer_name_lower = single_trainer_name.lower().strip()
-        
-        # 1. Exact match with username
-        if trainer_name_lower == trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 2. Exact match with display name
-        if display_name_lower and trainer_name_lower == display_name_lower:
-            is_trainer = True
-            break
-        
-        # 3. Contains username (for partial matches)
-        if trainer_username_lower in trainer_name_lower or trainer_name_lower in trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 4. Contains display name (for partial matches)
-        if display_name_lower:
-            if display_name_lower in trainer_name_lower or trainer_name_lower in display_name_lower:
-                is_trainer = True
-                break
-        
-        # 5. Check if any part of display name matches (e.g., "Sharib Jawed" matches "Sharib" or "Jawed")
-        if display_name_lower:
-            name_parts = [part.strip() for part in display_name_lower.split() if len(part.strip()) > 2]
-            for part in name_parts:
-                if part in trainer_name_lower or trainer_name_lower in part:
-                    is_trainer = True
-                    break
-            if is_trainer:
-                break
-    
-    if not is_trainer:
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, trainer_username, training.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only check assignments for trainings you have scheduled"
@@ -691,14 +506,7 @@ async def get_shared_assignment_for_trainer(
     if not shared_assignment:
         return None
 
-    # Parse and return
-    try:
-        questions_data = json.loads(shared_assignment.assignment_data)
-    except (json.JSONDecodeError, TypeError) as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to parse assignment data: {str(e)}"
-        )
+    questions_data = _json_payload(shared_assignment.assignment_data)
     return SharedAssignmentResponse(
         id=shared_assignment.id,
         training_id=shared_assignment.training_id,
@@ -714,17 +522,12 @@ async def get_shared_assignment_for_trainer(
 async def get_shared_feedback_for_trainer(
     training_id: int,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Allows trainers to check if feedback is already shared for their training.
     """
-    trainer_username = current_user.get("username")
-    if not trainer_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    trainer_username = identity.username
 
     # Verify the training exists
     training_stmt = select(models.TrainingDetail).where(
@@ -744,73 +547,8 @@ async def get_shared_feedback_for_trainer(
     if not trainer_name:
         return None
     
-    # Get employee/manager name for matching
-    # Check both employee_empid and manager_empid to support both employees and managers
-    employee_result = await db.execute(
-        select(models.ManagerEmployee.employee_name).where(
-            models.ManagerEmployee.employee_empid == trainer_username
-        ).distinct()
-    )
-    employee_name = employee_result.scalar_one_or_none()
-    
-    manager_result = await db.execute(
-        select(models.ManagerEmployee.manager_name).where(
-            models.ManagerEmployee.manager_empid == trainer_username
-        ).distinct()
-    )
-    manager_name = manager_result.scalar_one_or_none()
-    
-    display_name = employee_name or manager_name
-    
-    trainer_username_lower = str(trainer_username).lower().strip()
-    display_name_lower = (display_name or "").lower().strip() if display_name else ""
-    
-    # Split trainer_name by comma (Excel format) or newline, then check each
-    trainer_names = []
-    if ',' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split(',') if t.strip()]
-    elif '\n' in trainer_name:
-        trainer_names = [t.strip() for t in trainer_name.split('\n') if t.strip()]
-    else:
-        trainer_names = [trainer_name.strip()]
-    
-    # Check multiple matching strategies for each trainer name:
-    is_trainer = False
-    for single_trainer_name in trainer_names:
-        trainer_name_lower = single_trainer_name.lower().strip()
-        
-        # 1. Exact match with username
-        if trainer_name_lower == trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 2. Exact match with display name
-        if display_name_lower and trainer_name_lower == display_name_lower:
-            is_trainer = True
-            break
-        
-        # 3. Contains username (for partial matches)
-        if trainer_username_lower in trainer_name_lower or trainer_name_lower in trainer_username_lower:
-            is_trainer = True
-            break
-        
-        # 4. Contains display name (for partial matches)
-        if display_name_lower:
-            if display_name_lower in trainer_name_lower or trainer_name_lower in display_name_lower:
-                is_trainer = True
-                break
-        
-        # 5. Check if any part of display name matches (e.g., "Sharib Jawed" matches "Sharib" or "Jawed")
-        if display_name_lower:
-            name_parts = [part.strip() for part in display_name_lower.split() if len(part.strip()) > 2]
-            for part in name_parts:
-                if part in trainer_name_lower or trainer_name_lower in part:
-                    is_trainer = True
-                    break
-            if is_trainer:
-                break
-    
-    if not is_trainer:
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, trainer_username, training.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only check feedback for trainings you have scheduled"
@@ -826,8 +564,7 @@ async def get_shared_feedback_for_trainer(
     if not shared_feedback:
         return None
 
-    # Parse and return
-    feedback_data_parsed = json.loads(shared_feedback.feedback_data)
+    feedback_data_parsed = _json_payload(shared_feedback.feedback_data)
     return SharedFeedbackResponse(
         id=shared_feedback.id,
         training_id=shared_feedback.training_id,
@@ -838,6 +575,83 @@ async def get_shared_feedback_for_trainer(
         updated_at=shared_feedback.updated_at
     )
 
+# --- Assignment Analytics ---
+
+class OptionAnswerCount(BaseModel):
+    optionIndex: int
+    count: int
+
+class QuestionAnswerStats(BaseModel):
+    questionIndex: int
+    options: List[OptionAnswerCount]
+
+class AssignmentAnswerStatsResponse(BaseModel):
+    training_id: int
+    shared_assignment_id: int
+    submissions: int  # Employees who submitted (latest submission each)
+    questions: List[QuestionAnswerStats]
+
+# Option picks per question, counted inside the JSONB answers in SQL
+ANSWER_STATS_SQL = text("""
+    WITH latest AS (
+        SELECT DISTINCT ON (employee_empid) answers_data
+        FROM assignment_submissions
+        WHERE shared_assignment_id = :assignment_id
+        ORDER BY employee_empid, submitted_at DESC
+    )
+    SELECT (answer->>'questionIndex')::int AS question_index,
+           selected.value::int AS option_index,
+           COUNT(*) AS answers
+    FROM latest
+    CROSS JOIN LATERAL jsonb_array_elements(latest.answers_data) AS answer
+    CROSS JOIN LATERAL jsonb_array_elements_text(answer->'selectedOptions') AS selected(value)
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+""")
+
+@router.get("/trainer/assignments/{training_id}/analytics", response_model=Optional[AssignmentAnswerStatsResponse])
+async def get_assignment_answer_stats(
+    training_id: int,
+    db: AsyncSession = Depends(get_db_async),
+    identity: Identity = Depends(get_current_identity)
+):
+    """
+    Allows trainers to see how often each option was chosen per question
+    (e.g. how many answered option 2 on question 3), from each employee's latest submission.
+    Aggregated in PostgreSQL over the JSONB answers; no submission is loaded into Python.
+    """
+    # Trainer assignments are resolved once at load time (app/trainer_index.py)
+    if not await is_training_trainer(db, identity.username, training_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view analytics for trainings you have scheduled"
+        )
+
+    shared_result = await db.execute(
+        select(models.SharedAssignment.id).where(models.SharedAssignment.training_id == training_id)
+    )
+    shared_assignment_id = shared_result.scalar_one_or_none()
+    if shared_assignment_id is None:
+        return None
+
+    submissions_result = await db.execute(
+        select(func.count(distinct(models.AssignmentSubmission.employee_empid))).where(
+            models.AssignmentSubmission.shared_assignment_id == shared_assignment_id
+        )
+    )
+    stats_result = await db.execute(ANSWER_STATS_SQL, {"assignment_id": shared_assignment_id})
+
+    questions: Dict[int, List[OptionAnswerCount]] = {}
+    for question_index, option_index, answers in stats_result.all():
+        questions.setdefault(question_index, []).append(OptionAnswerCount(optionIndex=option_index, count=answers))
+
+    return AssignmentAnswerStatsResponse(
+        training_id=training_id,
+        shared_assignment_id=shared_assignment_id,
+        submissions=submissions_result.scalar() or 0,
+        questions=[QuestionAnswerStats(questionIndex=index, options=options) for index, options in questions.items()]
+    )
+
 # --- Assignment Submission Schemas ---
 
 class AnswerSubmission(BaseModel):
@@ -912,83 +726,41 @@ async def submit_assignment(
             detail="You can only submit assignments for trainings you attended. Please contact your trainer if you believe this is an error."
         )
 
-    # Get the shared assignment
-    shared_stmt = select(models.SharedAssignment).where(
+    # Get the shared assignment's compiled answer key (the questions are not needed)
+    shared_stmt = select(models.SharedAssignment.id, models.SharedAssignment.answer_key).where(
         models.SharedAssignment.id == submission_data.shared_assignment_id,
         models.SharedAssignment.training_id == submission_data.training_id
     )
     shared_result = await db.execute(shared_stmt)
-    shared_assignment = shared_result.scalar_one_or_none()
+    shared_assignment = shared_result.one_or_none()
 
     if not shared_assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Assignment not found"
         )
-
-    # Parse assignment questions
-    questions_data = json.loads(shared_assignment.assignment_data)
-    total_questions = len(questions_data)
-    correct_count = 0
-    question_results = []
+    answer_key = shared_assignment.answer_key
+    if answer_key is None:
+        answer_key = await _load_answer_key(db, shared_assignment.id)
 
     # Evaluate answers
-    for answer in submission_data.answers:
-        if answer.questionIndex >= len(questions_data):
-            continue
-        
-        question = questions_data[answer.questionIndex]
-        is_correct = False
-        correct_indices = []
-        user_indices = answer.selectedOptions.copy()
-        
-        # Get correct answer indices
-        if question.get("type") in ["single-choice", "multiple-choice"]:
-            options = question.get("options", [])
-            for idx, opt in enumerate(options):
-                if opt.get("isCorrect", False):
-                    correct_indices.append(idx)
-            
-            # Check if answer is correct
-            if question.get("type") == "single-choice":
-                # For single-choice, user should select exactly one option that matches the correct one
-                if len(answer.selectedOptions) == 1 and answer.selectedOptions[0] in correct_indices:
-                    is_correct = True
-            elif question.get("type") == "multiple-choice":
-                # For multiple-choice, user's selections must exactly match correct answers
-                if set(answer.selectedOptions) == set(correct_indices):
-                    is_correct = True
-        
-        elif question.get("type") == "text-input":
-            # For text-input, we'll mark as correct if answer is provided (manual evaluation needed)
-            # For now, we'll mark it as needs review
-            is_correct = False  # Text answers need manual evaluation
-            user_text = answer.textAnswer or ""
-        
-        if is_correct:
-            correct_count += 1
-        
-        question_results.append({
-            "questionIndex": answer.questionIndex,
-            "isCorrect": is_correct,
-            "correctAnswers": correct_indices,
-            "userAnswers": user_indices,
-            "userTextAnswer": answer.textAnswer if question.get("type") == "text-input" else None
-        })
+    answers_payload = [a.dict() for a in submission_data.answers]
+    question_results, correct_count = grade_submission(answer_key, answers_payload)
+    total_questions = len(answer_key)
 
     # Calculate score (percentage)
-    score = int((correct_count / total_questions * 100)) if total_questions > 0 else 0
+    score = score_percent(correct_count, total_questions)
 
-    # Store submission
-    answers_json = json.dumps([a.dict() for a in submission_data.answers])
+    # Store submission together with its per-question results
     submission = models.AssignmentSubmission(
         training_id=submission_data.training_id,
         shared_assignment_id=submission_data.shared_assignment_id,
         employee_empid=employee_username,
-        answers_data=answers_json,
+        answers_data=answers_payload,
         score=score,
         total_questions=total_questions,
-        correct_answers=correct_count
+        correct_answers=correct_count,
+        question_results=question_results
     )
     db.add(submission)
     await db.commit()
@@ -1051,20 +823,20 @@ async def get_assignment_result(
         )
 
     # Get the shared assignment
-    shared_stmt = select(models.SharedAssignment).where(
+    shared_stmt = select(models.SharedAssignment.id).where(
         models.SharedAssignment.training_id == training_id
     )
     shared_result = await db.execute(shared_stmt)
-    shared_assignment = shared_result.scalar_one_or_none()
+    shared_assignment_id = shared_result.scalar_one_or_none()
 
-    if not shared_assignment:
+    if shared_assignment_id is None:
         return None
 
     # Get the submission
     submission_stmt = select(models.AssignmentSubmission).where(
         models.AssignmentSubmission.training_id == training_id,
         models.AssignmentSubmission.employee_empid == employee_username,
-        models.AssignmentSubmission.shared_assignment_id == shared_assignment.id
+        models.AssignmentSubmission.shared_assignment_id == shared_assignment_id
     ).order_by(models.AssignmentSubmission.submitted_at.desc())
     submission_result = await db.execute(submission_stmt)
     # Use first() instead of scalar_one_or_none() to handle cases where multiple submissions exist
@@ -1073,45 +845,16 @@ async def get_assignment_result(
     if not submission:
         return None
 
-    # Parse answers and reconstruct question results
-    answers_data = json.loads(submission.answers_data)
-    questions_data = json.loads(shared_assignment.assignment_data)
-    question_results = []
-
-    for answer in answers_data:
-        question_idx = answer.get("questionIndex", 0)
-        if question_idx >= len(questions_data):
-            continue
-        
-        question = questions_data[question_idx]
-        correct_indices = []
-        user_indices = answer.get("selectedOptions", [])
-        
-        # Get correct answer indices
-        if question.get("type") in ["single-choice", "multiple-choice"]:
-            options = question.get("options", [])
-            for idx, opt in enumerate(options):
-                if opt.get("isCorrect", False):
-                    correct_indices.append(idx)
-        
-        # Check if answer is correct
-        is_correct = False
-        if question.get("type") == "single-choice":
-            if len(user_indices) == 1 and user_indices[0] in correct_indices:
-                is_correct = True
-        elif question.get("type") == "multiple-choice":
-            if set(user_indices) == set(correct_indices):
-                is_correct = True
-        
-        question_results.append({
-            "questionIndex": question_idx,
-            "isCorrect": is_correct,
-            "correctAnswers": correct_indices,
-            "userAnswers": user_indices,
-            "userTextAnswer": answer.get("textAnswer") if question.get("type") == "text-input" else None
-        })
+    # Results are graded and stored at submit time; a submission made before that
+    # is graded once here and its results saved
+    question_results = submission.question_results
+    backfilled = question_results is None
+    if backfilled:
+        answer_key = await _load_answer_key(db, shared_assignment_id)
+        question_results, _ = grade_submission(answer_key, _json_payload(submission.answers_data))
+        submission.question_results = question_results
 
-    return AssignmentResultResponse(
+    response = AssignmentResultResponse(
         id=submission.id,
         training_id=submission.training_id,
         score=submission.score,
@@ -1120,6 +863,9 @@ async def get_assignment_result(
         question_results=[QuestionResult(**qr) for qr in question_results],
         submitted_at=submission.submitted_at
     )
+    if backfilled:
+        await db.commit()
+    return response
 
 # --- Feedback Submission Schemas ---
 
@@ -1213,12 +959,12 @@ async def submit_feedback(
 
     if existing_submission:
         # Update existing submission
-        responses_json = json.dumps([r.dict() for r in submission_data.responses])
-        existing_submission.responses_data = responses_json
+        responses_payload = [r.dict() for r in submission_data.responses]
+        existing_submission.responses_data = responses_payload
         await db.commit()
         await db.refresh(existing_submission)
         
-        responses_data = json.loads(existing_submission.responses_data)
+        responses_data = _json_payload(existing_submission.responses_data)
         return FeedbackSubmissionResponse(
             id=existing_submission.id,
             training_id=existing_submission.training_id,
@@ -1228,18 +974,18 @@ async def submit_feedback(
         )
 
     # Store submission
-    responses_json = json.dumps([r.dict() for r in submission_data.responses])
+    responses_payload = [r.dict() for r in submission_data.responses]
     submission = models.FeedbackSubmission(
         training_id=submission_data.training_id,
         shared_feedback_id=submission_data.shared_feedback_id,
         employee_empid=employee_username,
-        responses_data=responses_json
+        responses_data=responses_payload
     )
     db.add(submission)
     await db.commit()
     await db.refresh(submission)
 
-    responses_data = json.loads(submission.responses_data)
+    responses_data = _json_payload(submission.responses_data)
     return FeedbackSubmissionResponse(
         id=submission.id,
         training_id=submission.training_id,
@@ -1316,7 +1062,7 @@ async def get_feedback_submission_result(
     if not submission:
         return None
 
-    responses_data = json.loads(submission.responses_data)
+    responses_data = _json_payload(submission.responses_data)
     return FeedbackSubmissionResponse(
         id=submission.id,
         training_id=submission.training_id,
@@ -1478,7 +1224,7 @@ async def get_team_feedback_submissions(
     result = []
     for submission, training in submissions:
         employee_name = team_members.get(submission.employee_empid, submission.employee_empid)
-        responses_data = json.loads(submission.responses_data)
+        responses_data = _json_payload(submission.responses_data)
         result.append(TeamFeedbackSubmissionResponse(
             id=submission.id,
             training_id=submission.training_id,
@@ -1533,19 +1279,14 @@ class ManagerPerformanceFeedbackResponse(BaseModel):
 async def create_or_update_performance_feedback(
     feedback_data: ManagerPerformanceFeedbackCreate,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_manager)
+    identity: Identity = Depends(get_current_manager_identity)
 ):
     """
     Create manager performance feedback for an employee's training.
     Each submission creates a new feedback entry to maintain complete history.
     All previous feedback entries are preserved and visible to the employee.
     """
-    manager_username = current_user.get("username")
-    if not manager_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    manager_username = identity.username
 
     # Validate ratings are between 1-5
     if feedback_data.overall_performance < 1 or feedback_data.overall_performance > 5:
@@ -1609,13 +1350,8 @@ async def create_or_update_performance_feedback(
             detail="Training not found"
         )
 
-    # Get manager name
-    manager_name_stmt = select(models.ManagerEmployee.manager_name).where(
-        models.ManagerEmployee.manager_empid == manager_username
-    ).limit(1)
-    manager_name_result = await db.execute(manager_name_stmt)
-    manager_name_row = manager_name_result.first()
-    manager_name = manager_name_row[0] if manager_name_row and manager_name_row[0] else manager_username
+    # Manager name comes from the identity cache
+    manager_name = identity.manager_name or manager_username
 
     employee_name = manager_relation.employee_name
     
@@ -1668,17 +1404,12 @@ async def get_performance_feedback(
     training_id: int,
     employee_empid: str,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_manager)
+    identity: Identity = Depends(get_current_manager_identity)
 ):
     """
     Get the latest performance feedback for a specific employee's training.
     """
-    manager_username = current_user.get("username")
-    if not manager_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    manager_username = identity.username
 
     # Verify the employee is managed by this manager
     manager_relation_stmt = select(models.ManagerEmployee).where(
@@ -1711,13 +1442,8 @@ async def get_performance_feedback(
     
     feedback, training = feedback_row
     
-    # Get manager name
-    manager_name_stmt = select(models.ManagerEmployee.manager_name).where(
-        models.ManagerEmployee.manager_empid == manager_username
-    ).limit(1)
-    manager_name_result = await db.execute(manager_name_stmt)
-    manager_name_row = manager_name_result.first()
-    manager_name = manager_name_row[0] if manager_name_row and manager_name_row[0] else manager_username
+    # Manager name comes from the identity cache
+    manager_name = identity.manager_name or manager_username
 
     return ManagerPerformanceFeedbackResponse(
         id=feedback.id,
@@ -1745,17 +1471,12 @@ async def get_performance_feedback_history(
     training_id: int,
     employee_empid: str,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_manager)
+    identity: Identity = Depends(get_current_manager_identity)
 ):
     """
     Get all performance feedback history for a specific employee's training (all entries, not just latest).
     """
-    manager_username = current_user.get("username")
-    if not manager_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+    manager_username = identity.username
 
     # Verify the employee is managed by this manager
     manager_relation_stmt = select(models.ManagerEmployee).where(
@@ -1789,13 +1510,8 @@ async def get_performance_feedback_history(
     if not all_feedback:
         return []
     
-    # Get manager name
-    manager_name_stmt = select(models.ManagerEmployee.manager_name).where(
-        models.ManagerEmployee.manager_empid == manager_username
-    ).limit(1)
-    manager_name_result = await db.execute(manager_name_stmt)
-    manager_name_row = manager_name_result.first()
-    manager_name = manager_name_row[0] if manager_name_row and manager_name_row[0] else manager_username
+    # Manager name comes from the identity cache
+    manager_name = identity.manager_name or manager_username
 
     result = []
     for feedback, training in all_feedback:
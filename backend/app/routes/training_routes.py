@@ -26,9 +26,11 @@ from sqlalchemy.future import select
 from typing import List
 
 from app.database import get_db_async
-from app.models import TrainingDetail, User, ManagerEmployee
+from app.models import TrainingDetail
 from app.schemas import TrainingCreate, TrainingResponse
-from app.auth_utils import get_current_active_user
+from app.auth_utils import get_current_active_user, get_current_identity
+from app.identity import Identity
+from app.trainer_index import add_training_trainers, get_taught_training_ids, invalidate_trainer_index
 
 router = APIRouter(prefix="/trainings", tags=["Trainings"])
 
@@ -36,37 +38,16 @@ router = APIRouter(prefix="/trainings", tags=["Trainings"])
 async def create_new_training(
     training_data: TrainingCreate,
     db: AsyncSession = Depends(get_db_async),
-    current_user: dict = Depends(get_current_active_user)
+    identity: Identity = Depends(get_current_identity)
 ):
     """
     Endpoint for a designated trainer to create a new training module.
     It verifies the user's trainer status before proceeding.
     """
-    current_username = current_user.get("username")
-    if not current_username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-        )
+    current_username = identity.username
 
-    stmt = select(ManagerEmployee).where(
-        (ManagerEmployee.manager_empid == current_username) | 
-        (ManagerEmployee.employee_empid == current_username)
-    )
-    result = await db.execute(stmt)
-    
-    # CORRECTED: .scalars().first() correctly handles cases where a user (manager)
-    # might appear in multiple rows. It safely gets the first match or None.
-    relation = result.scalars().first()
-
-    is_trainer = False
-    if relation:
-        if relation.manager_empid == current_username and relation.manager_is_trainer:
-            is_trainer = True
-        elif relation.employee_empid == current_username and relation.employee_is_trainer:
-            is_trainer = True
-
-    if not is_trainer:
+    # Trainer flags (manager or employee side) come from the identity cache
+    if not identity.is_trainer:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only designated trainers can create new training modules."
@@ -79,8 +60,12 @@ async def create_new_training(
     )
 
     db.add(new_training)
+    await db.flush()
+    # The creator is the trainer; record it so trainer checks need no name matching
+    await add_training_trainers(db, new_training.id, [current_username])
     await db.commit()
     await db.refresh(new_training)
+    invalidate_trainer_index(current_username)
 
     return new_training
 
@@ -102,3 +87,22 @@ async def get_all_trainings(
     trainings = result.scalars().all()
     return trainings
 
+
+@router.get("/teaching", response_model=List[TrainingResponse])
+async def get_trainings_i_teach(
+    db: AsyncSession = Depends(get_db_async),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Fetches the trainings the current user is a trainer of.
+    """
+    training_ids = await get_taught_training_ids(db, current_user.get("username"))
+    if not training_ids:
+        return []
+
+    result = await db.execute(
+        select(TrainingDetail)
+        .where(TrainingDetail.id.in_(training_ids))
+        .order_by(TrainingDetail.training_date.desc())
+    )
+    return result.scalars().all()
@@ -0,0 +1,106 @@
+"""
+Shared Content Response Cache Module
+
+Purpose: Serve the shared assignment / feedback form of a training from memory
+Features:
+- Every attendee of a training gets the same response, so the fully serialized
+  JSON body is cached per training (no query, JSON decode or Pydantic validation
+  on a hit)
+- "Nothing shared yet" is cached too (as null)
+- Concurrent misses for the same training are coalesced: one request loads the
+  body while the others wait for it (no stampede after an invalidation)
+- TTL + LRU cache with a size cap (see app/cache.py)
+- Invalidated when a trainer shares or edits the content and when trainings are
+  reloaded from Excel
+
+Authorization is not cached: routes run their per-user checks first and only
+then look up the body.
+
+Configuration (environment variables):
+- SHARED_CONTENT_CACHE_TTL_SECONDS: entry lifetime (default 300, 0 disables the cache)
+- SHARED_CONTENT_CACHE_MAX_ENTRIES: size cap (default 2000)
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.cache import TTLCache
+
+SHARED_CONTENT_CACHE_TTL_SECONDS = float(os.getenv("SHARED_CONTENT_CACHE_TTL_SECONDS", "300"))
+SHARED_CONTENT_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CONTENT_CACHE_MAX_ENTRIES", "2000"))
+
+ASSIGNMENT = "assignment"
+FEEDBACK = "feedback"
+
+# (ASSIGNMENT | FEEDBACK, training_id) -> serialized JSON response body
+shared_content_cache = TTLCache(SHARED_CONTENT_CACHE_MAX_ENTRIES, SHARED_CONTENT_CACHE_TTL_SECONDS)
+
+# Keys being loaded: (lock held by the loading request, number of requests using it)
+_loads: Dict[Tuple[str, int], Tuple[asyncio.Lock, int]] = {}
+
+
+async def _serialize(load: Callable[[], Awaitable[Optional[BaseModel]]]) -> bytes:
+    model = await load()
+    return model.model_dump_json().encode("utf-8") if model is not None else b"null"
+
+
+async def _load_coalesced(key: Tuple[str, int], load: Callable[[], Awaitable[Optional[BaseModel]]]) -> bytes:
+    """
+    Loads and caches the body for key, one request at a time. Requests that queue
+    behind the loader re-check the cache and only load themselves if the result
+    was not stored (load failed, or an invalidation during it made it stale).
+    """
+    lock, users = _loads.get(key, (None, 0))
+    if lock is None:
+        lock = asyncio.Lock()
+    _loads[key] = (lock, users + 1)
+    try:
+        async with lock:
+            body = shared_content_cache.get(key)
+            if body is None:
+                generation = shared_content_cache.generation
+                body = await _serialize(load)
+                shared_content_cache.set(key, body, generation=generation)
+            return body
+    finally:
+        lock, users = _loads[key]
+        if users > 1:
+            _loads[key] = (lock, users - 1)
+        else:
+            del _loads[key]
+
+
+async def cached_response(kind: str, training_id: int,
+                          load: Callable[[], Awaitable[Optional[BaseModel]]]) -> Response:
+    """
+    JSON response for a training's shared content, from the cache or built with load().
+
+    Args:
+        kind: ASSIGNMENT or FEEDBACK
+        training_id: Training the content belongs to
+        load: Coroutine function returning the response model, or None if nothing is shared
+    """
+    key = (kind, training_id)
+    body = shared_content_cache.get(key)
+    if body is None:
+        if shared_content_cache.enabled:
+            body = await _load_coalesced(key, load)
+        else:
+            body = await _serialize(load)
+    return Response(content=body, media_type="application/json")
+
+
+def invalidate_shared_content(training_id: Optional[int] = None) -> None:
+    """Drop the cached assignment and feedback of one training, or of all (after a trainings reload)."""
+    if training_id is None:
+        shared_content_cache.invalidate()
+    else:
+        shared_content_cache.invalidate((ASSIGNMENT, training_id))
+        shared_content_cache.invalidate((FEEDBACK, training_id))
@@ -0,0 +1,227 @@
+"""
+Trainer Authorization Index Module
+
+Purpose: Answer "is this user a trainer of this training" with an indexed lookup
+Features:
+- Normalized training_trainers table (training_id -> trainer username)
+- Built once when trainings are loaded from Excel, created via the API, or when
+  the manager-employee hierarchy (and therefore display names) changes
+- Cached per-user set of taught training IDs (TTL + LRU, see app/cache.py)
+
+Matching rules (applied once at build time, not per request):
+- The trainer entry equals the username, or contains it as a word
+- The trainer entry equals the user's display name
+- All words of the trainer entry appear in the display name, or vice versa,
+  when at least MIN_NAME_WORDS words match (e.g. "Jawed Sharib" matches display
+  name "Sharib Jawed", but a bare "Sharib" does not: a single word would make
+  everyone sharing it a trainer)
+Words of 2 characters or fewer are ignored. A training_details.trainer_name may list
+several trainers separated by commas or newlines; each is matched separately.
+
+Configuration (environment variables):
+- TRAINER_INDEX_CACHE_TTL_SECONDS: entry lifetime (default 300, 0 disables the cache)
+- TRAINER_INDEX_CACHE_MAX_ENTRIES: size cap (default 10000)
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.cache import TTLCache
+from app.models import ManagerEmployee, TrainingDetail, TrainingTrainer, User
+
+logger = logging.getLogger(__name__)
+
+TRAINER_INDEX_CACHE_TTL_SECONDS = float(os.getenv("TRAINER_INDEX_CACHE_TTL_SECONDS", "300"))
+TRAINER_INDEX_CACHE_MAX_ENTRIES = int(os.getenv("TRAINER_INDEX_CACHE_MAX_ENTRIES", "10000"))
+
+# username -> frozenset of training IDs the user teaches
+trainer_index_cache = TTLCache(TRAINER_INDEX_CACHE_MAX_ENTRIES, TRAINER_INDEX_CACHE_TTL_SECONDS)
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+# Words a partial (word-based) name match must share; exact matches need none
+MIN_NAME_WORDS = 2
+
+
+def split_trainer_names(trainer_name: Optional[str]) -> List[str]:
+    """Split a trainer_name cell into individual trainer entries (comma or newline separated)."""
+    trainer_name = str(trainer_name or "").strip()
+    if not trainer_name:
+        return []
+    return [t.strip() for t in re.split(r"[,\n]", trainer_name) if t.strip()]
+
+
+def _name_words(name: Optional[str]) -> FrozenSet[str]:
+    """Lowercase words of a name, ignoring words of 2 characters or fewer."""
+    return frozenset(w for w in _WORD_SPLIT.split(str(name or "").lower()) if len(w) > 2)
+
+
+class _PeopleIndex:
+    """Lookup structures over (username, display name) used to resolve trainer entries."""
+
+    def __init__(self, people: Dict[str, Optional[str]], usernames: Iterable[str]):
+        self.usernames_lower: Dict[str, Set[str]] = defaultdict(set)
+        self.display_lower: Dict[str, Set[str]] = defaultdict(set)
+        self.words: Dict[str, FrozenSet[str]] = {}
+        self.word_postings: Dict[str, Set[str]] = defaultdict(set)
+
+        for username in usernames:
+            self.usernames_lower[username.lower().strip()].add(username)
+
+        for username, display_name in people.items():
+            self.usernames_lower[username.lower().strip()].add(username)
+            if not display_name:
+                continue
+            self.display_lower[display_name.lower().strip()].add(username)
+            words = _name_words(display_name)
+            if words:
+                self.words[username] = words
+                for word in words:
+                    self.word_postings[word].add(username)
+
+    def resolve(self, trainer_entry: str) -> Set[str]:
+        """Return every username the trainer entry refers to."""
+        entry_lower = trainer_entry.lower().strip()
+        entry_words = _name_words(entry_lower)
+        matches = set(self.usernames_lower.get(entry_lower, ()))
+        matches |= self.display_lower.get(entry_lower, set())
+
+        # Username mentioned as a word, e.g. "Sharib Jawed (5504763)"
+        for word in entry_words:
+            matches |= self.usernames_lower.get(word, set())
+
+        if len(entry_words) >= MIN_NAME_WORDS:
+            # People whose display name contains every word of the entry
+            candidates = None
+            for word in entry_words:
+                posting = self.word_postings.get(word, set())
+                candidates = set(posting) if candidates is None else candidates & posting
+                if not candidates:
+                    break
+            matches |= candidates or set()
+
+            # People whose display-name words are all contained in the entry
+            for word in entry_words:
+                for username in self.word_postings.get(word, ()):
+                    if len(self.words[username]) >= MIN_NAME_WORDS and self.words[username] <= entry_words:
+                        matches.add(username)
+        return matches
+
+
+async def _load_people_index(db: AsyncSession, trainer_entries: Iterable[str]) -> _PeopleIndex:
+    """Load display names from manager_employee and the users that exactly match an entry."""
+    result = await db.execute(
+        select(
+            ManagerEmployee.manager_empid, ManagerEmployee.manager_name,
+            ManagerEmployee.employee_empid, ManagerEmployee.employee_name
+        )
+    )
+    people: Dict[str, Optional[str]] = {}
+    # Employee name takes precedence over manager name (same rule as Identity.display_name)
+    employee_names: Dict[str, Optional[str]] = {}
+    for manager_empid, manager_name, employee_empid, employee_name in result.all():
+        if manager_empid and not people.get(manager_empid):
+            people[manager_empid] = manager_name
+        if employee_empid and not employee_names.get(employee_empid):
+            employee_names[employee_empid] = employee_name
+    for username, name in employee_names.items():
+        people[username] = name or people.get(username)
+
+    # Trainings created through the API store the trainer's username directly
+    entries = {e.strip() for e in trainer_entries if e.strip()}
+    entries |= {w for e in entries for w in _name_words(e)}
+    usernames: List[str] = []
+    if entries:
+        users_result = await db.execute(select(User.username).where(User.username.in_(entries)))
+        usernames = list(users_result.scalars().all())
+    return _PeopleIndex(people, usernames)
+
+
+async def rebuild_training_trainers(db: AsyncSession, training_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute training_trainers for the given trainings (or all trainings).
+
+    Does not commit; call invalidate_trainer_index() after the caller commits.
+
+    Returns:
+        int: Number of (training, trainer) pairs written
+    """
+    stmt = select(TrainingDetail.id, TrainingDetail.trainer_name)
+    delete_stmt = delete(TrainingTrainer)
+    if training_ids is not None:
+        training_ids = list(training_ids)
+        if not training_ids:
+            return 0
+        stmt = stmt.where(TrainingDetail.id.in_(training_ids))
+        delete_stmt = delete_stmt.where(TrainingTrainer.training_id.in_(training_ids))
+
+    trainings: List[Tuple[int, str]] = (await db.execute(stmt)).all()
+    entries_by_training = {tid: split_trainer_names(name) for tid, name in trainings}
+    people = await _load_people_index(db, (e for entries in entries_by_training.values() for e in entries))
+
+    pairs = []
+    resolved: Dict[str, Set[str]] = {}
+    for training_id, entries in entries_by_training.items():
+        usernames: Set[str] = set()
+        for entry in entries:
+            if entry not in resolved:
+                resolved[entry] = people.resolve(entry)
+            usernames |= resolved[entry]
+        pairs.extend({"training_id": training_id, "trainer_username": u} for u in usernames)
+
+    await db.execute(delete_stmt)
+    if pairs:
+        await db.execute(insert(TrainingTrainer), pairs)
+    logger.info(f"Trainer index rebuilt: {len(pairs)} trainer assignments for {len(trainings)} trainings.")
+    return len(pairs)
+
+
+async def add_training_trainers(db: AsyncSession, training_id: int, usernames: Iterable[str]) -> None:
+    """Record trainers of a newly created training. Does not commit."""
+    rows = [{"training_id": training_id, "trainer_username": u} for u in set(usernames) if u]
+    if rows:
+        await db.execute(insert(TrainingTrainer), rows)
+
+
+async def ensure_training_trainers(db: AsyncSession) -> None:
+    """Build the index on startup for databases that predate the training_trainers table."""
+    has_index = (await db.execute(select(func.count()).select_from(TrainingTrainer))).scalar()
+    if has_index:
+        return
+    has_trainings = (await db.execute(select(func.count(TrainingDetail.id)))).scalar()
+    if has_trainings:
+        await rebuild_training_trainers(db)
+        await db.commit()
+        invalidate_trainer_index()
+
+
+async def get_taught_training_ids(db: AsyncSession, username: str) -> FrozenSet[int]:
+    """Return the IDs of all trainings the user teaches (cached)."""
+    training_ids = trainer_index_cache.get(username)
+    if training_ids is None:
+        generation = trainer_index_cache.generation
+        result = await db.execute(
+            select(TrainingTrainer.training_id).where(TrainingTrainer.trainer_username == username)
+        )
+        training_ids = frozenset(result.scalars().all())
+        trainer_index_cache.set(username, training_ids, generation=generation)
+    return training_ids
+
+
+async def is_training_trainer(db: AsyncSession, username: str, training_id: int) -> bool:
+    """Authorization helper: True if the user is a trainer of the training."""
+    return training_id in await get_taught_training_ids(db, username)
+
+
+def invalidate_trainer_index(username: Optional[str] = None) -> None:
+    """Drop cached taught-training sets for one user, or for everyone."""
+    trainer_index_cache.invalidate(username)
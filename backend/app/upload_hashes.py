@@ -0,0 +1,104 @@
+"""
+Upload Content Hash Module
+
+Purpose: Skip re-importing spreadsheet content that is already in the database
+Features:
+- SHA-256 of a whole upload and of each workbook sheet's cell values
+- Last applied hash per sheet / file kept in the upload_hashes table, written in
+  the same transaction as the import so it only counts once committed
+- Unchanged sheets are skipped by the loaders (no deletes, inserts or cache
+  invalidation); a byte-identical workbook is skipped without reading its sheets
+
+Sheet hashes cover cell values only, so re-saving a workbook (new file bytes,
+same data) still skips every sheet. Changes made through the API are not
+tracked here: pass force=True to re-apply an upload regardless of its hash.
+
+Configuration (environment variables):
+- UPLOAD_HASH_SKIP: "true" (default) to skip unchanged content, "false" to
+  always re-import (hashes are still recorded)
+
+@author Orbit Skill Development Team
+@date 2025
+"""
+
+import hashlib
+import io
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from openpyxl import load_workbook
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import UploadHash
+
+UPLOAD_HASH_SKIP = os.getenv("UPLOAD_HASH_SKIP", "true").strip().lower() not in ("0", "false", "no")
+
+# Recorded for a sheet the upload did not contain, after its table was cleared
+MISSING_SHEET_HASH = "missing"
+
+_READ_BYTES = 1024 * 1024
+
+
+def sheet_key(sheet_name: str) -> str:
+    return f"sheet:{sheet_name}"
+
+
+def file_key(kind: str) -> str:
+    return f"file:{kind}"
+
+
+def file_content_hash(source: Any) -> str:
+    """SHA-256 of an upload given as a path or bytes."""
+    digest = hashlib.sha256()
+    if isinstance(source, bytes):
+        digest.update(source)
+    else:
+        with open(source, "rb") as handle:
+            for block in iter(lambda: handle.read(_READ_BYTES), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def sheet_content_hash(source: Any, sheet_name: str) -> str:
+    """
+    SHA-256 of a sheet's cell values, read row by row in read-only mode.
+    Formatting, other sheets and workbook metadata do not affect it.
+
+    Args:
+        source: Path or bytes of the .xlsx upload
+    """
+    workbook = load_workbook(io.BytesIO(source) if isinstance(source, bytes) else source,
+                             read_only=True, data_only=True)
+    try:
+        digest = hashlib.sha256()
+        for row in workbook[sheet_name].iter_rows(values_only=True):
+            digest.update(repr(row).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+    finally:
+        workbook.close()
+
+
+async def get_applied_hashes(db: AsyncSession, keys: Iterable[str]) -> Dict[str, str]:
+    """Last applied hash per key; keys never applied are absent."""
+    result = await db.execute(
+        select(UploadHash.source, UploadHash.content_hash).where(UploadHash.source.in_(list(keys))))
+    return dict(result.all())
+
+
+def is_unchanged(applied: Dict[str, str], key: str, content_hash: Optional[str], force: bool = False) -> bool:
+    """True when content_hash is what was last applied for key and skipping is enabled."""
+    return UPLOAD_HASH_SKIP and not force and content_hash is not None and applied.get(key) == content_hash
+
+
+async def record_hashes(db: AsyncSession, hashes: Dict[str, Optional[str]]) -> None:
+    """
+    Stores applied hashes in the caller's transaction. A value of None forgets
+    the key (its table no longer matches any recorded upload).
+    """
+    if not hashes:
+        return
+    await db.execute(delete(UploadHash).where(UploadHash.source.in_(list(hashes))))
+    db.add_all([UploadHash(source=key, content_hash=value) for key, value in hashes.items() if value is not None])
+    await db.flush()
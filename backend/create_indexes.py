@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Database migration script to create secondary indexes on existing tables.
+Base.metadata.create_all() only creates indexes together with new tables, so run
+this script once against an existing database after pulling new index definitions.
+All statements are idempotent (IF NOT EXISTS) and safe to re-run.
+
+Note: CREATE INDEX blocks writes to the table while it builds; run it in a quiet
+period on large databases.
+
+Usage:
+    python create_indexes.py            # clean up duplicates and create the indexes
+    python create_indexes.py --check    # EXPLAIN the hot queries and report the index each uses
+
+--check exits non-zero if a query does not use its index. On small databases the
+planner may prefer a sequential scan regardless; add --no-seqscan to check that
+the index is usable at all.
+"""
+
+import asyncio
+import json
+import sys
+import os
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_URL
+
+# (description, SQL) - run before INDEXES so unique indexes can be built
+CLEANUP = [
+    # Keep the oldest assignment when the same training was assigned to an employee twice
+    ("duplicate training_assignments", """
+        DELETE FROM training_assignments a
+        USING training_assignments b
+        WHERE a.training_id = b.training_id
+          AND a.employee_empid = b.employee_empid
+          AND a.id > b.id
+    """),
+    # Keep the latest marking
+    ("duplicate training_attendance", """
+        DELETE FROM training_attendance a
+        USING training_attendance b
+        WHERE a.training_id = b.training_id
+          AND a.employee_empid = b.employee_empid
+          AND a.id < b.id
+    """),
+    # Keep a decided request over a pending one, otherwise the oldest
+    ("duplicate training_requests", """
+        DELETE FROM training_requests a
+        USING training_requests b
+        WHERE a.training_id = b.training_id
+          AND a.employee_empid = b.employee_empid
+          AND a.id <> b.id
+          AND ((COALESCE(a.status, 'pending') = 'pending') > (COALESCE(b.status, 'pending') = 'pending')
+               OR ((COALESCE(a.status, 'pending') = 'pending') = (COALESCE(b.status, 'pending') = 'pending')
+                   AND a.id > b.id))
+    """),
+]
+
+# (index name, DDL) - keep in sync with __table_args__ in app/models.py
+INDEXES = [
+    # /login and identity lookups: role + display name resolved from manager_employee
+    ("ix_manager_employee_manager_cover", """
+        CREATE INDEX IF NOT EXISTS ix_manager_employee_manager_cover
+        ON manager_employee (manager_empid) INCLUDE (manager_name, manager_is_trainer)
+    """),
+    ("ix_manager_employee_employee_cover", """
+        CREATE INDEX IF NOT EXISTS ix_manager_employee_employee_cover
+        ON manager_employee (employee_empid) INCLUDE (employee_name, employee_is_trainer)
+    """),
+    # POST /assignments/bulk: INSERT ... ON CONFLICT DO NOTHING
+    ("uq_training_assignments_training_employee", """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_training_assignments_training_employee
+        ON training_assignments (training_id, employee_empid)
+    """),
+    # Attendance check on every assignment / feedback access
+    ("uq_training_attendance_training_employee", """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_training_attendance_training_employee
+        ON training_attendance (training_id, employee_empid)
+    """),
+    # Duplicate request check and GET /training-requests/my
+    ("uq_training_requests_employee_training", """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_training_requests_employee_training
+        ON training_requests (employee_empid, training_id)
+    """),
+    ("ix_training_requests_manager_status", """
+        CREATE INDEX IF NOT EXISTS ix_training_requests_manager_status
+        ON training_requests (manager_empid, status)
+    """),
+    # GET /training-requests/pending
+    ("ix_training_requests_pending", """
+        CREATE INDEX IF NOT EXISTS ix_training_requests_pending
+        ON training_requests (manager_empid, request_date)
+        WHERE status = 'pending'
+    """),
+    ("ix_assignment_submissions_training_employee", """
+        CREATE INDEX IF NOT EXISTS ix_assignment_submissions_training_employee
+        ON assignment_submissions (training_id, employee_empid)
+    """),
+    ("ix_feedback_submissions_training_employee", """
+        CREATE INDEX IF NOT EXISTS ix_feedback_submissions_training_employee
+        ON feedback_submissions (training_id, employee_empid)
+    """),
+    # Engineer / manager dashboards and skill updates
+    ("ix_employee_competency_employee_skill", """
+        CREATE INDEX IF NOT EXISTS ix_employee_competency_employee_skill
+        ON employee_competency (employee_empid, skill)
+    """),
+    # Latest manager feedback and its history
+    ("ix_manager_performance_feedback_training_employee", """
+        CREATE INDEX IF NOT EXISTS ix_manager_performance_feedback_training_employee
+        ON manager_performance_feedback (training_id, employee_empid, updated_at)
+    """),
+]
+
+# (description, index expected in the plan, SQL) - the routes' hot lookups, with sample values
+HOT_QUERIES = [
+    ("training assignment check", "uq_training_assignments_training_employee", """
+        SELECT id FROM training_assignments
+        WHERE training_id = 1 AND employee_empid = 'check'
+    """),
+    ("attendance check", "uq_training_attendance_training_employee", """
+        SELECT id FROM training_attendance
+        WHERE training_id = 1 AND employee_empid = 'check' AND attended = true
+    """),
+    ("duplicate training request check", "uq_training_requests_employee_training", """
+        SELECT id FROM training_requests
+        WHERE training_id = 1 AND employee_empid = 'check'
+    """),
+    ("manager's requests by status", "ix_training_requests_manager_status", """
+        SELECT id FROM training_requests
+        WHERE manager_empid = 'check' AND status = 'approved'
+    """),
+    ("manager's pending requests", "ix_training_requests_pending", """
+        SELECT id FROM training_requests
+        WHERE manager_empid = 'check' AND status = 'pending'
+        ORDER BY request_date DESC
+    """),
+    ("employee's assignment submission", "ix_assignment_submissions_training_employee", """
+        SELECT id FROM assignment_submissions
+        WHERE training_id = 1 AND employee_empid = 'check'
+        ORDER BY submitted_at DESC
+    """),
+    ("employee's feedback submission", "ix_feedback_submissions_training_employee", """
+        SELECT id FROM feedback_submissions
+        WHERE training_id = 1 AND employee_empid = 'check'
+        ORDER BY submitted_at DESC
+    """),
+    ("employee skill lookup", "ix_employee_competency_employee_skill", """
+        SELECT id FROM employee_competency
+        WHERE employee_empid = 'check' AND skill = 'check'
+    """),
+    ("latest manager performance feedback", "ix_manager_performance_feedback_training_employee", """
+        SELECT id FROM manager_performance_feedback
+        WHERE training_id = 1 AND employee_empid = 'check'
+        ORDER BY updated_at DESC LIMIT 1
+    """),
+]
+
+def plan_indexes(plan: dict) -> set:
+    """Names of all indexes used anywhere in an EXPLAIN (FORMAT JSON) plan node."""
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= plan_indexes(child)
+    return names
+
+async def create_indexes():
+    """Create all indexes listed in INDEXES if they don't exist."""
+
+    # Create async engine
+    engine = create_async_engine(DATABASE_URL)
+
+    try:
+        async with engine.begin() as conn:
+            for description, sql in CLEANUP:
+                print(f"🧹 Removing {description}...")
+                result = await conn.execute(text(sql))
+                print(f"✅ Removed {result.rowcount} row(s)")
+            for index_name, ddl in INDEXES:
+                print(f"🔧 Ensuring index {index_name}...")
+                await conn.execute(text(ddl))
+                print(f"✅ {index_name} is in place!")
+    except Exception as e:
+        print(f"❌ Error creating indexes: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+async def check_indexes(no_seqscan: bool = False) -> bool:
+    """
+    EXPLAIN each query in HOT_QUERIES and report whether its plan uses the expected index.
+
+    Args:
+        no_seqscan: Discourage sequential scans (enable_seqscan = off) so small
+            tables still show whether the index can be used
+
+    Returns:
+        bool: True if every query uses its index
+    """
+    engine = create_async_engine(DATABASE_URL)
+    all_used = True
+
+    try:
+        async with engine.connect() as conn:
+            if no_seqscan:
+                await conn.execute(text("SET enable_seqscan = off"))
+            for description, index_name, sql in HOT_QUERIES:
+                result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = plan_indexes(plan[0]["Plan"])
+                if index_name in used:
+                    print(f"✅ {description}: uses {index_name}")
+                else:
+                    all_used = False
+                    print(f"⚠️ {description}: does not use {index_name} (plan uses {', '.join(sorted(used)) or 'no index'})")
+    except Exception as e:
+        print(f"❌ Error checking indexes: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+    return all_used
+
+async def main():
+    """Main function to run the migration (or the index check with --check)."""
+    if "--check" in sys.argv:
+        print("🔍 Checking that hot queries use their indexes...")
+        if not await check_indexes(no_seqscan="--no-seqscan" in sys.argv):
+            sys.exit(1)
+        print("🎉 All hot queries use their indexes!")
+        return
+    print("🚀 Starting index migration...")
+    await create_indexes()
+    print("🎉 Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -20,8 +20,11 @@ API Endpoints:
 - /training-requests/: Training request management
 - /additional-skills/: Additional skills management
 - /shared-content/: Shared assignments and feedback
-- /upload-and-refresh: Excel data import
-- /upload-manager-employee-csv: CSV data import
+- /upload-and-refresh: Excel data import (queued, returns a job ID)
+- /upload-manager-employee-csv: CSV data import (queued, returns a job ID)
+- /jobs/{job_id}: Import job progress and result
+- /health/db-pool: Database connection pool status
+- /metrics: Prometheus metrics (request timing, SQL counts, pools, caches)
 
 @author Orbit Skill Development Team
 @date 2025
@@ -37,16 +40,23 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # -------------------------------------------------------------
 
 import logging
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from typing import Optional
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.routes import register, login, dashboard_routes, additional_skills, training_routes, assignment_routes, training_requests, shared_content_routes
-from app.database import AsyncSessionLocal, create_db_and_tables
-from app.excel_loader import load_all_from_excel, load_manager_employee_from_csv
+from app.database import AsyncSessionLocal, create_db_and_tables, get_pool_status
+from app.excel_loader import load_all_from_excel, load_manager_employee_from_csv, shutdown_parse_pool
+from app.trainer_index import ensure_training_trainers
+from app.metrics import MetricsMiddleware, render_prometheus
+from app.logging_config import configure_logging
+from app.jobs import job_queue, save_upload
 
 # --- Configuration ---
-# Set up logging with timestamp and level information
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging levels, per-module overrides and JSON output are set via environment
+# variables (see app/logging_config.py)
+configure_logging()
 
 # --- FastAPI App Initialization ---
 # Create FastAPI application instance with metadata
@@ -72,6 +82,10 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# --- Metrics Middleware ---
+# Added last so it is the outermost layer and times the full request, including CORS
+app.add_middleware(MetricsMiddleware)
+
 # --- API Routers ---
 app.include_router(register.router)
 app.include_router(login.router)
@@ -93,9 +107,103 @@ async def read_root():
     """
     return {"message": "Welcome to the SkillOrbit API. Please go to /docs for the API documentation."}
 
+@app.get("/health/db-pool", tags=["Default"])
+async def db_pool_status():
+    """
+    Database connection pool status for this worker process.
+
+    Use checked_out and overflow to size DB_POOL_SIZE / DB_MAX_OVERFLOW against
+    the uvicorn worker count.
+    """
+    return get_pool_status()
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Default"])
+async def metrics():
+    """
+    Prometheus metrics for this worker process: per-route request time, SQL time,
+    statement and row counts, plus connection pool, hashing pool and cache stats.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # <<< PERMANENT SOLUTION: File Upload Endpoint >>>
-@app.post("/upload-and-refresh", status_code=200, tags=["Admin"])
-async def upload_and_refresh_data(file: UploadFile = File(...)):
+async def _run_excel_refresh(path: str, filename: str, stream: Optional[bool], mode: str, force: bool) -> dict:
+    """Job body for /upload-and-refresh: loads the spooled workbook and counts the result."""
+    async with AsyncSessionLocal() as db:
+        changes = await load_all_from_excel(path, db, stream=stream, mode=mode, force=force)
+
+        # Verify data was inserted
+        from sqlalchemy import select, func
+        from app.models import Trainer, TrainingDetail, EmployeeCompetency
+
+        trainers_result = await db.execute(select(func.count(Trainer.id)))
+        trainers_count = trainers_result.scalar()
+        trainings_result = await db.execute(select(func.count(TrainingDetail.id)))
+        trainings_count = trainings_result.scalar()
+        competencies_result = await db.execute(select(func.count(EmployeeCompetency.id)))
+        competencies_count = competencies_result.scalar()
+
+    logging.info(f"Successfully processed and loaded data from '{filename}'.")
+    skipped_sheets = changes.get("skipped_sheets", [])
+    if changes.get("unchanged"):
+        message = f"Data in '{filename}' is unchanged since the last upload; nothing was refreshed."
+    else:
+        message = f"Data from '{filename}' has been successfully uploaded and the database has been refreshed."
+    return {
+        "message": message,
+        "skipped_sheets": skipped_sheets,
+        "trainers_inserted": trainers_count,
+        "trainings_inserted": trainings_count,
+        "employee_competencies_inserted": competencies_count,
+        "changes": changes,
+    }
+
+
+async def _run_manager_employee_load(path: str, filename: str, force: bool) -> dict:
+    """Job body for /upload-manager-employee-csv."""
+    async with AsyncSessionLocal() as db:
+        load_result = await load_manager_employee_from_csv(path, db, force=force)
+
+        # Verify data was inserted
+        from sqlalchemy import select, func
+        from app.models import ManagerEmployee
+
+        # Count all manager-employee relationships
+        count_result = await db.execute(
+            select(func.count()).select_from(ManagerEmployee)
+        )
+        total_count = count_result.scalar()
+
+    if load_result["skipped"]:
+        logging.info(f"Manager-employee data in '{filename}' is unchanged; skipped.")
+        return {
+            "message": f"Manager-employee data in '{filename}' is unchanged since the last upload; nothing was refreshed.",
+            "skipped": True,
+            "relationships_inserted": total_count,
+        }
+    logging.info(f"Successfully processed and loaded manager-employee data from '{filename}'.")
+    return {
+        "message": f"Manager-employee data from '{filename}' has been successfully uploaded and the database has been refreshed.",
+        "skipped": False,
+        "relationships_inserted": total_count,
+    }
+
+
+def _job_accepted(job) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "message": f"'{job.filename}' was received and queued for import.",
+    }
+
+
+@app.post("/upload-and-refresh", status_code=202, tags=["Admin"])
+async def upload_and_refresh_data(
+    file: UploadFile = File(...),
+    stream: Optional[bool] = Query(None, description="Read rows lazily in chunks; defaults to on for large files"),
+    mode: str = Query("replace", description="'replace' reloads everything; 'merge' applies only the changes"),
+    force: bool = Query(False, description="Reload sheets even if they match the last applied upload"),
+):
     """
     Admin endpoint: Upload Excel file and refresh database with training/competency data.
     
@@ -104,58 +212,45 @@ async def upload_and_refresh_data(file: UploadFile = File(...)):
     - Training details
     - Employee competencies
     
-    The file is processed and data is loaded into the database, replacing existing records.
+    The upload is saved and queued; the import runs in the background (one refresh
+    at a time). Poll GET /jobs/{job_id} for progress and the final summary.
     
     Args:
         file: Excel file upload containing training and competency data
+        stream: Force streaming (true) or DataFrame (false) ingestion; by default
+            files of at least EXCEL_STREAM_MIN_BYTES are streamed
+        mode: "replace" (default) clears trainings and their activity and reloads;
+            "merge" keeps matching rows (and their IDs) and applies only the differences
+        force: Re-apply sheets whose content is unchanged since the last applied
+            upload (by default they are skipped and listed in skipped_sheets)
         
     Returns:
-        dict: Success message with counts of inserted records
+        dict: Job ID and status URL
         
     Raises:
-        HTTPException: 400 if file type is invalid or validation fails
-        HTTPException: 500 if processing error occurs
+        HTTPException: 400 if file type or mode is invalid
     """
     logging.info(f"API: Received file '{file.filename}' for data refresh.")
 
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload an Excel file.")
+    if mode not in ("replace", "merge"):
+        raise HTTPException(status_code=400, detail="Invalid mode. Use 'replace' or 'merge'.")
 
-    try:
-        async with AsyncSessionLocal() as db:
-            await load_all_from_excel(file.file, db)
-            
-            # Verify data was inserted
-            from sqlalchemy import select, func
-            from app.models import Trainer, TrainingDetail, EmployeeCompetency
-            
-            trainers_result = await db.execute(select(func.count(Trainer.id)))
-            trainers_count = trainers_result.scalar()
-            trainings_result = await db.execute(select(func.count(TrainingDetail.id)))
-            trainings_count = trainings_result.scalar()
-            competencies_result = await db.execute(select(func.count(EmployeeCompetency.id)))
-            competencies_count = competencies_result.scalar()
-        
-        logging.info(f"Successfully processed and loaded data from '{file.filename}'.")
-        return {
-            "message": f"Data from '{file.filename}' has been successfully uploaded and the database has been refreshed.",
-            "trainers_inserted": trainers_count,
-            "trainings_inserted": trainings_count,
-            "employee_competencies_inserted": competencies_count,
-            "status": "success"
-        }
-    
-    except ValueError as ve:
-        # This is raised when all rows are skipped
-        logging.error(f"Validation error: {ve}", exc_info=True)
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        logging.error(f"An error occurred during file processing and database refresh: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
+    path = await save_upload(file, suffix=os.path.splitext(file.filename)[1])
+    filename = file.filename
+    job = job_queue.submit(
+        "excel_refresh", filename, path,
+        lambda job_path: _run_excel_refresh(job_path, filename, stream, mode, force),
+    )
+    return _job_accepted(job)
 
 
-@app.post("/upload-manager-employee-csv", status_code=200, tags=["Admin"])
-async def upload_manager_employee_csv(file: UploadFile = File(...)):
+@app.post("/upload-manager-employee-csv", status_code=202, tags=["Admin"])
+async def upload_manager_employee_csv(
+    file: UploadFile = File(...),
+    force: bool = Query(False, description="Reload even if the file matches the last applied upload"),
+):
     """
     Admin endpoint: Upload CSV file and load manager-employee relationships.
     
@@ -168,48 +263,50 @@ async def upload_manager_employee_csv(file: UploadFile = File(...)):
     - manager_is_trainer: Boolean indicating if manager is a trainer
     - employee_is_trainer: Boolean indicating if employee is a trainer
     
+    The upload is queued like /upload-and-refresh; poll GET /jobs/{job_id}.
+    A file identical to the last applied one is skipped unless force is set.
+    
     Args:
         file: CSV file upload containing manager-employee relationship data
+        force: Reload even if the file is unchanged
         
     Returns:
-        dict: Success message with count of relationships inserted
+        dict: Job ID and status URL
         
     Raises:
-        HTTPException: 400 if file type is invalid or validation fails
-        HTTPException: 500 if processing error occurs
+        HTTPException: 400 if file type is invalid
     """
     logging.info(f"API: Received CSV file '{file.filename}' for manager-employee data load.")
 
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV file.")
 
-    try:
-        async with AsyncSessionLocal() as db:
-            await load_manager_employee_from_csv(file.file, db)
-            
-            # Verify data was inserted
-            from sqlalchemy import select, func
-            from app.models import ManagerEmployee
-            
-            # Count all manager-employee relationships
-            count_result = await db.execute(
-                select(func.count()).select_from(ManagerEmployee)
-            )
-            total_count = count_result.scalar()
-        
-        logging.info(f"Successfully processed and loaded manager-employee data from '{file.filename}'.")
-        return {
-            "message": f"Manager-employee data from '{file.filename}' has been successfully uploaded and the database has been refreshed.",
-            "relationships_inserted": total_count,
-            "status": "success"
-        }
-    
-    except ValueError as ve:
-        logging.error(f"Validation error: {ve}", exc_info=True)
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        logging.error(f"An error occurred during CSV file processing: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
+    path = await save_upload(file, suffix=".csv")
+    filename = file.filename
+    job = job_queue.submit(
+        "manager_employee_load", filename, path,
+        lambda job_path: _run_manager_employee_load(job_path, filename, force),
+    )
+    return _job_accepted(job)
+
+
+@app.get("/jobs/{job_id}", tags=["Admin"])
+async def get_job_status(job_id: str):
+    """
+    Status of a queued data import.
+
+    Returns:
+        dict: status (queued, running, succeeded, failed), current stage, progress
+        counters (rows parsed, validated, inserted, skipped), and the final summary
+        (result) or error
+
+    Raises:
+        HTTPException: 404 if the job is unknown (or expired from the history)
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 
 # --- Application Lifecycle Events ---
@@ -224,9 +321,21 @@ async def on_startup():
     Actions:
     1. Initialize database connection
     2. Create all database tables (if not exist)
-    3. Log startup completion
+    3. Build the trainer authorization index if it is empty
+    4. Start the background import worker
+    5. Log startup completion
     """
     logging.info("STARTUP: Initializing database...")
     await create_db_and_tables()
+    async with AsyncSessionLocal() as db:
+        await ensure_training_trainers(db)
+    job_queue.start()
     logging.info("STARTUP: Database initialization complete.")
-    logging.info("STARTUP: Server is ready. Please go to /docs for the API documentation and to upload data.")
\ No newline at end of file
+    logging.info("STARTUP: Server is ready. Please go to /docs for the API documentation and to upload data.")
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stops the background import worker and the parse worker processes."""
+    await job_queue.stop()
+    shutdown_parse_pool()
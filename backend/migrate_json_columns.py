@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Database migration script to convert the JSON payload columns from TEXT to JSONB
+and add the JSONB columns introduced since (compiled answer keys, stored results).
+Base.metadata.create_all() does not alter existing tables, so run this script once
+against an existing database after pulling new JSON column definitions.
+Columns that are already JSONB are left alone and all other statements use
+IF NOT EXISTS, so the script is safe to re-run.
+
+Note: ALTER COLUMN ... TYPE rewrites the table and holds an exclusive lock on it
+while it runs; run it in a quiet period on large databases.
+"""
+
+import asyncio
+import sys
+import os
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_URL
+
+# (table, column) - keep in sync with the JSONPayload columns in app/models.py
+JSON_COLUMNS = [
+    ("shared_assignments", "assignment_data"),
+    ("shared_feedback", "feedback_data"),
+    ("assignment_submissions", "answers_data"),
+    ("feedback_submissions", "responses_data"),
+]
+
+# (table, column) - nullable JSONB columns added to existing tables
+NEW_COLUMNS = [
+    ("shared_assignments", "answer_key"),
+    ("assignment_submissions", "question_results"),
+]
+
+# (index name, DDL) - keep in sync with __table_args__ in app/models.py
+INDEXES = [
+    ("ix_assignment_submissions_answers", """
+        CREATE INDEX IF NOT EXISTS ix_assignment_submissions_answers
+        ON assignment_submissions USING gin (answers_data jsonb_path_ops)
+    """),
+    ("ix_feedback_submissions_responses", """
+        CREATE INDEX IF NOT EXISTS ix_feedback_submissions_responses
+        ON feedback_submissions USING gin (responses_data jsonb_path_ops)
+    """),
+]
+
+async def migrate_json_columns():
+    """Convert JSON_COLUMNS to JSONB, add NEW_COLUMNS and create the GIN indexes in INDEXES."""
+
+    # Create async engine
+    engine = create_async_engine(DATABASE_URL)
+
+    try:
+        async with engine.begin() as conn:
+            for table, column in JSON_COLUMNS:
+                type_result = await conn.execute(text("""
+                    SELECT data_type FROM information_schema.columns
+                    WHERE table_schema = 'public' AND table_name = :table AND column_name = :column
+                """), {"table": table, "column": column})
+                data_type = type_result.scalar()
+                if data_type is None:
+                    print(f"⚠️ {table}.{column} not found, skipping")
+                    continue
+                if data_type == "jsonb":
+                    print(f"✅ {table}.{column} is already JSONB")
+                    continue
+                print(f"🔧 Converting {table}.{column} ({data_type}) to JSONB...")
+                await conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"
+                ))
+                print(f"✅ {table}.{column} converted!")
+            for table, column in NEW_COLUMNS:
+                print(f"🔧 Ensuring column {table}.{column}...")
+                await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} JSONB"))
+                print(f"✅ {table}.{column} is in place!")
+            for index_name, ddl in INDEXES:
+                print(f"🔧 Ensuring index {index_name}...")
+                await conn.execute(text(ddl))
+                print(f"✅ {index_name} is in place!")
+    except Exception as e:
+        print(f"❌ Error migrating JSON columns: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+async def main():
+    """Main function to run the migration."""
+    print("🚀 Starting JSONB migration...")
+    await migrate_json_columns()
+    print("🎉 Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
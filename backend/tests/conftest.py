@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the 'app' package importable, as main.py does
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,199 @@
+"""Answer key compilation, per-submission grading and the vectorized regrade (app/grading.py)."""
+
+import random
+
+from app.grading import (compile_answer_key, grade_submission, is_correct, option_mask, score_answers_vectorized,
+                         score_percent, score_submissions)
+
+
+def legacy_grade(questions, answers):
+    """The grading rules submit_assignment applied inline before answer keys were compiled."""
+    correct_count = 0
+    results = []
+    for answer in answers:
+        if answer["questionIndex"] >= len(questions):
+            continue
+        question = questions[answer["questionIndex"]]
+        correct = False
+        correct_indices = []
+        if question.get("type") in ["single-choice", "multiple-choice"]:
+            correct_indices = [idx for idx, opt in enumerate(question.get("options", []))
+                               if opt.get("isCorrect", False)]
+            if question.get("type") == "single-choice":
+                correct = len(answer["selectedOptions"]) == 1 and answer["selectedOptions"][0] in correct_indices
+            else:
+                correct = set(answer["selectedOptions"]) == set(correct_indices)
+        correct_count += correct
+        results.append({
+            "questionIndex": answer["questionIndex"],
+            "isCorrect": correct,
+            "correctAnswers": correct_indices,
+            "userAnswers": list(answer["selectedOptions"]),
+            "userTextAnswer": answer.get("textAnswer") if question.get("type") == "text-input" else None,
+        })
+    return results, correct_count
+
+
+def options(*correct, count=4):
+    return [{"text": f"Option {i}", "isCorrect": i in correct} for i in range(count)]
+
+
+QUESTIONS = [
+    {"type": "single-choice", "question": "Q0", "options": options(1)},
+    {"type": "multiple-choice", "question": "Q1", "options": options(0, 2)},
+    {"type": "text-input", "question": "Q2", "options": []},
+    {"type": "multiple-choice", "question": "Q3", "options": options()},
+]
+
+
+def answer(question_index, selected=(), text=None):
+    return {"questionIndex": question_index, "selectedOptions": list(selected), "textAnswer": text}
+
+
+def test_option_mask():
+    assert option_mask([]) == 0
+    assert option_mask([0, 2]) == 0b101
+    assert option_mask([2, 2, 0]) == 0b101
+    assert option_mask([1, -1]) is None
+
+
+def test_compile_answer_key():
+    assert compile_answer_key(QUESTIONS) == [
+        {"type": "single-choice", "mask": 0b10, "correct": [1]},
+        {"type": "multiple-choice", "mask": 0b101, "correct": [0, 2]},
+        {"type": "text-input", "mask": 0, "correct": []},
+        {"type": "multiple-choice", "mask": 0, "correct": []},
+    ]
+
+
+def test_single_choice():
+    entry = compile_answer_key(QUESTIONS)[0]
+    assert is_correct(entry, [1])
+    assert not is_correct(entry, [0])
+    assert not is_correct(entry, [])
+    assert not is_correct(entry, [1, 1])
+    assert not is_correct(entry, [1, 0])
+    assert not is_correct(entry, [-3])
+
+
+def test_multiple_choice():
+    entry = compile_answer_key(QUESTIONS)[1]
+    assert is_correct(entry, [0, 2])
+    assert is_correct(entry, [2, 0, 2])
+    assert not is_correct(entry, [0])
+    assert not is_correct(entry, [0, 1, 2])
+    assert not is_correct(entry, [])
+    assert not is_correct(entry, [0, 2, -1])
+    assert not is_correct(entry, [0, 2, 5])
+
+
+def test_huge_option_index_is_rejected_without_building_a_mask():
+    key = compile_answer_key(QUESTIONS)
+    assert option_mask([1 << 40], max_index=3) is None
+    assert not is_correct(key[0], [10 ** 30])
+    assert not is_correct(key[1], [0, 2, 10 ** 30])
+    assert grade_submission(key, [answer(1, [10 ** 30])])[1] == 0
+
+
+def test_text_input_is_never_auto_graded():
+    entry = compile_answer_key(QUESTIONS)[2]
+    assert not is_correct(entry, [])
+    results, correct_count = grade_submission(compile_answer_key(QUESTIONS), [answer(2, text="My answer")])
+    assert correct_count == 0
+    assert results[0]["userTextAnswer"] == "My answer"
+
+
+def test_matches_legacy_rules():
+    submissions = [
+        [answer(0, [1]), answer(1, [0, 2]), answer(2, text="x"), answer(3, [])],
+        [answer(0, [0]), answer(1, [2, 0, 0]), answer(3, [1])],
+        [answer(0, [1, 1]), answer(1, [0]), answer(2, [1], text="y")],
+        [answer(0, []), answer(1, [0, 1, 2]), answer(-1, [])],
+        [answer(0, [1]), answer(4, [1]), answer(9, [0])],
+        [],
+    ]
+    key = compile_answer_key(QUESTIONS)
+    for answers in submissions:
+        assert grade_submission(key, answers) == legacy_grade(QUESTIONS, answers)
+
+
+def test_answers_beyond_the_key_are_ignored():
+    key = compile_answer_key(QUESTIONS)
+    results, correct_count = grade_submission(key, [answer(4, [1]), answer(-5, [1]), answer(0, [1])])
+    assert [r["questionIndex"] for r in results] == [0]
+    assert correct_count == 1
+    assert grade_submission([], [answer(0, [1]), answer(-1, [1])]) == ([], 0)
+
+
+def test_score_percent():
+    assert score_percent(1, 3) == 33
+    assert score_percent(3, 3) == 100
+    assert score_percent(0, 0) == 0
+
+
+# --- Vectorized regrade: must agree with grade_submission() ---
+
+def scalar_counts(key, submissions):
+    return [grade_submission(key, answers)[1] for answers in submissions]
+
+
+EDGE_SUBMISSIONS = [
+    # Negative (from the end) and out-of-range question indices
+    [answer(-4, [1]), answer(-1, []), answer(-5, [1]), answer(4, [1]), answer(100, [0, 2])],
+    # Option index >= 64 selected against a narrow key
+    [answer(0, [64]), answer(1, [0, 2, 70]), answer(1, [1 << 70])],
+    # Duplicate selected options
+    [answer(0, [1, 1]), answer(1, [0, 2, 2, 0])],
+    # Empty multiple-choice: correct only when the question has no correct options
+    [answer(1, []), answer(3, [])],
+    # Single-choice with 0 or 2 options selected
+    [answer(0, []), answer(0, [1, 0]), answer(0, [0, 1])],
+    # Negative option index
+    [answer(0, [-1]), answer(1, [0, 2, -1])],
+    # Text input and missing selections
+    [answer(2, text="x"), {"questionIndex": 1, "selectedOptions": None}, {"selectedOptions": [1]}],
+    [],
+]
+
+
+def test_vectorized_matches_scalar_on_edge_cases():
+    key = compile_answer_key(QUESTIONS)
+    vectorized = score_answers_vectorized(key, EDGE_SUBMISSIONS)
+    assert vectorized.tolist() == scalar_counts(key, EDGE_SUBMISSIONS)
+    assert score_submissions(key, EDGE_SUBMISSIONS).tolist() == scalar_counts(key, EDGE_SUBMISSIONS)
+
+
+def test_vectorized_matches_scalar_for_key_without_questions():
+    submissions = [[answer(0, [1]), answer(-1, [0])], []]
+    assert score_answers_vectorized([], submissions).tolist() == [0, 0]
+    assert scalar_counts([], submissions) == [0, 0]
+
+
+def test_vectorized_matches_scalar_on_random_submissions():
+    rng = random.Random(7)
+    questions = [
+        {"type": rng.choice(["single-choice", "multiple-choice", "text-input"]),
+         "options": options(*rng.sample(range(6), rng.randint(0, 3)), count=6)}
+        for _ in range(12)
+    ]
+    key = compile_answer_key(questions)
+    submissions = [
+        [answer(rng.randint(-14, 14), rng.choices(range(-1, 7), k=rng.randint(0, 3))) for _ in range(rng.randint(0, 15))]
+        for _ in range(300)
+    ]
+    assert score_answers_vectorized(key, submissions).tolist() == scalar_counts(key, submissions)
+
+
+def test_wide_key_falls_back_to_scalar_grading():
+    questions = [
+        {"type": "single-choice", "options": options(70, count=80)},
+        {"type": "multiple-choice", "options": options(3, 65, count=80)},
+    ]
+    key = compile_answer_key(questions)
+    submissions = [
+        [answer(0, [70]), answer(1, [65, 3])],
+        [answer(0, [69]), answer(1, [3])],
+        [answer(0, [70, 70]), answer(1, [3, 65, 65])],
+    ]
+    assert score_submissions(key, submissions).tolist() == [2, 0, 1]
+    assert score_submissions(key, submissions).tolist() == scalar_counts(key, submissions)
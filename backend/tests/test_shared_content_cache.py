@@ -0,0 +1,89 @@
+"""Coalesced loads of the shared content response cache (app/shared_content_cache.py)."""
+
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app import shared_content_cache as module
+from app.shared_content_cache import ASSIGNMENT, cached_response, invalidate_shared_content
+
+
+class Payload(BaseModel):
+    value: int
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    invalidate_shared_content()
+    yield
+    invalidate_shared_content()
+    assert module._loads == {}
+
+
+def counting_loader(calls, value=1, delay=0.01):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return Payload(value=value)
+    return load
+
+
+def test_concurrent_misses_load_once():
+    calls = []
+
+    async def run():
+        load = counting_loader(calls)
+        return await asyncio.gather(*(cached_response(ASSIGNMENT, 1, load) for _ in range(20)))
+
+    responses = asyncio.run(run())
+    assert calls == [1]
+    assert {response.body for response in responses} == {b'{"value":1}'}
+
+
+def test_nothing_shared_is_cached_as_null():
+    calls = []
+
+    async def load():
+        calls.append(None)
+        return None
+
+    async def run():
+        return [await cached_response(ASSIGNMENT, 2, load) for _ in range(3)]
+
+    assert [response.body for response in asyncio.run(run())] == [b"null"] * 3
+    assert len(calls) == 1
+
+
+def test_invalidation_during_load_is_not_served_to_waiters():
+    calls = []
+
+    async def run():
+        first = asyncio.create_task(cached_response(ASSIGNMENT, 3, counting_loader(calls, value=1)))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cached_response(ASSIGNMENT, 3, counting_loader(calls, value=2)))
+        await asyncio.sleep(0)
+        invalidate_shared_content(3)
+        return await first, await waiter
+
+    first, waiter = asyncio.run(run())
+    # The first load started before the invalidation: returned to its caller but not stored
+    assert first.body == b'{"value":1}'
+    assert waiter.body == b'{"value":2}'
+    assert calls == [1, 2]
+
+
+def test_failed_load_does_not_poison_the_key():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    async def run():
+        results = await asyncio.gather(cached_response(ASSIGNMENT, 4, failing),
+                                       cached_response(ASSIGNMENT, 4, counting_loader([], value=5)),
+                                       return_exceptions=True)
+        return results
+
+    failed, recovered = asyncio.run(run())
+    assert isinstance(failed, RuntimeError)
+    assert recovered.body == b'{"value":5}'
@@ -0,0 +1,62 @@
+"""Trainer entry matching rules (app/trainer_index.py)."""
+
+from app.trainer_index import _PeopleIndex, split_trainer_names
+
+PEOPLE = {
+    "5504763": "Sharib Jawed",
+    "5504764": "Sharib Khan",
+    "5504765": "Anita Rao",
+    "5504766": "Priya",
+}
+
+
+def index(usernames=()):
+    return _PeopleIndex(PEOPLE, usernames)
+
+
+def test_split_trainer_names():
+    assert split_trainer_names("Sharib Jawed, Anita Rao\nPriya") == ["Sharib Jawed", "Anita Rao", "Priya"]
+    assert split_trainer_names("  ") == []
+    assert split_trainer_names(None) == []
+
+
+def test_exact_display_name_matches():
+    assert index().resolve("Sharib Jawed") == {"5504763"}
+    assert index().resolve("  sharib jawed ") == {"5504763"}
+
+
+def test_exact_single_word_display_name_matches():
+    assert index().resolve("Priya") == {"5504766"}
+
+
+def test_exact_username_matches():
+    assert index(["trainer1"]).resolve("trainer1") == {"trainer1"}
+    assert index().resolve("5504765") == {"5504765"}
+
+
+def test_username_mentioned_in_entry_matches():
+    assert index().resolve("Sharib J. (5504763)") == {"5504763"}
+
+
+def test_single_word_does_not_match_partial_names():
+    # A first name alone must not make everyone called "Sharib" a trainer
+    assert index().resolve("Sharib") == set()
+
+
+def test_reordered_full_name_matches():
+    assert index().resolve("Jawed Sharib") == {"5504763"}
+
+
+def test_entry_with_extra_words_matches_full_display_name():
+    assert index().resolve("Dr. Anita Rao Kumar") == {"5504765"}
+
+
+def test_one_shared_word_in_longer_entry_does_not_match():
+    # Only "sharib" is shared with both Sharib Jawed and Sharib Khan
+    assert index().resolve("Sharib Ahmed") == set()
+    # A one-word display name contained in a longer entry is not enough either
+    assert index().resolve("Priya Sharma") == set()
+
+
+def test_short_words_are_ignored():
+    assert index().resolve("Sharib Ja") == set()
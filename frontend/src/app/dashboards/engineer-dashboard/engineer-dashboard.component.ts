@@ -67,7 +67,7 @@ import { of } from 'rxjs';
 import { trigger, style, animate, transition, query, stagger } from '@angular/animations';
 import { ToastService, ToastMessage } from '../../services/toast.service';
 import { Skill, ModalSkill } from '../../models/skill.model';
-import { TrainingDetail, TrainingRequest, CalendarEvent } from '../../models/training.model';
+import { TrainingDetail, TrainingRequest, CalendarEvent, EngineerDashboardTraining } from '../../models/training.model';
 import { Assignment, AssignmentQuestion, QuestionOption, UserAnswer, QuestionResult, AssignmentResult, FeedbackQuestion } from '../../models/assignment.model';
 
 /**
@@ -955,7 +955,8 @@ export class EngineerDashboardComponent implements OnInit {
       return;
     }
     const headers = new HttpHeaders({ 'Authorization': `Bearer ${token}` });
-    this.http.get<TrainingDetail[]>(this.apiService.getUrl('/assignments/my'), { headers }).subscribe({
+    // One aggregate call returns trainings plus attendance/submission status for each
+    this.http.get<EngineerDashboardTraining[]>(this.apiService.myTrainingDashboardUrl, { headers }).subscribe({
       next: (response) => {
         this.assignedTrainings = (response || []).map(t => ({ ...t, assignmentType: 'personal' as const }));
         this.assignedTrainingsCalendarEvents = this.assignedTrainings
@@ -967,8 +968,7 @@ export class EngineerDashboardComponent implements OnInit {
             }));
         this.generateCalendar();
         this.processDashboardTrainings();
-        // Check submission status for all assigned trainings
-        this.checkSubmissionStatuses();
+        this.applySubmissionStatuses(response || []);
       },
       error: (err) => {
         console.error('Failed to fetch assigned trainings:', err);
@@ -991,40 +991,11 @@ export class EngineerDashboardComponent implements OnInit {
     });
   }
 
-  checkSubmissionStatuses(): void {
-    const token = this.authService.getToken();
-    if (!token) return;
-    const headers = new HttpHeaders({ 'Authorization': `Bearer ${token}` });
-    
-    // Check assignment submission status for each training
-    this.assignedTrainings.forEach(training => {
-      // Check assignment submission status
-      this.http.get(this.apiService.getUrl(`/shared-content/assignments/${training.id}/result`), { headers }).subscribe({
-        next: (result: any) => {
-          if (result) {
-            this.assignmentSubmissionStatus.set(training.id, true);
-            this.assignmentScores.set(training.id, result.score || 0);
-          }
-        },
-        error: (err) => {
-          // No result found means not submitted yet
-          this.assignmentSubmissionStatus.set(training.id, false);
-          this.assignmentScores.set(training.id, 0);
-        }
-      });
-
-      // Check feedback submission status
-      this.http.get(this.apiService.getUrl(`/shared-content/feedback/${training.id}/result`), { headers }).subscribe({
-        next: (result: any) => {
-          if (result) {
-            this.feedbackSubmissionStatus.set(training.id, true);
-          }
-        },
-        error: (err) => {
-          // No result found means not submitted yet
-          this.feedbackSubmissionStatus.set(training.id, false);
-        }
-      });
+  applySubmissionStatuses(trainings: EngineerDashboardTraining[]): void {
+    trainings.forEach(training => {
+      this.assignmentSubmissionStatus.set(training.id, training.assignment_submitted);
+      this.assignmentScores.set(training.id, training.assignment_score || 0);
+      this.feedbackSubmissionStatus.set(training.id, training.feedback_submitted);
     });
   }
 
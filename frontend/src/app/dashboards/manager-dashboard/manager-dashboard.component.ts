@@ -1998,40 +1998,32 @@ export class ManagerDashboardComponent implements OnInit, AfterViewInit {
     this.isAssigningTraining = true;
     const headers = new HttpHeaders({ 'Authorization': `Bearer ${token}` });
     
-    // Create array of observables only for valid (non-duplicate) assignments
-    const assignmentObservables: any[] = [];
-    
-    validAssignments.forEach(({ trainingId, memberId, trainingName, memberName }) => {
+    validAssignments.forEach(({ trainingName, memberName }) => {
       if (!trainingNames.includes(trainingName)) {
         trainingNames.push(trainingName);
       }
       if (!memberNames.includes(memberName)) {
         memberNames.push(memberName);
       }
-      
-      const payload = { training_id: trainingId, employee_username: memberId };
-      assignmentObservables.push(
-        this.http.post(this.apiService.assignmentsUrl, payload, { headers }).pipe(
-          map(() => {
-            // Add to existing assignments to prevent immediate re-assignment
-            const key = `${trainingId}_${memberId}`;
-            this.existingAssignments.add(key);
-            return { success: true, trainingName, memberName };
-          }),
-          catchError((err) => {
-            // Check if it's a duplicate error (400)
-            if (err.status === 400 && err.error?.detail?.includes('already assigned')) {
-              const key = `${trainingId}_${memberId}`;
-              this.existingAssignments.add(key);
-            }
-            return of({ success: false, trainingName, memberName, error: err });
-          })
-        )
-      );
     });
 
-    // Execute all assignments in parallel using forkJoin
-    forkJoin(assignmentObservables).subscribe({
+    // Send every (training, member) pair in one request; the server returns one outcome per pair in order
+    const payload = {
+      assignments: validAssignments.map(({ trainingId, memberId }) => ({ training_id: trainingId, employee_username: memberId }))
+    };
+
+    this.http.post<{ assigned_count: number; results: { training_id: number; employee_username: string; status: string }[] }>(
+      this.apiService.bulkAssignmentsUrl, payload, { headers }
+    ).pipe(
+      map((response) => response.results.map((outcome, index) => {
+        const { trainingName, memberName } = validAssignments[index];
+        if (outcome.status === 'assigned' || outcome.status === 'already_assigned') {
+          // Add to existing assignments to prevent immediate re-assignment
+          this.existingAssignments.add(`${outcome.training_id}_${outcome.employee_username}`);
+        }
+        return { success: outcome.status === 'assigned', trainingName, memberName };
+      }))
+    ).subscribe({
       next: (results) => {
         this.isAssigningTraining = false;
         
@@ -53,6 +53,29 @@ export interface TrainingDetail {
   assigned_to?: string;
 }
 
+/**
+ * Assigned training with the per-training status shown on the engineer dashboard
+ * Returned by GET /assignments/my/dashboard in a single response
+ */
+export interface EngineerDashboardTraining extends TrainingDetail {
+  /** Whether the trainer marked the employee as attended */
+  attended: boolean;
+  /** Whether the trainer has shared an assignment for this training */
+  assignment_shared: boolean;
+  /** Whether the trainer has shared a feedback form for this training */
+  feedback_shared: boolean;
+  /** Whether the employee submitted the shared assignment */
+  assignment_submitted: boolean;
+  /** Score (percentage) of the latest assignment submission */
+  assignment_score: number | null;
+  /** Number of questions in the latest assignment submission */
+  assignment_total_questions: number | null;
+  /** When the latest assignment submission was made (ISO format string) */
+  assignment_submitted_at: string | null;
+  /** Whether the employee submitted the shared feedback form */
+  feedback_submitted: boolean;
+}
+
 /**
  * Training request interface for employee training requests
  * Used when employees request approval from managers to attend trainings
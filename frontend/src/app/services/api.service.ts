@@ -60,10 +60,18 @@ export class ApiService {
     return this.getUrl('/assignments/');
   }
 
+  get bulkAssignmentsUrl(): string {
+    return this.getUrl('/assignments/bulk');
+  }
+
   get myAssignmentsUrl(): string {
     return this.getUrl('/assignments/my');
   }
 
+  get myTrainingDashboardUrl(): string {
+    return this.getUrl('/assignments/my/dashboard');
+  }
+
   get managerTeamAssignmentsUrl(): string {
     return this.getUrl('/assignments/manager/team');
   }